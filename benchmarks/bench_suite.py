@@ -0,0 +1,356 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+
+from src import data_loader, data_processor, data_visualization, export, profiling, timeseries, type_conversion
+from src.cache import estimate_size
+from src.features import build_features
+from src.instrumentation import PeakMemory
+from src.missing_values import FILL_METHODS
+from src.transforms import DEFAULT_SPECIAL_CHARS, convert_types, fill_missing, remove_characters, select_columns
+from datasets import DATASETS, make_dataset
+
+# The pages run in Streamlit's bare mode: widgets return their defaults and
+# nothing is sent anywhere, so the warnings about it are noise here
+config.set_option("global.showWarningOnDirectExecution", False)
+set_log_level("error")
+# Same pandas mode as main.py, so loads and steps copy what the app copies
+pd.set_option("mode.copy_on_write", True)
+
+# Headless benchmarks for the loader, the processing steps and the chart pages.
+# Each scenario is timed cold (every cache emptied first), best of --repeat,
+# then run once more under tracemalloc for its peak memory. Results go to a
+# JSON file, one scenario per line, to diff or --compare between versions.
+
+RESULTS_DIRECTORY = os.path.join(ROOT, "benchmarks", "results")
+
+# name -> (datasets it runs on, setup(df) returning the callable to time)
+SCENARIOS = {}
+
+
+def scenario(name, datasets=tuple(DATASETS)):
+    def register(setup):
+        SCENARIOS[name] = (datasets, setup)
+        return setup
+    return register
+
+
+# Module-level caches would turn every repeat after the first into a cache hit
+def _cold():
+    for cache in (data_loader._parse_cache, data_processor._stage_cache, data_visualization._figure_cache,
+                  profiling._profile_cache, type_conversion._conversion_cache, export._export_cache,
+                  timeseries._sort_cache):
+        cache.clear()
+
+
+# Uploaded-file stand-in: the loader reads the name for its labels
+class NamedBytesIO(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def _numeric(df):
+    return df.select_dtypes("number").columns.tolist()
+
+
+def _text(df):
+    return df.select_dtypes("object").columns.tolist()
+
+
+@scenario("loader.load_csv")
+def bench_load_csv(df):
+    data = df.to_csv(index=False).encode()
+    return lambda: data_loader.load_csv(NamedBytesIO(data, "bench.csv"))
+
+
+@scenario("loader.load_csv_optimized")
+def bench_load_csv_optimized(df):
+    data = df.to_csv(index=False).encode()
+    return lambda: data_loader.load_csv(NamedBytesIO(data, "bench.csv"), optimize=True)
+
+
+@scenario("loader.load_json")
+def bench_load_json(df):
+    data = df.to_json(orient="records").encode()
+    return lambda: data_loader.load_json(NamedBytesIO(data, "bench.json"))
+
+
+@scenario("processor.select_columns")
+def bench_select_columns(df):
+    columns = tuple(df.columns[::2])
+    return lambda: select_columns(df, columns)[0]
+
+
+@scenario("processor.fill_missing.mean")
+def bench_fill_mean(df):
+    return lambda: fill_missing(df, FILL_METHODS[1])[0]
+
+
+@scenario("processor.fill_missing.drop_rows")
+def bench_fill_drop(df):
+    return lambda: fill_missing(df, FILL_METHODS[0])[0]
+
+
+@scenario("processor.convert_types")
+def bench_convert_types(df):
+    conversions = [(column, "float") for column in _numeric(df)[:4]]
+    conversions += [(column, "datetime") for column in ["date"] if column in df.columns]
+    return lambda: convert_types(df, tuple(conversions))[0]
+
+
+@scenario("processor.remove_characters", ("text", "high_cardinality", "tall"))
+def bench_remove_characters(df):
+    columns = tuple(_text(df))
+    return lambda: remove_characters(df, columns, DEFAULT_SPECIAL_CHARS)[0]
+
+
+# Every feature transform on the dataset's first text and numeric columns
+@scenario("features.build_features", ("tall", "high_cardinality"))
+def bench_build_features(df):
+    text, numeric = _text(df)[:2], _numeric(df)[:3]
+    specs = [
+        {"transform": "one_hot", "columns": text},
+        {"transform": "frequency", "columns": text},
+        {"transform": "target", "columns": text, "target": numeric[-1]},
+        {"transform": "bin", "columns": numeric},
+        {"transform": "scale", "columns": numeric},
+        {"transform": "polynomial", "columns": numeric},
+    ]
+    return lambda: build_features(df, specs)[0]
+
+
+@scenario("timeseries.sort_index", ("sensor",))
+def bench_sort_index(df):
+    shuffled = df.sample(frac=1, random_state=0)
+    return lambda: timeseries.sort_order(shuffled["time"], shuffled["sensor"])
+
+
+@scenario("timeseries.resample", ("sensor",))
+def bench_resample(df):
+    return lambda: timeseries.resample(df, "time", "value", "1min")
+
+
+@scenario("timeseries.window_features", ("sensor",))
+def bench_window_features(df):
+    return lambda: timeseries.window_features(df, "value", "time", windows=(60, "10min"), lags=(1,), spans=(30,),
+                                              group_column="sensor")
+
+
+# The whole processing page with its default settings
+@scenario("processor.process_data")
+def bench_process_data(df):
+    return lambda: data_processor.process_data(df)
+
+
+def _export(label):
+    def setup(df):
+        return lambda: export.export_file(df, label)[0]
+    return setup
+
+
+for _label in export.available_formats():
+    scenario(f"export.{_label.lower().replace(' (', '_').rstrip(')')}")(_export(_label))
+
+
+def _chart(show):
+    def setup(df):
+        return lambda: show(df)
+    return setup
+
+
+for _name, _show in [
+    ("summary_statistics", data_visualization.show_summary_statistics),
+    ("histogram", data_visualization.show_histogram),
+    ("box_plot", data_visualization.show_box_plot),
+    ("violin_plot", data_visualization.show_violin_plot),
+    ("univariate_bar", data_visualization.show_univariate_bar_chart),
+    ("scatter", data_visualization.show_scatter_plot),
+    ("correlation_heatmap", data_visualization.show_correlation_heatmap),
+    ("line_plot", data_visualization.show_line_plot),
+    ("scatter_3d", data_visualization.show_3d_scatter_plot),
+]:
+    scenario(f"visualizer.{_name}")(_chart(_show))
+
+
+# Every row drawn, as with the "Full detail" render mode
+def _full_detail_chart(show):
+    def setup(df):
+        def run():
+            with mock.patch.object(data_visualization, "use_aggregation", lambda df: False):
+                return show(df)
+        return run
+    return setup
+
+
+for _name, _show in [
+    ("scatter", data_visualization.show_scatter_plot),
+    ("line_plot", data_visualization.show_line_plot),
+]:
+    scenario(f"visualizer.{_name}_full_detail", ("tall", "sensor"))(_full_detail_chart(_show))
+
+
+# Record the figures a page hands to Streamlit, to size what the browser receives
+@contextmanager
+def _capture_figures():
+    figures = []
+    plotly_chart = st.plotly_chart
+
+    def record(figure, *args, **kwargs):
+        figures.append(figure)
+        return plotly_chart(figure, *args, **kwargs)
+
+    with mock.patch.object(st, "plotly_chart", record):
+        yield figures
+
+
+# Bytes of figure JSON for chart pages, file size for exports; estimated
+# in-memory size of the returned frame for everything else
+def _payload(result, figures):
+    if figures:
+        return sum(len(figure.to_json()) for figure in figures)
+    if result is None:
+        return None
+    if isinstance(result, str) and os.path.isfile(result):
+        return os.path.getsize(result)
+    return estimate_size(result)
+
+
+def run_scenario(name, dataset, df, repeat):
+    run = SCENARIOS[name][1](df)
+    timings = []
+    for _ in range(repeat):
+        _cold()
+        with _capture_figures() as figures:
+            start = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - start)
+    payload = _payload(result, figures)
+
+    _cold()
+    with PeakMemory() as memory:
+        run()
+    return {
+        "scenario": name,
+        "dataset": dataset,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "seconds": round(min(timings), 4),
+        "mean_seconds": round(sum(timings) / len(timings), 4),
+        "peak_mb": round(memory.peak_bytes / 1e6, 2),
+        "payload_bytes": payload,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scale, repeat, selected=None, datasets=None):
+    results = []
+    for dataset in datasets or DATASETS:
+        df = make_dataset(dataset, scale)
+        for name, (supported, _) in SCENARIOS.items():
+            if dataset not in supported or (selected and not any(pattern in name for pattern in selected)):
+                continue
+            try:
+                result = run_scenario(name, dataset, df, repeat)
+            except Exception as e:
+                result = {"scenario": name, "dataset": dataset, "rows": len(df), "columns": len(df.columns), "error": str(e)}
+            results.append(result)
+            print(_format_result(result), flush=True)
+    return results
+
+
+def _format_result(result):
+    if "error" in result:
+        return f"{result['scenario']:<40}{result['dataset']:<18}error: {result['error']}"
+    payload = "" if result["payload_bytes"] is None else f"{result['payload_bytes'] / 1e3:>12,.0f}"
+    return (f"{result['scenario']:<40}{result['dataset']:<18}{result['rows']:>10,}"
+            f"{result['seconds']:>10.3f}{result['peak_mb']:>10.1f}{payload:>12}")
+
+
+def write_results(results, path, scale, repeat):
+    metadata = {
+        "revision": _git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "scale": scale,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpus": os.cpu_count(),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # One record per line keeps diffs between two result files readable
+    with open(path, "w") as file:
+        file.write(json.dumps({"metadata": metadata}) + "\n")
+        for result in results:
+            file.write(json.dumps(result, sort_keys=True) + "\n")
+
+
+def read_results(path):
+    with open(path) as file:
+        lines = [json.loads(line) for line in file if line.strip()]
+    return lines[0]["metadata"], lines[1:]
+
+
+# Time and peak memory of each scenario in new relative to old
+def compare(old_path, new_path):
+    old_metadata, old = read_results(old_path)
+    new_metadata, new = read_results(new_path)
+    old = {(r["scenario"], r["dataset"]): r for r in old if "error" not in r}
+    print(f"{old_metadata['revision']} -> {new_metadata['revision']}")
+    print(f"{'scenario':<40}{'dataset':<18}{'old s':>10}{'new s':>10}{'time':>9}{'memory':>9}")
+    for result in new:
+        before = old.get((result["scenario"], result["dataset"]))
+        if before is None or "error" in result:
+            continue
+        time_ratio = result["seconds"] / before["seconds"] if before["seconds"] else float("nan")
+        memory_ratio = result["peak_mb"] / before["peak_mb"] if before["peak_mb"] else float("nan")
+        print(f"{result['scenario']:<40}{result['dataset']:<18}{before['seconds']:>10.3f}{result['seconds']:>10.3f}"
+              f"{time_ratio:>8.2f}x{memory_ratio:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the loader, processing steps and chart pages headlessly")
+    parser.add_argument("--scale", type=int, default=100_000, help="rows of the tall dataset; the others scale with it")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenario", action="append", help="only run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS))
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    parser.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    elif args.list:
+        for name, (datasets, _) in SCENARIOS.items():
+            print(f"{name:<40}{', '.join(datasets)}")
+    else:
+        print(f"{'scenario':<40}{'dataset':<18}{'rows':>10}{'seconds':>10}{'peak MB':>10}{'payload KB':>12}")
+        results = run_suite(args.scale, args.repeat, args.scenario, args.dataset)
+        output = args.output or os.path.join(RESULTS_DIRECTORY, f"{_git_revision() or 'results'}.json")
+        write_results(results, output, args.scale, args.repeat)
+        print(f"Wrote {len(results)} results to {output}")
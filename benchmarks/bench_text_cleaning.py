@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_cleaning import ENGINES, clean_columns
+from src.transforms import DEFAULT_SPECIAL_CHARS
+from datasets import make_text_frame
+
+
+def run(rows, columns, repeat):
+    df = make_text_frame(rows, columns).drop(columns="length")
+    print(f"{rows:,} rows x {columns} text columns, best of {repeat}")
+    print(f"{'engine':<10}{'chars':<20}{'workers':>8}{'seconds':>10}{'speedup':>10}")
+
+    for label, special_chars in [("explicit set", DEFAULT_SPECIAL_CHARS), ("non-alnum", "")]:
+        baseline = None
+        for engine in ENGINES[::-1]:
+            for workers in ([1] if engine == "python" else [1, None]):
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    clean_columns(df, df.columns, special_chars, engine, max_workers=workers)
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                if baseline is None:
+                    baseline = best
+                print(f"{engine:<10}{label:<20}{workers or 'auto':>8}{best:>10.3f}{baseline / best:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark special-character removal engines")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.rows, args.columns, args.repeat)
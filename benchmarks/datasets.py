@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic frames for the benchmarks. Every generator is seeded, so a given
+# size always produces the same data and results stay comparable.
+
+MISSING_FRACTION = 0.05
+
+
+def _with_missing(rng, values, fraction=MISSING_FRACTION):
+    values = pd.Series(values)
+    return values.mask(rng.random(len(values)) < fraction)
+
+
+# Mixed columns of a typical export: ids, numbers with gaps, a few
+# low-cardinality labels, date strings and flags
+def make_tall_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "quantity": rng.integers(0, 1000, rows),
+        "price": _with_missing(rng, rng.lognormal(3, 1, rows)),
+        "score": _with_missing(rng, rng.normal(50, 15, rows)),
+        "region": _with_missing(rng, rng.choice(["north", "south", "east", "west"], rows)),
+        "channel": rng.choice(["web", "store", "phone"], rows),
+        "date": pd.Series(pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, rows), unit="D")).dt.strftime("%d/%m/%Y"),
+        "active": rng.random(rows) < 0.7,
+    })
+
+
+# Few rows, many numeric columns
+def make_wide_frame(rows, columns=200, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        if i % 4 == 0:
+            data[f"int_{i}"] = rng.integers(0, 100, rows)
+        else:
+            data[f"float_{i}"] = _with_missing(rng, rng.normal(i, 1, rows))
+    return pd.DataFrame(data)
+
+
+# Text-heavy frame: short product-code style strings sprinkled with punctuation
+def make_text_frame(rows, columns=4, seed=0):
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list("abcdefghijklmnopqrstuvwxyz0123456789 !@#$%&*()-_,.;:?/"))
+    data = {}
+    for i in range(columns):
+        chars = rng.choice(alphabet, size=(rows, 24))
+        data[f"text_{i}"] = ["".join(row) for row in chars]
+    data["length"] = rng.integers(1, 500, rows)
+    return pd.DataFrame(data)
+
+
+# Unique keys and labels with many distinct values
+def make_high_cardinality_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "key": [f"key-{i:09d}" for i in rng.permutation(rows)],
+        "customer": _with_missing(rng, rng.integers(0, max(rows // 2, 1), rows).astype(str)),
+        "city": rng.choice([f"city-{i}" for i in range(min(rows, 50_000))], rows),
+        "amount": _with_missing(rng, rng.exponential(100, rows)),
+        "visits": rng.integers(0, 50, rows),
+    })
+
+
+# Interleaved readings of a few sensors, one per second each, with gaps
+def make_sensor_frame(rows, sensors=8, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = np.arange(rows) // sensors
+    return pd.DataFrame({
+        "time": pd.Timestamp("2024-01-01") + pd.to_timedelta(steps, unit="s"),
+        "sensor": pd.Categorical([f"sensor-{i}" for i in np.arange(rows) % sensors]),
+        "value": _with_missing(rng, np.sin(steps / 3600) + rng.normal(0, 0.1, rows)),
+    })
+
+
+# name -> (generator, rows per unit of scale)
+DATASETS = {
+    "tall": (make_tall_frame, 1.0),
+    "wide": (make_wide_frame, 0.02),
+    "text": (make_text_frame, 0.2),
+    "high_cardinality": (make_high_cardinality_frame, 0.5),
+    "sensor": (make_sensor_frame, 1.0),
+}
+
+
+def make_dataset(name, scale):
+    generator, rows_per_unit = DATASETS[name]
+    return generator(max(int(scale * rows_per_unit), 10))
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.recipe import OUTPUT_FORMATS, is_input_file, load_recipe, process_file
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+REPORT_FILE = "recipe_report.csv"
+REPORT_COLUMNS = ["file", "rows_in", "rows_out", "columns_out", "seconds", "status", "warnings"]
+
+
+# Runs in a worker process; errors are returned rather than raised so one bad
+# file does not sink the batch
+def _run_file(task):
+    input_path, output_path, recipe = task
+    start = time.perf_counter()
+    try:
+        result = process_file(input_path, output_path, recipe)
+        status = "ok"
+    except Exception as e:
+        result = {}
+        status = str(e)
+    return {"file": os.path.basename(input_path), **result, "seconds": round(time.perf_counter() - start, 3),
+            "status": status}
+
+
+# Apply a recipe to every supported file in input_directory, writing one
+# output per input. Returns the per-file report.
+def run_recipe(recipe, input_directory, output_directory, output_format="parquet", workers=DEFAULT_WORKERS):
+    os.makedirs(output_directory, exist_ok=True)
+    tasks = [(os.path.join(input_directory, name),
+              os.path.join(output_directory, os.path.splitext(name)[0] + OUTPUT_FORMATS[output_format]),
+              recipe)
+             for name in sorted(os.listdir(input_directory)) if is_input_file(name)]
+    if not tasks:
+        raise ValueError(f"No supported files in {input_directory}")
+
+    rows = []
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        for task in tasks:
+            rows.append(_run_file(task))
+            print(_format_row(rows[-1]), flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in as_completed([executor.submit(_run_file, task) for task in tasks]):
+                rows.append(future.result())
+                print(_format_row(rows[-1]), flush=True)
+    report = pd.DataFrame(rows, columns=REPORT_COLUMNS).astype({"rows_in": "Int64", "rows_out": "Int64", "columns_out": "Int64"})
+    return report.sort_values("file", ignore_index=True)
+
+
+def _format_row(row):
+    if row["status"] != "ok":
+        return f"{row['file']:<40}failed: {row['status']}"
+    return f"{row['file']:<40}{row['rows_in']:>12,}{row['rows_out']:>12,}{row['seconds']:>10.3f}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply a NeatPlot processing recipe to a directory of files")
+    parser.add_argument("recipe", help="recipe exported from the processing page (.json, .yaml or .yml)")
+    parser.add_argument("input_directory")
+    parser.add_argument("output_directory")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default="parquet", help="output file format")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes")
+    args = parser.parse_args()
+
+    try:
+        recipe = load_recipe(args.recipe)
+        print(f"{'file':<40}{'rows in':>12}{'rows out':>12}{'seconds':>10}")
+        report = run_recipe(recipe, args.input_directory, args.output_directory, args.format, args.workers)
+    except (OSError, ValueError) as e:
+        sys.exit(f"error: {e}")
+    report.to_csv(os.path.join(args.output_directory, REPORT_FILE), index=False)
+    failed = (report["status"] != "ok").sum()
+    print(f"Processed {len(report) - failed} of {len(report)} files; report in {REPORT_FILE}")
+    sys.exit(1 if failed else 0)
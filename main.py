@@ -1,9 +1,19 @@
+import pandas as pd
 import streamlit as st
 from streamlit_option_menu import option_menu
 from src.data_loader import load_data, load_saved_file, init_session_state, list_saved_files
 from src.data_processor import process_data
 from src.data_visualization import visualize_data
 from src.feature_engineering import feature_engineering
+from src.jobs import show_jobs_panel
+from src.instrumentation import start_trace
+from src.timing_panel import show_timing_panel
+
+# Loaded datasets are shared between sessions as views of one stored frame
+# (see src/dataset_store.py). With copy-on-write, writing through a view
+# (replacing a column, filling values) copies only the data written, so the
+# shared frame never changes and each session pays only for what it modifies.
+pd.set_option("mode.copy_on_write", True)
 
 # Set page config at the very beginning
 st.set_page_config(page_title="NeatPlot", page_icon="📈", layout="wide")
@@ -121,6 +131,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Every rerun records its timing spans in a fresh trace
+trace = start_trace()
+
 # Initialize session state
 init_session_state()
 
@@ -147,7 +160,10 @@ with st.sidebar:
             },
             "nav-link-selected": {"background-color": "#3b82f6", "color": "white", "font-weight": "600"},
         }
-    )    
+    )
+    show_jobs_panel()
+    show_timing = st.toggle("Timing panel", help="Where the time of each rerun goes: parsing, processing steps, aggregation, rendering")
+    timing_panel = st.container()
 # Main app logic
 def main():
     st.markdown("<h1 style='text-align: center; color: #1e40af;'>📈 NeatPlot</h1>", unsafe_allow_html=True)
@@ -178,7 +194,7 @@ def main():
     elif selected == "Processing Data":
         st.header("🔧 Data Preprocessing")
         if st.session_state.data is not None:
-            st.session_state.data = process_data(st.session_state.data)
+            st.session_state.data = process_data(st.session_state.data, st.session_state.load_options)
             # st.success("✅ Data processed successfully!")
             st.subheader("Preview of processed data")
             st.dataframe(st.session_state.data.head(), use_container_width=True)
@@ -195,6 +211,11 @@ def main():
     elif selected == "Feature Engineering":
         feature_engineering(st.session_state.data)
 
+    # Filled last so it covers everything the page did
+    if show_timing:
+        with timing_panel:
+            show_timing_panel(trace)
+
 
 
 # Footer
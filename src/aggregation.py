@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# Above this many rows charts switch to server-side aggregation in "Auto" mode
+LARGE_DATA_THRESHOLD = 100_000
+DENSITY_BINS = 200
+VIOLIN_QUANTILES = 1000
+MAX_DRAWN_POINTS = 20_000
+SAMPLE_STRATA = 20
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+# Count rows in a bins x bins grid. Returns (counts, x centers, y centers) with
+# counts laid out as rows of y for a heatmap; empty cells are NaN so they stay blank.
+def density_grid(x, y, bins=DENSITY_BINS):
+    x = _as_float(x)
+    y = _as_float(y)
+    mask = ~(np.isnan(x) | np.isnan(y))
+    counts, x_edges, y_edges = np.histogram2d(x[mask], y[mask], bins=bins)
+    counts = counts.T
+    counts[counts == 0] = np.nan
+    return counts, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+
+# Evenly spaced quantiles stand in for the raw values; a KDE over them
+# reproduces the shape of the full distribution
+def quantile_points(values, n=VIOLIN_QUANTILES):
+    values = pd.Series(values).dropna().to_numpy(dtype=np.float64)
+    if len(values) <= n:
+        return values
+    return np.quantile(values, np.linspace(0, 1, n))
+
+
+# Largest-Triangle-Three-Buckets: pick n_out indices that preserve the visual
+# shape of a line. x must already be sorted.
+def lttb_indices(x, y, n_out=MAX_DRAWN_POINTS):
+    x = _as_float(x)
+    y = _as_float(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start = min(end, n - 1)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+# Sample about n rows, drawing proportionally from quantile strata of one column
+# so the tails of its distribution stay represented
+def stratified_sample(df, n=MAX_DRAWN_POINTS, column=None, strata=SAMPLE_STRATA, random_state=0):
+    if len(df) <= n:
+        return df
+    fraction = n / len(df)
+    if column is None:
+        return df.sample(frac=fraction, random_state=random_state)
+    ranks = df[column].rank(method='first')
+    groups = pd.qcut(ranks, q=min(strata, int(ranks.count()) or 1), labels=False)
+    return df.groupby(groups, group_keys=False).sample(frac=fraction, random_state=random_state)
@@ -0,0 +1,123 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from src.readers import READERS, excel_sheet_names
+
+# Column added to a combined batch naming the file (and sheet) each row came from
+SOURCE_COLUMN = "source"
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+# One task per file, or per sheet when every sheet of a workbook is read.
+# Tasks carry the raw bytes so they can be pickled to worker processes.
+def batch_tasks(files, all_sheets=True):
+    tasks = []
+    for file in files:
+        extension = os.path.splitext(file.name)[1].lower()
+        if extension not in READERS:
+            raise ValueError(f"Unsupported file type: {extension}")
+        data = file.getvalue()
+        if READERS[extension][0] == "excel" and all_sheets:
+            for sheet in excel_sheet_names(io.BytesIO(data)):
+                tasks.append((f"{file.name}:{sheet}", extension, data, sheet))
+        else:
+            tasks.append((file.name, extension, data, None))
+    return tasks
+
+
+# Runs in a worker process; errors are returned rather than raised so one bad
+# file does not sink the batch
+def _run_task(task):
+    label, extension, data, sheet = task
+    reader = READERS[extension][1]
+    start = time.perf_counter()
+    try:
+        buffer = io.BytesIO(data)
+        frame = reader(buffer) if sheet is None else reader(buffer, sheet_name=sheet)
+        return label, frame, time.perf_counter() - start, None
+    except Exception as e:
+        return label, None, time.perf_counter() - start, str(e)
+
+
+def _kind(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "number"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "text"
+
+
+# Columns holding numbers in one source and text in another become strings in
+# every source. Columns that are entirely empty in a source do not count, and
+# compatible dtypes (int and float, say) are left for concat to widen.
+def unify_schemas(frames):
+    kinds = {}
+    for frame in frames:
+        for column in frame.columns:
+            if frame[column].notna().any():
+                kinds.setdefault(column, set()).add(_kind(frame[column].dtype))
+    conflicts = [column for column, found in kinds.items() if len(found) > 1]
+    if conflicts:
+        # astype rather than assign, which only takes string column names
+        frames = [frame.astype({c: "string" for c in conflicts if c in frame.columns}) for frame in frames]
+    return frames, conflicts
+
+
+# Concatenate frames (union of columns, in order of first appearance) with a
+# categorical source column in front
+def combine_frames(frames, labels):
+    frames, conflicts = unify_schemas(frames)
+    data = pd.concat(frames, ignore_index=True, sort=False)
+
+    name = SOURCE_COLUMN
+    while name in data.columns:
+        name = f"_{name}"
+    codes = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+    data.insert(0, name, pd.Categorical.from_codes(codes, categories=labels))
+    return data, conflicts
+
+
+# Read every task, in a process pool when workers > 1, and combine the results.
+# Returns (frame, per-source report, columns cast to string to unify the schema).
+# on_done(done, total) is called after each task finishes.
+def ingest(tasks, workers=DEFAULT_WORKERS, on_done=None):
+    results = [None] * len(tasks)
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        for i, task in enumerate(tasks):
+            results[i] = _run_task(task)
+            if on_done:
+                on_done(i + 1, len(tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_run_task, task): i for i, task in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if on_done:
+                    on_done(done, len(tasks))
+
+    report = pd.DataFrame([{
+        "source": label,
+        "rows": len(frame) if frame is not None else 0,
+        "columns": len(frame.columns) if frame is not None else 0,
+        "seconds": round(seconds, 3),
+        "status": error or "ok",
+    } for label, frame, seconds, error in results])
+
+    loaded = [(label, frame) for label, frame, _, error in results if error is None]
+    if not loaded:
+        raise ValueError("None of the files could be read")
+    # Category labels must be unique; repeated upload names get a counter
+    labels, seen = [], {}
+    for label, _ in loaded:
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else f"{label} ({seen[label]})")
+    data, conflicts = combine_frames([frame for _, frame in loaded], labels)
+    return data, report, conflicts
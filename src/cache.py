@@ -0,0 +1,227 @@
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.lazy_engine import is_lazy
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+# id(frame) -> (weak reference, version); entries drop out when the frame is freed
+_versions = {}
+# (path, size, mtime) -> content hash of saved files
+_file_hashes = {}
+# (upload id, size) -> content hash of uploaded files
+_upload_hashes = {}
+
+
+# Hash the full contents of a binary file object, leaving the pointer at the start
+def content_hash(file):
+    file.seek(0)
+    digest = hashlib.sha1()
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+# Content hash of a file on disk, recomputed only when its size or mtime changes
+def file_content_hash(file_path):
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        with open(file_path, 'rb') as file:
+            _file_hashes[key] = content_hash(file)
+    return _file_hashes[key]
+
+
+# Content hash of an uploaded file, computed once per upload. Streamlit gives
+# every upload its own file_id, so reruns reuse the hash instead of reading the
+# whole buffer again; file objects without an id are hashed on every call.
+def upload_hash(file):
+    file_id = getattr(file, "file_id", None)
+    if file_id is None:
+        return content_hash(file)
+    key = (file_id, file.size)
+    if key not in _upload_hashes:
+        _upload_hashes[key] = content_hash(file)
+    file.seek(0)
+    return _upload_hashes[key]
+
+
+# Hash of every row of a frame or column, index included
+def _row_hashes(data):
+    try:
+        return pd.util.hash_pandas_object(data, index=True)
+    except TypeError:
+        # Unhashable cells (lists, dicts from nested JSON) are hashed by their text
+        return pd.util.hash_pandas_object(data.astype(str), index=True)
+
+
+# Record the version of a frame whose content is already identified, such as
+# the content hash of the file it was parsed from or the pipeline stage that
+# produced it. A frame keeps the first version recorded for it.
+def set_version(df, version):
+    if is_lazy(df):
+        return
+    key = id(df)
+    entry = _versions.get(key)
+    if entry is not None and entry[0]() is df:
+        return
+    _versions[key] = (weakref.ref(df, lambda _: _versions.pop(key, None)), version)
+
+
+# Version identifier for a frame, used as the cache key of everything derived
+# from it: the version recorded with set_version, or else a hash of its schema
+# and every row. Frames are treated as immutable once versioned, so the result
+# is memoized for as long as the object lives. Lazy datasets are identified by
+# their source file and query plan instead.
+def dataset_fingerprint(df):
+    if is_lazy(df):
+        return df.fingerprint()
+    entry = _versions.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    digest = hashlib.sha1()
+    digest.update(repr((df.shape, [str(c) for c in df.columns], [str(t) for t in df.dtypes])).encode())
+    digest.update(_row_hashes(df).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    set_version(df, fingerprint)
+    return fingerprint
+
+
+# Version identifier for a single column, from its dtype and every value, so a
+# column keeps its version while other columns change
+def column_fingerprint(series):
+    digest = hashlib.sha1()
+    digest.update(repr((len(series), str(series.dtype))).encode())
+    digest.update(_row_hashes(series).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Approximate in-memory size of a cached value in bytes
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        # Long lists are extrapolated from their first items
+        head = value[:100]
+        head_size = sum(estimate_size(item) for item in head)
+        return sys.getsizeof(value) + (head_size * len(value) // len(head) if head else 0)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    # Plotly figures: size of the arrays and attributes held by their traces
+    if hasattr(value, "to_plotly_json"):
+        return estimate_size(value.to_plotly_json())
+    # Plain objects such as statistics sketches: size of their attributes
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+
+# Thread-safe LRU cache bounded by the total estimated size of its entries.
+# Streamlit serves every browser session from the same process, so instances
+# kept at module level are shared between sessions. on_evict(key, value) is
+# called for entries that are evicted, replaced or cleared, to release what
+# they hold outside the cache (files on disk, say).
+class LRUCache:
+    def __init__(self, max_bytes, name="cache", on_evict=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=None):
+        if size is None:
+            size = estimate_size(value)
+        released = []
+        with self._lock:
+            if key in self._entries:
+                old_value, old_size = self._entries.pop(key)
+                self._bytes -= old_size
+                if old_value is not value:
+                    released.append((key, old_value))
+            # Values larger than the whole budget are never stored
+            stored = size <= self.max_bytes
+            if stored:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    evicted_key, (evicted, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+                    self.evictions += 1
+                    released.append((evicted_key, evicted))
+        self._release(released)
+        return stored
+
+    def _release(self, entries):
+        if self.on_evict is not None:
+            for key, value in entries:
+                self.on_evict(key, value)
+
+    def get_or_compute(self, key, compute, size=None):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value, size)
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            released = [(key, value) for key, (value, _) in self._entries.items()]
+            self._entries.clear()
+            self._bytes = 0
+        self._release(released)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def format_cache_stats(stats):
+    return (f"{stats['name'].capitalize()}: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['entries']} entries, "
+            f"{stats['bytes'] / 1e6:.1f} / {stats['max_bytes'] / 1e6:.0f} MB used")
@@ -0,0 +1,170 @@
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from src.cache import file_content_hash
+from src.columnar import is_columnar, read_columnar_metadata, read_columnar_preview
+from src.readers import READERS
+
+# The index lives in its own subdirectory so SQLite's journal files never
+# change the modification time of the saved-files directory itself
+CATALOG_DIRECTORY = ".catalog"
+CATALOG_FILE = "catalog.sqlite"
+PREVIEW_ROWS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name TEXT PRIMARY KEY,
+    format TEXT,
+    rows INTEGER,
+    columns INTEGER,
+    schema TEXT,
+    size_bytes INTEGER,
+    mtime_ns INTEGER,
+    content_hash TEXT,
+    preview TEXT,
+    saved_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS failures (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size_bytes INTEGER,
+    error TEXT
+);
+"""
+
+LISTING_COLUMNS = ["name", "format", "rows", "columns", "size_bytes", "saved_at"]
+
+
+def catalog_path(directory):
+    return os.path.join(directory, CATALOG_DIRECTORY, CATALOG_FILE)
+
+
+# Connection committed on success and closed on exit
+@contextmanager
+def _connect(directory):
+    path = catalog_path(directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        connection.executescript(_SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def _entry_values(directory, file_name, data, rows=None, saved_at=None):
+    file_path = os.path.join(directory, file_name)
+    stat = os.stat(file_path)
+    preview = data.head(PREVIEW_ROWS).to_json(orient="split", date_format="iso", default_handler=str)
+    return (
+        file_name,
+        os.path.splitext(file_name)[1].lstrip('.').lower(),
+        int(len(data) if rows is None else rows),
+        len(data.columns),
+        json.dumps({str(column): str(dtype) for column, dtype in data.dtypes.items()}),
+        stat.st_size,
+        stat.st_mtime_ns,
+        file_content_hash(file_path),
+        preview,
+        saved_at or datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+    )
+
+
+# Index a file just saved from a frame already in memory
+def record_file(directory, file_name, data):
+    values = _entry_values(directory, file_name, data, saved_at=datetime.now().isoformat(timespec="seconds"))
+    with _connect(directory) as connection:
+        connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+        connection.execute("DELETE FROM failures WHERE name = ?", (file_name,))
+
+
+# Index a file that was written without going through record_file (older
+# saves, spilled uploads, files copied in by hand). Columnar files only have
+# their metadata and first rows read; other formats are parsed once.
+def _index_file(connection, directory, file_name):
+    file_path = os.path.join(directory, file_name)
+    if is_columnar(file_name):
+        metadata = read_columnar_metadata(file_path)
+        values = _entry_values(directory, file_name, read_columnar_preview(file_path, PREVIEW_ROWS), rows=metadata["rows"])
+    else:
+        with open(file_path, 'rb') as file:
+            data = READERS[os.path.splitext(file_name)[1].lower()][1](file)
+        values = _entry_values(directory, file_name, data)
+    connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values)
+
+
+# Bring the index in line with the directory. The directory is only listed
+# when its modification time changed, i.e. when files were added or removed.
+# Files that could not be indexed are recorded with their error and retried
+# once they change on disk. Returns (file name, error) for each of them.
+def sync_catalog(directory, is_data_file):
+    if not os.path.exists(directory):
+        return []
+    with _connect(directory) as connection:
+        directory_mtime = str(os.stat(directory).st_mtime_ns)
+        stored = connection.execute("SELECT value FROM meta WHERE key = 'directory_mtime'").fetchone()
+        failures = {name: (mtime_ns, size_bytes) for name, mtime_ns, size_bytes
+                    in connection.execute("SELECT name, mtime_ns, size_bytes FROM failures")}
+        if stored is None or stored[0] != directory_mtime:
+            on_disk = {f for f in os.listdir(directory) if is_data_file(f)}
+            known = {name for (name,) in connection.execute("SELECT name FROM files")}
+            gone = [(name,) for name in (known | set(failures)) - on_disk]
+            connection.executemany("DELETE FROM files WHERE name = ?", gone)
+            connection.executemany("DELETE FROM failures WHERE name = ?", gone)
+            pending = on_disk - known
+        else:
+            pending = set(failures)
+        for file_name in sorted(pending):
+            _index_or_record_failure(connection, directory, file_name, failures.get(file_name))
+        connection.execute("INSERT OR REPLACE INTO meta VALUES ('directory_mtime', ?)", (directory_mtime,))
+        return connection.execute("SELECT name, error FROM failures ORDER BY name").fetchall()
+
+
+# A file that failed before is only parsed again once its size or
+# modification time changed
+def _index_or_record_failure(connection, directory, file_name, failed_at):
+    try:
+        stat = os.stat(os.path.join(directory, file_name))
+    except FileNotFoundError:
+        connection.execute("DELETE FROM failures WHERE name = ?", (file_name,))
+        return
+    if failed_at == (stat.st_mtime_ns, stat.st_size):
+        return
+    try:
+        _index_file(connection, directory, file_name)
+        connection.execute("DELETE FROM failures WHERE name = ?", (file_name,))
+    except Exception as e:
+        connection.execute("INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)",
+                           (file_name, stat.st_mtime_ns, stat.st_size, str(e)))
+
+
+# Listing of every indexed file, newest first, straight from the index
+def list_entries(directory):
+    if not os.path.exists(catalog_path(directory)):
+        return pd.DataFrame(columns=LISTING_COLUMNS)
+    with _connect(directory) as connection:
+        return pd.read_sql_query(f"SELECT {', '.join(LISTING_COLUMNS)} FROM files ORDER BY saved_at DESC, name",
+                                 connection)
+
+
+# Full entry for one file, re-indexed first if the file changed since it was indexed
+def get_entry(directory, file_name):
+    with _connect(directory) as connection:
+        connection.row_factory = sqlite3.Row
+        row = connection.execute("SELECT * FROM files WHERE name = ?", (file_name,)).fetchone()
+        stat = os.stat(os.path.join(directory, file_name))
+        if row is None or row["mtime_ns"] != stat.st_mtime_ns or row["size_bytes"] != stat.st_size:
+            _index_file(connection, directory, file_name)
+            row = connection.execute("SELECT * FROM files WHERE name = ?", (file_name,)).fetchone()
+    entry = dict(row)
+    entry["schema"] = json.loads(entry["schema"])
+    entry["preview"] = pd.read_json(io.StringIO(entry["preview"]), orient="split", dtype=False, convert_dates=False)
+    return entry
@@ -0,0 +1,102 @@
+import json
+import os
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+COLUMNAR_EXTENSIONS = ('.parquet', '.arrow')
+SIDECAR_SUFFIX = ".meta.json"
+
+
+def is_columnar(file_name):
+    return file_name.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def sidecar_path(file_path):
+    return file_path + SIDECAR_SUFFIX
+
+
+# Write a frame as Parquet or uncompressed Arrow IPC (so it can be memory-mapped)
+# together with a JSON sidecar describing its dtypes and shape
+def save_columnar(data, file_path):
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == '.parquet':
+        pq.write_table(table, file_path)
+    elif extension == '.arrow':
+        feather.write_feather(table, file_path, compression="uncompressed")
+    else:
+        raise ValueError(f"Unsupported columnar format: {extension}")
+
+    return write_sidecar(file_path, len(data), data.dtypes)
+
+
+# Pandas dtypes a file with this Arrow schema loads as. Sidecars always record
+# pandas dtypes, whichever way the file was written.
+def schema_dtypes(schema):
+    return schema.empty_table().to_pandas().dtypes
+
+
+def write_sidecar(file_path, rows, dtypes):
+    metadata = {
+        "format": os.path.splitext(file_path)[1].lstrip('.').lower(),
+        "rows": int(rows),
+        "columns": [str(column) for column in dtypes.index],
+        "dtypes": {str(column): str(dtype) for column, dtype in dtypes.items()},
+        "size_bytes": os.path.getsize(file_path),
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(sidecar_path(file_path), 'w') as sidecar:
+        json.dump(metadata, sidecar, indent=2)
+    return metadata
+
+
+# Read the sidecar, falling back to the file's own schema if it is missing
+def read_columnar_metadata(file_path):
+    if os.path.exists(sidecar_path(file_path)):
+        with open(sidecar_path(file_path), 'r') as sidecar:
+            return json.load(sidecar)
+
+    if file_path.lower().endswith('.parquet'):
+        parquet_metadata = pq.read_metadata(file_path)
+        schema = parquet_metadata.schema.to_arrow_schema()
+        rows = parquet_metadata.num_rows
+    else:
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            schema = reader.schema
+            rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    return {
+        "format": os.path.splitext(file_path)[1].lstrip('.').lower(),
+        "rows": int(rows),
+        "columns": schema.names,
+        "dtypes": {str(column): str(dtype) for column, dtype in schema_dtypes(schema).items()},
+        "size_bytes": os.path.getsize(file_path),
+    }
+
+
+# Load only the requested columns; the file is memory-mapped so unread
+# columns are never paged in
+def load_columnar(file_path, columns=None):
+    if file_path.lower().endswith('.parquet'):
+        table = pq.read_table(file_path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+
+# First rows of a columnar file, read without touching the rest of it
+def read_columnar_preview(file_path, rows):
+    if file_path.lower().endswith('.parquet'):
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        batch = next(parquet_file.iter_batches(batch_size=rows), None)
+        return batch.to_pandas() if batch is not None else parquet_file.schema_arrow.empty_table().to_pandas()
+    with pa.memory_map(file_path) as source:
+        reader = pa.ipc.open_file(source)
+        if reader.num_record_batches == 0:
+            return reader.schema.empty_table().to_pandas()
+        return reader.get_batch(0).slice(0, rows).to_pandas()
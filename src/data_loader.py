@@ -1,29 +1,66 @@
 import streamlit as st
 import pandas as pd
+import hashlib
 import os
 from datetime import datetime
-import chardet
 import json
-import openpyxl
+import time
+import uuid
+from src.cache import LRUCache, estimate_size, file_content_hash, format_cache_stats, set_version, upload_hash
+from src.dataset_store import DatasetStore, SessionToken, format_store_stats
+from src.memory_optimizer import optimize_memory
+from src.readers import READERS, read_csv, read_excel, read_json
+from src.batch_ingest import DEFAULT_WORKERS, batch_tasks, ingest
+from src.streaming import DEFAULT_CHUNK_ROWS, read_csv_streaming, spill_csv_to_parquet
+from src.columnar import COLUMNAR_EXTENSIONS, SIDECAR_SUFFIX, is_columnar, load_columnar, read_columnar_metadata, save_columnar
+from src.catalog import get_entry, list_entries, record_file, sync_catalog
+from src.lazy_engine import LAZY_EXTENSIONS, lazy_available, scan_file
+from src.jobs import run_job
+from src.instrumentation import span, timed
 
 UPLOAD_DIRECTORY = "saved_files"
+SAVED_FILE_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.json') + COLUMNAR_EXTENSIONS
 
+# Formats offered when saving an upload; None keeps the original extension
+SAVE_FORMATS = {
+    "Original format": None,
+    "Parquet (columnar)": ".parquet",
+    "Arrow IPC (columnar, memory-mapped)": ".arrow",
+}
+
+# Memory budget for parsed uploads kept across reruns (in MB)
+PARSE_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_PARSE_CACHE_MB", "1024"))
+
+_parse_cache = LRUCache(PARSE_CACHE_MAX_MB * 1024 * 1024, name="parse cache")
+
+# Memory budget for saved files kept loaded for all sessions (in MB)
+DATASET_STORE_MAX_MB = int(os.environ.get("NEATPLOT_DATASET_STORE_MB", "2048"))
+
+_dataset_store = DatasetStore(DATASET_STORE_MAX_MB * 1024 * 1024)
+
+@timed("page: load data")
 def load_data():
     st.subheader("Data Loading")
 
+    if st.checkbox("Batch mode (several files, or every sheet of a workbook)"):
+        return load_batch()
+
     # File uploader
     uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx", "xls", "json"])
     
     if uploaded_file is not None:
         try:
             file_extension = os.path.splitext(uploaded_file.name)[1].lower()
+            optimize = st.checkbox("Optimize memory usage (downcast numbers, categorical and Arrow-backed strings)")
+            st.session_state.load_options = {"optimize": optimize}
             
-            if file_extension == '.csv':
-                data = load_csv(uploaded_file)
-            elif file_extension in ['.xlsx', '.xls']:
-                data = load_excel(uploaded_file)
-            elif file_extension == '.json':
-                data = load_json(uploaded_file)
+            if file_extension == '.csv' and st.checkbox("Streaming ingestion (chunked, with progress)"):
+                data, report = load_csv_streaming(uploaded_file, optimize)
+                if data is None:
+                    return None
+            elif file_extension in READERS:
+                kind, parser = READERS[file_extension]
+                data, report = _cached_parse(uploaded_file, kind, parser, optimize)
             else:
                 st.error(f"Unsupported file type: {file_extension}")
                 return None
@@ -31,10 +68,14 @@ def load_data():
             # Display the first few rows of the data
             st.write("Preview of the data:")
             st.write(data.head())
+            if report is not None:
+                show_memory_report(report)
+            st.caption(format_cache_stats(parse_cache_stats()))
             
             # Option to save the uploaded file
+            save_format = st.selectbox("Save format", list(SAVE_FORMATS.keys()))
             if st.button("Save Uploaded File"):
-                saved_filename = save_uploaded_file(data, file_extension)
+                saved_filename = save_uploaded_file(data, SAVE_FORMATS[save_format] or file_extension)
                 st.session_state.uploaded_files.append(saved_filename)
             
             return data
@@ -44,23 +85,160 @@ def load_data():
     
     return None
 
-def load_csv(file):
-    # Detect the file encoding
-    raw_data = file.read()
-    detected_encoding = chardet.detect(raw_data)['encoding']
-    
-    # Reset the file pointer to the beginning
-    file.seek(0)
-    
-    # Try to read the CSV file with the detected encoding
-    return pd.read_csv(file, encoding=detected_encoding)
+# Load many files or sheets concurrently into one frame with a source column
+@timed("loader: batch")
+def load_batch():
+    uploaded_files = st.file_uploader("Choose files", type=["csv", "xlsx", "xls", "json"], accept_multiple_files=True)
+    if not uploaded_files:
+        return None
 
-def load_excel(file):
-    return pd.read_excel(file)
+    try:
+        all_sheets = st.checkbox("Read every sheet of Excel workbooks", value=True)
+        workers = int(st.number_input("Worker processes", min_value=1, value=DEFAULT_WORKERS))
+        optimize = st.checkbox("Optimize memory usage (downcast numbers, categorical and Arrow-backed strings)", key="batch_optimize")
+        st.session_state.load_options = {"optimize": optimize}
 
-def load_json(file):
-    json_data = json.load(file)
-    return pd.json_normalize(json_data)
+        key = ("batch", tuple((f.name, upload_hash(f)) for f in uploaded_files), all_sheets)
+
+        tasks = batch_tasks(uploaded_files, all_sheets)
+
+        def build(job):
+            start = time.perf_counter()
+            data, report, conflicts = ingest(tasks, workers,
+                                             on_done=lambda done, total: job.report(done / total, f"{done}/{total} sources"))
+            _parse_cache.put(key + ("report",), (report, conflicts, time.perf_counter() - start))
+            return data
+
+        data, memory_report = _cached_load(key, build, optimize, label="Reading files")
+        batch_report = _parse_cache.get(key + ("report",))
+        if batch_report is not None:
+            show_batch_report(*batch_report)
+
+        st.write("Preview of the data:")
+        st.write(data.head())
+        if memory_report is not None:
+            show_memory_report(memory_report)
+        st.caption(format_cache_stats(parse_cache_stats()))
+
+        save_format = st.selectbox("Save format", list(SAVE_FORMATS.keys()))
+        if st.button("Save Combined File"):
+            saved_filename = save_uploaded_file(data, SAVE_FORMATS[save_format] or '.csv')
+            st.session_state.uploaded_files.append(saved_filename)
+
+        return data
+
+    except Exception as e:
+        st.error(f"An error occurred while loading the files: {str(e)}")
+
+    return None
+
+def show_batch_report(report, conflicts, seconds):
+    st.write(f"Read {len(report)} sources in {seconds:.2f} s (sum of per-source times {report['seconds'].sum():.2f} s)")
+    st.dataframe(report, use_container_width=True)
+    failed = report[report["status"] != "ok"]
+    if not failed.empty:
+        st.warning(f"Skipped {len(failed)} source(s) that could not be read.")
+    if conflicts:
+        st.info(f"Columns read as text because their types differ between sources: {', '.join(map(str, conflicts))}")
+
+# Build a frame once per cache key; reruns are served from memory. build(job)
+# runs as a background job, so reruns during the load attach to it. The memory
+# optimizer, when requested, also runs once and its report is cached with the frame.
+def _cached_load(key, build, optimize=False, label="Loading"):
+    if optimize:
+        key = key + ("optimized",)
+    entry = _parse_cache.get(key)
+    if entry is None:
+        entry = run_job(key, label, lambda job: _build_entry(job, build, optimize))
+        _parse_cache.put(key, entry, size=estimate_size(entry[0]))
+    data, report = entry
+    # Hand out a shallow copy so column edits never touch the cached frame.
+    # The key holds the content hash of every source, so it versions the frame.
+    data = data.copy(deep=False)
+    set_version(data, load_version(key))
+    return data, report
+
+# Version of a frame loaded under a cache key made of content hashes and options
+def load_version(key):
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+def _build_entry(job, build, optimize):
+    with span("loader: parse"):
+        data, report = build(job), None
+    if optimize:
+        job.report(None, "optimizing memory")
+        with span("loader: optimize memory"):
+            data, report = optimize_memory(data)
+    return data, report
+
+# Parse a file once per distinct content
+def _cached_parse(file, kind, parser, optimize=False):
+    return _cached_load((kind, upload_hash(file)), lambda job: parser(file), optimize, label=f"Parsing {file.name}")
+
+def parse_cache_stats():
+    return _parse_cache.stats()
+
+def load_csv(file, optimize=False):
+    return _cached_parse(file, "csv", read_csv, optimize)[0]
+
+def load_excel(file, optimize=False):
+    return _cached_parse(file, "excel", read_excel, optimize)[0]
+
+def load_json(file, optimize=False):
+    return _cached_parse(file, "json", read_json, optimize)[0]
+
+def show_memory_report(report):
+    before = report["bytes before"].sum()
+    after = report["bytes after"].sum()
+    with st.expander(f"Memory optimization: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB"):
+        st.dataframe(report, use_container_width=True)
+
+# Read a CSV chunk by chunk, showing the preview as soon as the first chunk lands
+def load_csv_streaming(file, optimize=False):
+    col1, col2 = st.columns(2)
+    with col1:
+        chunk_rows = int(st.number_input("Rows per chunk", min_value=1000, value=DEFAULT_CHUNK_ROWS, step=10000))
+    with col2:
+        row_limit = int(st.number_input("Stop after this many rows (0 = read everything)", min_value=0, value=0, step=10000)) or None
+    spill = st.checkbox("Spill to disk (for files larger than memory)")
+
+    file_hash = upload_hash(file)
+
+    if spill:
+        # Stream into a Parquet file in saved_files, then load only the columns needed from it
+        key = ("spill", file_hash, row_limit)
+        file_path = _parse_cache.get(key)
+        if file_path is None or not os.path.exists(file_path):
+            if not os.path.exists(UPLOAD_DIRECTORY):
+                os.makedirs(UPLOAD_DIRECTORY)
+            file_name = f"uploaded_file_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
+
+            # The path is chosen when the job starts; reruns attaching to it get that path back
+            def spill(job, file_path=os.path.join(UPLOAD_DIRECTORY, file_name)):
+                spill_csv_to_parquet(file, file_path, chunk_rows, row_limit, on_chunk=_streaming_progress(job))
+                return file_path
+
+            file_path = run_job(key, "Spilling to Parquet", spill)
+            file_name = os.path.basename(file_path)
+            _parse_cache.put(key, file_path)
+            st.session_state.uploaded_files.append(file_name)
+            st.success(f"Spilled to {file_name}")
+        return load_saved_columnar_file(file_path), None
+
+    key = ("csv", file_hash) if row_limit is None else ("csv", file_hash, row_limit)
+    return _cached_load(key, lambda job: read_csv_streaming(file, chunk_rows, row_limit, on_chunk=_streaming_progress(job)),
+                        optimize, label="Streaming CSV")
+
+# Build a chunk callback that reports progress and throughput to the job, with
+# the first chunk as an early preview
+def _streaming_progress(job):
+    def on_chunk(chunk, progress):
+        job.report(progress["fraction"],
+                   f"{progress['rows']:,} rows · {progress['bytes_read'] / 1e6:.1f} / {progress['total_bytes'] / 1e6:.1f} MB · "
+                   f"{progress['rows_per_s']:,.0f} rows/s · {progress['mb_per_s']:.1f} MB/s",
+                   partial=chunk.head() if progress["rows"] == len(chunk) else None)
+
+    return on_chunk
 
 def save_uploaded_file(data, file_extension):
     # Create a 'saved_files' directory if it doesn't exist
@@ -79,58 +257,153 @@ def save_uploaded_file(data, file_extension):
         data.to_excel(file_path, index=False)
     elif file_extension == '.json':
         data.to_json(file_path, orient='records')
+    elif file_extension in COLUMNAR_EXTENSIONS:
+        save_columnar(data, file_path)
+    record_file(UPLOAD_DIRECTORY, file_name, data)
     
     st.success(f"File saved as {file_name}")
     return file_name
 
+@timed("page: load saved file")
 def load_saved_file():
     st.subheader("Load Saved File")
 
-    # Get list of saved files
-    saved_files = [f for f in os.listdir(UPLOAD_DIRECTORY) if f.endswith(('.csv', '.xlsx', '.xls', '.json'))]
+    # Saved files and their metadata come from the catalog, not from the files themselves
+    entries = saved_file_entries()
 
-    if not saved_files:
+    if entries.empty:
         st.warning("No saved files found.")
         return None
 
+    query = st.text_input("Filter saved files by name")
+    if query:
+        entries = entries[entries["name"].str.contains(query, case=False, regex=False)]
+    listing = entries.assign(size_mb=(entries["size_bytes"] / 1e6).round(2)).drop(columns="size_bytes")
+    st.dataframe(listing, use_container_width=True, hide_index=True, height=min(35 * (len(listing) + 1) + 3, 300))
+
     # Let user select a file
-    selected_file = st.selectbox("Choose a file to load", saved_files)
+    selected_file = st.selectbox("Choose a file to load", entries["name"].tolist())
 
     if selected_file:
         file_path = os.path.join(UPLOAD_DIRECTORY, selected_file)
         file_extension = os.path.splitext(selected_file)[1].lower()
-
         try:
-            if file_extension == '.csv':
-                data = pd.read_csv(file_path)
+            show_catalog_entry(get_entry(UPLOAD_DIRECTORY, selected_file))
+
+            lazy = file_extension in LAZY_EXTENSIONS and st.checkbox(
+                "Lazy query mode (Polars)", disabled=not lazy_available(),
+                help="Query the file in place: pages only read the columns and rows each result needs. Requires polars.")
+
+            if lazy:
+                return load_saved_lazy_file(file_path)
+            if is_columnar(selected_file):
+                return load_saved_columnar_file(file_path, summary=False)
+            elif file_extension == '.csv':
+                data = _shared_load(file_path, "csv", lambda: pd.read_csv(file_path))
             elif file_extension in ['.xlsx', '.xls']:
-                data = pd.read_excel(file_path)
+                data = _shared_load(file_path, "excel", lambda: pd.read_excel(file_path))
             elif file_extension == '.json':
-                with open(file_path, 'r') as json_file:
-                    json_data = json.load(json_file)
-                data = pd.json_normalize(json_data)
+                data = _shared_load(file_path, "json", lambda: _read_saved_json(file_path))
             else:
                 st.error(f"Unsupported file type: {file_extension}")
                 return None
 
-            # Display the first few rows of the data
-            st.write("Preview of the data:")
-            st.write(data.head())
-            
             return data
         except Exception as e:
             st.error(f"An error occurred while loading the file: {str(e)}")
 
     return None
 
+# Columnar files are memory-mapped and only the chosen columns are read.
+# summary=False skips the shape line and preview when the catalog already showed them.
+def load_saved_columnar_file(file_path, summary=True):
+    metadata = read_columnar_metadata(file_path)
+    if summary:
+        st.write(f"{metadata['rows']:,} rows × {len(metadata['columns'])} columns ({metadata['format']}, {metadata['size_bytes'] / 1e6:.1f} MB on disk)")
+
+    columns = st.multiselect("Columns to load:", metadata['columns'], default=metadata['columns'])
+    if not columns:
+        st.warning("Please select at least one column to load.")
+        return None
+
+    start = time.perf_counter()
+    data = _shared_load(file_path, "columnar", lambda: load_columnar(file_path, columns=columns), tuple(columns))
+    st.caption(f"Loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    if summary:
+        # Display the first few rows of the data
+        st.write("Preview of the data:")
+        st.write(data.head())
+
+    return data
+
+# Shape, schema and preview of a saved file as recorded in the catalog
+def show_catalog_entry(entry):
+    st.write(f"{entry['rows']:,} rows × {entry['columns']} columns ({entry['format']}, "
+             f"{entry['size_bytes'] / 1e6:.1f} MB on disk, saved {entry['saved_at']})")
+    with st.expander("Schema"):
+        st.dataframe(pd.Series(entry["schema"], name="dtype"), use_container_width=True)
+    st.write("Preview of the data:")
+    st.dataframe(entry["preview"], use_container_width=True, hide_index=True)
+
+def _read_saved_json(file_path):
+    with open(file_path, 'r') as json_file:
+        json_data = json.load(json_file)
+    return pd.json_normalize(json_data)
+
+# Saved files are loaded once per content for all sessions, in a background
+# job; each session gets a copy-on-write view of the shared frame
+def _shared_load(file_path, kind, load, columns=None):
+    key = (file_content_hash(file_path), kind, columns)
+    label = f"Loading {os.path.basename(file_path)}"
+    with span(f"loader: {kind}", file=os.path.basename(file_path)):
+        data = _dataset_store.acquire(key, st.session_state.session_id,
+                                      lambda: run_job(("saved",) + key, label, lambda job: load()))
+    set_version(data, load_version(key))
+    others = _dataset_store.sessions(key) - 1
+    if others > 0:
+        st.caption(f"Shared with {others} other session(s)")
+    st.caption(format_store_stats(dataset_store_stats()))
+    return data
+
+def dataset_store_stats():
+    return _dataset_store.stats()
+
+# Register the file as a lazy scan; only the preview rows and the row count are computed
+def load_saved_lazy_file(file_path):
+    start = time.perf_counter()
+    data = scan_file(file_path)
+    st.write(f"{len(data):,} rows × {len(data.columns)} columns (lazy scan, not loaded into memory)")
+    st.caption(f"Scanned in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    st.write("Preview of the data:")
+    st.write(data.head())
+
+    return data
+
 # Initialize session state
 def init_session_state():
     if 'data' not in st.session_state:
         st.session_state.data = None
     if 'uploaded_files' not in st.session_state:
         st.session_state.uploaded_files = []
+    # Load settings of the current data, exported with the processing recipe
+    if 'load_options' not in st.session_state:
+        st.session_state.load_options = {"optimize": False}
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+        st.session_state.session_token = SessionToken(_dataset_store, st.session_state.session_id)
+
+def _is_saved_file(file_name):
+    return file_name.endswith(SAVED_FILE_EXTENSIONS) and not file_name.endswith(SIDECAR_SUFFIX)
+
+# Catalog listing of saved files, after indexing any added outside the app
+@timed("catalog: sync and list")
+def saved_file_entries():
+    for file_name, error in sync_catalog(UPLOAD_DIRECTORY, _is_saved_file):
+        st.warning(f"Could not index {file_name}: {error}")
+    return list_entries(UPLOAD_DIRECTORY)
 
 # Function to list saved files
 def list_saved_files():
-    saved_files = [f for f in os.listdir(UPLOAD_DIRECTORY) if f.endswith(('.csv', '.xlsx', '.xls', '.json'))]
-    return saved_files
\ No newline at end of file
+    return saved_file_entries()["name"].tolist()
\ No newline at end of file
@@ -1,147 +1,229 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import re
+import os
+import shutil
 from datetime import datetime
-
-def process_data(df):
+from src.cache import LRUCache, dataset_fingerprint, format_cache_stats
+from src.export import EXPORT_FORMATS, SessionExport, available_formats, export_cache_stats, export_file
+from src.jobs import run_job
+from src.instrumentation import timed
+from src.pipeline import CachedPipeline
+from src.missing_values import FILL_METHODS
+from src.recipe import STEPS, add_step, dump_recipe, new_recipe, step_params, yaml
+from src.profiling import column_profile, columns_of_kind, profile_frame, remember_profile, update_profile
+from src.type_conversion import CONVERSION_TYPES, conversion_cache_stats
+from src.transforms import DEFAULT_SPECIAL_CHARS
+
+# Memory budget for cached preprocessing stage outputs (in MB)
+PIPELINE_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_PIPELINE_CACHE_MB", "512"))
+
+_stage_cache = LRUCache(PIPELINE_CACHE_MAX_MB * 1024 * 1024, name="pipeline cache")
+
+# Where "Save to cleaned_data/" puts exports
+CLEANED_DATA_DIRECTORY = "cleaned_data"
+
+@timed("page: process data")
+def process_data(df, load_options=None):
     st.write(df.head(11))
+    # Each step below runs as a cached pipeline stage, so changing one step
+    # only recomputes that step and the ones after it
+    pipeline = CachedPipeline(df, _stage_cache, run=run_stage)
+    # The widgets only build a recipe; every step runs through the recipe
+    # engine, so an exported recipe reproduces this page outside the app
+    recipe = new_recipe(**(load_options or {}))
+    # The column profile is computed once for the loaded data, then carried
+    # through the steps, updating only the columns each step touches
+    profile = pipeline.compute("profile", column_profile)
+
     # Step 1: Data Overview
     st.subheader("1. Data Overview")
     st.write("Original Data Shape:", df.shape)
-    st.write("Data Types:")
-    st.dataframe(df.dtypes,use_container_width=True, width=100)
+    st.write("Column Profile:")
+    show_profile(profile)
     st.write("Data Preview:")
 
     # Step 2: Select Columns
     st.subheader("2. Select Columns")
     selected_columns = st.multiselect("Select columns to keep:", df.columns.tolist(), default=df.columns.tolist())
-    df = df[selected_columns]
+    apply_step(pipeline, recipe, "select_columns", columns=selected_columns)
+    profile = pipeline.compute("profile", lambda _: profile.loc[selected_columns])
     st.write("Selected Data Preview:")
-    st.write(df.head())
-    st.write("Selected Data Shape:", df.shape)
+    st.write(pipeline.df.head())
+    st.write("Selected Data Shape:", pipeline.df.shape)
 
     # Step 3: Handle Missing Values
     st.subheader("3. Handle Missing Values")
-    df = handle_missing_values(df)
+    profile = handle_missing_values(pipeline, recipe, profile)
 
     # Step 4: Convert Data Types
     st.subheader("4. Convert Data Types")
-    df = convert_data_types(df)
+    profile = convert_data_types(pipeline, recipe, profile)
 
     # Step 5: Remove Special Characters
     st.subheader("5. Remove Special Characters")
-    df = remove_special_characters(df)
+    profile = remove_special_characters(pipeline, recipe, profile)
 
     # Final Step: Display Processed Data
+    df = pipeline.df
+    # Visualization and later pages reuse the carried profile instead of rescanning
+    remember_profile(df, profile)
     st.subheader("Final Processed Data")
     st.write(df.head())
     st.write("Final Data Shape:", df.shape)
+    st.caption(format_cache_stats(pipeline_cache_stats()))
+    show_recipe_export(recipe)
 
-    # Add download button
-    if st.button("Download Cleaned Data"):
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-        )
+    # Export, streamed to disk in chunks and kept per data version
+    st.subheader("Export Cleaned Data")
+    show_export(df)
 
     return df
 
-def handle_missing_values(df):
+# Record a step in the recipe and run it as a pipeline stage with the same
+# parameters, so the exported recipe repeats exactly what this page did.
+# known holds parameters the page already has from the carried profile (the
+# columns with missing values): they spare the step a scan of the frame but
+# stay out of the recipe, which works them out on each file it runs on.
+def apply_step(pipeline, recipe, name, known=None, **params):
+    step = add_step(recipe, name, **params)
+    return pipeline.apply(name, STEPS[name], **step_params(step), **step_params(known or {}))
+
+# Download the recipe built on this page, to rerun it with cli.py
+def show_recipe_export(recipe):
+    formats = ["JSON", "YAML"] if yaml is not None else ["JSON"]
+    with st.expander("Export recipe"):
+        recipe_format = st.radio("Recipe format", formats, horizontal=True)
+        as_yaml = recipe_format == "YAML"
+        text = dump_recipe(recipe, as_yaml)
+        st.code(text, language="yaml" if as_yaml else "json")
+        st.download_button("Download recipe", text,
+                           file_name=f"neatplot_recipe.{'yaml' if as_yaml else 'json'}",
+                           mime="application/x-yaml" if as_yaml else "application/json")
+        st.caption("Apply it to a directory of files with: python cli.py recipe input_dir output_dir")
+
+# Write the processed data to a file in the chosen format and offer it for
+# download. A toggle rather than a button, so the rerun caused by clicking the
+# download button still finds the export.
+def show_export(df):
+    label = st.selectbox("Export format", available_formats())
+    key = ("export", dataset_fingerprint(df), label)
+    # An export the cache could not keep stays on disk for this session until
+    # the data or format changes
+    held = st.session_state.get("session_export")
+    if held is not None and (held.key != key or not os.path.exists(held.file_path)):
+        held.release()
+        held = st.session_state.session_export = None
+    if not st.toggle("Prepare export"):
+        return
+    _, _, extension, mime = EXPORT_FORMATS[label]
+    if held is not None:
+        file_path, source = held.file_path, "kept for this session"
+    else:
+        file_path, from_cache, kept = run_job(
+            key, f"Exporting {label}",
+            lambda job: export_file(df, label, on_progress=lambda fraction: job.report(fraction, f"{fraction:.0%} written")))
+        if not kept:
+            st.session_state.session_export = SessionExport(key, file_path)
+        source = "from the export cache" if from_cache else "just written"
+    file_name = f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
+    with open(file_path, "rb") as file:
+        st.download_button(f"Download {label}", file, file_name=file_name, mime=mime)
+    if st.button("Save to cleaned_data/"):
+        os.makedirs(CLEANED_DATA_DIRECTORY, exist_ok=True)
+        shutil.copyfile(file_path, os.path.join(CLEANED_DATA_DIRECTORY, file_name))
+        st.success(f"Saved {file_name} to {CLEANED_DATA_DIRECTORY}/")
+    st.caption(f"{os.path.getsize(file_path) / 1e6:,.1f} MB, {source}. {format_cache_stats(export_cache_stats())}")
+
+# Pipeline stages run as background jobs, keyed by their version
+def run_stage(version, name, compute):
+    return run_job(("stage", version), name.replace("_", " ").capitalize(), lambda job: compute())
+
+# Display the (level, message) notes returned by a pipeline stage
+def show_notes(notes):
+    for level, message in notes:
+        getattr(st, level)(message)
+
+def pipeline_cache_stats():
+    return _stage_cache.stats()
+
+def show_profile(profile, height=None):
+    # Min/max mix numbers and timestamps, so they are displayed as text
+    display = profile.astype({"min": str, "max": str}).replace("nan", "")
+    st.dataframe(display, use_container_width=True, height=height)
+
+def handle_missing_values(pipeline, recipe, profile):
+    # Null counts come from the column profile, so no step rescans the frame for them
     st.write("Columns with missing values:")
-    missing = df.isnull().sum()
+    missing = profile["nulls"]
     missing_cols = missing[missing > 0]
     st.write(missing_cols)
 
     if not missing_cols.empty:
         columns_to_drop = st.multiselect("Select columns to drop (if any):", missing_cols.index.tolist())
-        
-        if columns_to_drop:
-            df = df.drop(columns=columns_to_drop)
-            st.write(f"Dropped columns: {', '.join(columns_to_drop)}")
+        show_notes(apply_step(pipeline, recipe, "drop_columns", columns=columns_to_drop))
+        profile = pipeline.compute("profile", lambda _: profile.drop(index=columns_to_drop))
 
-        remaining_missing = df.isnull().sum()
-        remaining_missing_cols = remaining_missing[remaining_missing > 0]
+        missing = profile["nulls"]
+        remaining_missing_cols = missing[missing > 0]
 
         if not remaining_missing_cols.empty:
             st.write("Remaining columns with missing values:")
             st.write(remaining_missing_cols)
 
-            method = st.radio("Choose method to handle remaining missing values:", 
-                              ["Drop rows", "Fill with mean/mode", "Fill with median"])
+            method = st.radio("Choose method to handle remaining missing values:", FILL_METHODS)
+            # Recorded without a column list, so the recipe fills whichever
+            # columns have missing values in any file it is later run on
+            show_notes(apply_step(pipeline, recipe, "fill_missing", method=method,
+                                  known={"columns": remaining_missing_cols.index.tolist()}))
 
             if method == "Drop rows":
-                df = df.dropna()
-                st.write("Rows with missing values have been dropped.")
-            elif method == "Fill with mean/mode":
-                for col in remaining_missing_cols.index:
-                    if df[col].dtype in ['int64', 'float64']:
-                        df[col].fillna(df[col].mean(), inplace=True)
-                    else:
-                        df[col].fillna(df[col].mode()[0], inplace=True)
-                st.write("Missing values have been filled with mean/mode.")
-            elif method == "Fill with median":
-                for col in remaining_missing_cols.index:
-                    if df[col].dtype in ['int64', 'float64']:
-                        df[col].fillna(df[col].median(), inplace=True)
-                    else:
-                        df[col].fillna(df[col].mode()[0], inplace=True)
-                st.write("Missing values have been filled with median.")
+                # Dropping rows changes every column's statistics
+                profile = pipeline.compute("profile", profile_frame)
+            else:
+                profile = pipeline.compute("profile", lambda df: update_profile(profile, df, remaining_missing_cols.index))
+            missing = profile["nulls"]
 
     st.write("Missing values after handling:")
-    st.dataframe(df.isnull().sum(), use_container_width=True, height=500, width=100)
-    return df
+    st.dataframe(missing, use_container_width=True, height=500, width=100)
+    return profile
 
-def convert_data_types(df):
+def convert_data_types(pipeline, recipe, profile):
     st.write("Current data types:")
-    st.dataframe(df.dtypes, use_container_width=True, height=500, width=100)
+    st.dataframe(profile["dtype"], use_container_width=True, height=500, width=100)
 
-    columns_to_convert = st.multiselect("Select columns to convert:", df.columns.tolist())
+    columns_to_convert = st.multiselect("Select columns to convert:", pipeline.df.columns.tolist())
 
+    conversions = []
     for column in columns_to_convert:
-        new_type = st.selectbox(f"Select new data type for {column}:", ["int", "float", "string", "datetime"], key=f"dtype_{column}")
-
-        try:
-            if new_type == "int":
-                df[column] = df[column].astype(int)
-            elif new_type == "float":
-                df[column] = df[column].astype(float)
-            elif new_type == "string":
-                df[column] = df[column].astype(str)
-            elif new_type == "datetime":
-                df[column] = pd.to_datetime(df[column])
-            st.success(f"Successfully converted {column} to {new_type}")
-        except Exception as e:
-            st.error(f"Error converting data type for {column}: {str(e)}")
+        new_type = st.selectbox(f"Select new data type for {column}:", CONVERSION_TYPES, key=f"dtype_{column}")
+        conversions.append([column, new_type])
+
+    # Each column's conversion is cached on its own, so adding a column only converts that column
+    show_notes(apply_step(pipeline, recipe, "convert_types", conversions=conversions))
+    if conversions:
+        st.caption(format_cache_stats(conversion_cache_stats()))
+    profile = pipeline.compute("profile", lambda df: update_profile(profile, df, columns_to_convert))
 
     st.write("Updated data types:")
-    st.dataframe(df.dtypes, use_container_width=True, height=500, width=100)
-    return df
+    st.dataframe(profile["dtype"], use_container_width=True, height=500, width=100)
+    return profile
 
-def remove_special_characters(df):
+def remove_special_characters(pipeline, recipe, profile):
     st.write("Select columns to remove special characters:")
-    string_columns = df.select_dtypes(include=['object']).columns
+    string_columns = columns_of_kind(profile, "categorical")
     columns_to_clean = st.multiselect("Choose columns:", string_columns)
 
     if columns_to_clean:
-        special_chars = st.text_input("Enter special characters to remove (leave empty to remove all non-alphanumeric):", 
-                                      value="!@#$%^&*()_+-={}[]|\\:;\"'<>,?/~`")
-        
-        if special_chars:
-            pattern = f'[{re.escape(special_chars)}]'
-        else:
-            pattern = '[^a-zA-Z0-9\s]'
-        
-        for column in columns_to_clean:
-            df[column] = df[column].astype(str).apply(lambda x: re.sub(pattern, '', x))
-            st.write(f"Removed special characters from {column}")
-        
+        special_chars = st.text_input("Enter special characters to remove (leave empty to remove all non-alphanumeric):",
+                                      value=DEFAULT_SPECIAL_CHARS)
+
+        show_notes(apply_step(pipeline, recipe, "remove_characters",
+                              columns=columns_to_clean, special_chars=special_chars))
+        profile = pipeline.compute("profile", lambda df: update_profile(profile, df, columns_to_clean))
+
         st.write("Preview after removing special characters:")
-        st.write(df[columns_to_clean].head())
+        st.write(pipeline.df[columns_to_clean].head())
     else:
         st.write("No columns selected for special character removal.")
-
-    return df #a
\ No newline at end of file
+    return profile
@@ -1,16 +1,45 @@
 import streamlit as st
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
+from src.cache import LRUCache, dataset_fingerprint, format_cache_stats
+from src.aggregation import LARGE_DATA_THRESHOLD, MAX_DRAWN_POINTS, density_grid, lttb_indices, quantile_points, stratified_sample
+from src.lazy_engine import is_lazy
+from src.jobs import run_job
+from src.instrumentation import span, timed
+from src.profiling import column_profile, columns_of_kind
+from src.sketches import describe_sketches, sketch_column, streaming_corr
+from src.timeseries import RESAMPLE_RULES, auto_rule, resample, rows_in_range, sort_index_cache_stats, sorted_rows
+from src.webgl import line_figure, line_trace, scatter_figure
 
+RENDER_MODES = ["Auto", "Full detail", "Aggregated"]
+STATS_MODES = ["Auto", "Approximate", "Exact"]
+
+# Memory budget for built figures and aggregates (in MB)
+FIGURE_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_FIGURE_CACHE_MB", "256"))
+
+_figure_cache = LRUCache(FIGURE_CACHE_MAX_MB * 1024 * 1024, name="figure cache")
+
+# Time-series line plots resample to about this many buckets in Auto
+MAX_LINE_BUCKETS = 2000
+
+@timed("page: visualize data")
 def visualize_data(df):
     if df is None or df.empty:
         st.warning("No data available for visualization. Please load and process data first.")
         return
 
+    with st.expander("Render settings"):
+        st.radio("Large-data render mode", RENDER_MODES, key="render_mode", horizontal=True)
+        st.number_input("Row threshold for Auto mode", min_value=1000, value=LARGE_DATA_THRESHOLD, step=10000, key="large_data_threshold")
+        st.radio("Statistics mode", STATS_MODES, key="stats_mode", horizontal=True,
+                 help="Auto uses streaming sketches above the row threshold; Exact scans every value.")
+        st.caption(format_cache_stats(figure_cache_stats()))
+
     st.write("Select a visualization category:")
     viz_category = st.selectbox("Visualization Category", 
                                 ["Univariate Analysis", 
@@ -58,168 +87,311 @@ def bivariate_analysis(df):
     elif analysis_type == "Line Plot":
         show_line_plot(df)
 
+# Decide whether a chart should aggregate on the server instead of sending every row
+def use_aggregation(df):
+    mode = st.session_state.get("render_mode", "Auto")
+    threshold = st.session_state.get("large_data_threshold", LARGE_DATA_THRESHOLD)
+    return mode == "Aggregated" or (mode == "Auto" and len(df) > threshold)
+
+# Decide whether describe and correlation should come from streaming sketches.
+# Lazy datasets always use their own exact query engine.
+def use_approximate_stats(df):
+    if is_lazy(df):
+        return False
+    mode = st.session_state.get("stats_mode", "Auto")
+    threshold = st.session_state.get("large_data_threshold", LARGE_DATA_THRESHOLD)
+    return mode == "Approximate" or (mode == "Auto" and len(df) > threshold)
+
+def show_point_budget(represented, drawn, unit="points"):
+    st.caption(f"Represents {represented:,} rows · draws {drawn:,} {unit}")
+
+# Compute an aggregate (describe, corr, value_counts, ...) once per dataset
+# version and parameters, as a background job
+def cached_aggregate(df, name, params, compute):
+    key = ("aggregate", dataset_fingerprint(df), name, params)
+    label = f"Computing {name.replace('_', ' ')}"
+    with span(f"aggregate: {name}") as attrs:
+        attrs["cached"] = key in _figure_cache
+        return _figure_cache.get_or_compute(key, lambda: run_job(key, label, lambda job: compute()))
+
+# Build a chart once per dataset version and parameters, then render it. build()
+# returns (figure, point budget) where the budget is None or (represented, drawn, unit).
+def render_cached_figure(df, chart, params, build, **plotly_kwargs):
+    key = ("figure", dataset_fingerprint(df), chart, params)
+    with span(f"figure: {chart}") as attrs:
+        attrs["cached"] = key in _figure_cache
+        fig, budget = _figure_cache.get_or_compute(key, build)
+    if budget is not None:
+        show_point_budget(*budget)
+    # Streamlit serializes the figure to JSON here
+    with span(f"plotly: serialize {chart}"):
+        st.plotly_chart(fig, **plotly_kwargs)
+
+def figure_cache_stats():
+    return _figure_cache.stats()
+
+# The frame a chart draws from: lazy datasets materialize only the given columns
+def chart_data(df, columns):
+    if is_lazy(df):
+        return df.to_pandas(columns)
+    return df
+
+# Mean of column per group of by, with missing groups left out
+def group_means(df, by, column):
+    if is_lazy(df):
+        return df.group_mean(by, column)
+    return df.groupby(by, observed=True)[column].mean()
+
 def show_summary_statistics(df):
     st.write("Summary Statistics")
-    columns = st.multiselect("Select columns for summary statistics:", df.columns.tolist(), default=df.select_dtypes(include=[np.number]).columns.tolist())
-    if columns:
-        st.write(df[columns].describe())
+    columns = st.multiselect("Select columns for summary statistics:", df.columns.tolist(), default=columns_of_kind(column_profile(df), "numeric"))
+    if columns and use_approximate_stats(df):
+        # Sketches are cached per column, so changing the selection only sketches new columns
+        sketches = {column: cached_aggregate(df, "column_sketch", (column,), lambda column=column: sketch_column(df[column]))
+                    for column in columns}
+        table, bounds = describe_sketches(sketches)
+        st.write(table)
+        st.caption("Approximate statistics from streaming sketches. Choose Exact in Render settings for exact values.")
+        with st.expander("Error bounds"):
+            st.write(bounds)
+    elif columns:
+        st.write(cached_aggregate(df, "describe", tuple(columns), lambda: df[columns].describe()))
     else:
         st.warning("Please select at least one column for summary statistics.")
 
 def show_histogram(df):
     st.write("Histogram")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = columns_of_kind(column_profile(df), "numeric")
     column = st.selectbox("Select a column", numeric_columns)
     bins = st.slider("Number of bins", min_value=5, max_value=100, value=30)
-    fig = px.histogram(df, x=column, nbins=bins, title=f"Histogram of {column}")
-    st.plotly_chart(fig, width=800, height=600)
+
+    def build():
+        fig = px.histogram(chart_data(df, [column]), x=column, nbins=bins, title=f"Histogram of {column}")
+        return fig, None
+
+    render_cached_figure(df, "histogram", (column, bins), build, width=800, height=600)
 
 def show_box_plot(df):
     st.write("Box Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = columns_of_kind(column_profile(df), "numeric")
     column = st.selectbox("Select a column", numeric_columns)
-    fig = px.box(df, y=column, title=f"Box Plot of {column}")
-    st.plotly_chart(fig, width=800, height=600)
+
+    def build():
+        fig = px.box(chart_data(df, [column]), y=column, title=f"Box Plot of {column}")
+        return fig, None
+
+    render_cached_figure(df, "box", (column,), build, width=800, height=600)
 
 def show_violin_plot(df):
     st.write("Violin Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = columns_of_kind(column_profile(df), "numeric")
     column = st.selectbox("Select a column", numeric_columns)
-    fig = px.violin(df, y=column, box=True, points="all", title=f"Violin Plot of {column}")
-    st.plotly_chart(fig, width=800, height=600)
+    aggregate = use_aggregation(df)
+
+    def build():
+        data = chart_data(df, [column])
+        if aggregate:
+            # Draw the violin from evenly spaced quantiles instead of every row
+            points = quantile_points(data[column])
+            fig = px.violin(y=points, box=True, points=False, labels={"y": column}, title=f"Violin Plot of {column}")
+            return fig, (len(data), len(points), "quantiles")
+        fig = px.violin(data, y=column, box=True, points="all", title=f"Violin Plot of {column}")
+        return fig, (len(data), len(data), "points")
+
+    render_cached_figure(df, "violin", (column, aggregate), build, width=800, height=600)
 
 def show_univariate_bar_chart(df):
     st.write("Univariate Bar Chart")
     columns = df.columns.tolist()
     column = st.selectbox("Select a column", columns)
-    
-    if df[column].dtype in ['int64', 'float64']:
-        data = df[column].value_counts().sort_index()
-    else:
-        data = df[column].value_counts()
-    
-    fig = go.Figure(data=[go.Bar(
-        x=data.index,
-        y=data.values,
-        marker_color='lightblue',
-        marker_line_color='darkblue',
-        marker_line_width=1.5,
-        opacity=0.8
-    )])
-    
-    fig.update_layout(
-        title=f"Bar Chart of {column}",
-        xaxis_title=column,
-        yaxis_title="Count",
-        bargap=0.2,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(size=12)
-    )
-    
-    fig.update_xaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
-    fig.update_yaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
-    
-    st.plotly_chart(fig, width=800, height=600)
+
+    def count_values():
+        numeric = pd.api.types.is_numeric_dtype(df.dtypes[column])
+        if is_lazy(df):
+            return df.value_counts(column, sort_index=numeric)
+        if numeric:
+            return df[column].value_counts().sort_index()
+        return df[column].value_counts()
+
+    def build():
+        data = cached_aggregate(df, "value_counts", (column,), count_values)
+
+        fig = go.Figure(data=[go.Bar(
+            x=data.index,
+            y=data.values,
+            marker_color='lightblue',
+            marker_line_color='darkblue',
+            marker_line_width=1.5,
+            opacity=0.8
+        )])
+
+        fig.update_layout(
+            title=f"Bar Chart of {column}",
+            xaxis_title=column,
+            yaxis_title="Count",
+            bargap=0.2,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(size=12)
+        )
+
+        fig.update_xaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
+        fig.update_yaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
+        return fig, None
+
+    render_cached_figure(df, "univariate_bar", (column,), build, width=800, height=600)
 
 def show_scatter_plot(df):
     st.write("Scatter Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    profile = column_profile(df)
+    numeric_columns = columns_of_kind(profile, "numeric")
     
     x_axis = st.selectbox("Select X-axis", numeric_columns, index=0)
     y_axis = st.selectbox("Select Y-axis", numeric_columns, index=min(1, len(numeric_columns)-1))
+    color_options = list(dict.fromkeys([y_axis] + numeric_columns + columns_of_kind(profile, "categorical")))
+    color_column = st.selectbox("Color by", color_options)
     
     color_palettes = ["Viridis", "Cividis", "Plasma", "Inferno", "Magma", "Turbo", "Jet", "Rainbow", "Portland", "Bluered", "Electric"]
     selected_palette = st.selectbox("Select color palette", color_palettes)
-    
-    fig = px.scatter(df, x=x_axis, y=y_axis, color=df[y_axis], 
-                     color_continuous_scale=selected_palette, 
-                     title=f"{y_axis} vs {x_axis} with Gradient on Y-axis")
-    
-    st.plotly_chart(fig, width=800, height=600)
+    aggregate = use_aggregation(df)
+
+    def build():
+        data = chart_data(df, list(dict.fromkeys([x_axis, y_axis, color_column])))
+        if aggregate:
+            # Bin on the server and send a density image instead of every point
+            counts, x_centers, y_centers = density_grid(data[x_axis], data[y_axis])
+            fig = go.Figure(data=[go.Heatmap(z=counts, x=x_centers, y=y_centers,
+                                             colorscale=selected_palette, colorbar=dict(title="Rows"))])
+            fig.update_layout(title=f"{y_axis} vs {x_axis} (row density)", xaxis_title=x_axis, yaxis_title=y_axis)
+            return fig, (len(data), int(np.count_nonzero(~np.isnan(counts))), "density cells")
+        title = f"{y_axis} vs {x_axis} with Gradient on Y-axis" if color_column == y_axis else f"{y_axis} vs {x_axis} by {color_column}"
+        fig, drawn = scatter_figure(data, x_axis, y_axis, color_column, selected_palette, title)
+        return fig, (len(data), drawn, "points")
+
+    render_cached_figure(df, "scatter", (x_axis, y_axis, color_column, selected_palette, aggregate), build,
+                         width=800, height=600)
 
 def show_correlation_heatmap(df):
     st.write("Correlation Heatmap")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = columns_of_kind(column_profile(df), "numeric")
     selected_columns = st.multiselect("Select columns for correlation heatmap:", numeric_columns, default=numeric_columns)
     
     if len(selected_columns) < 2:
         st.warning("Please select at least two numeric columns for the correlation heatmap.")
         return
-    
-    corr_matrix = df[selected_columns].corr()
-
-    fig = px.imshow(corr_matrix, 
-                    text_auto=True, 
-                    aspect="auto", 
-                    title="Correlation Heatmap",
-                    width=1000,
-                    height=800)
-    
-    st.plotly_chart(fig)
+
+    approximate = use_approximate_stats(df)
+
+    def build():
+        if approximate:
+            corr_matrix, _ = cached_aggregate(df, "streaming_corr", tuple(selected_columns),
+                                              lambda: streaming_corr(df, selected_columns))
+        else:
+            corr_matrix = cached_aggregate(df, "corr", tuple(selected_columns), lambda: df[selected_columns].corr())
+
+        fig = px.imshow(corr_matrix, 
+                        text_auto=True, 
+                        aspect="auto", 
+                        title="Correlation Heatmap",
+                        width=1000,
+                        height=800)
+        return fig, None
+
+    if approximate:
+        st.caption("Approximate correlation from one streaming pass over row chunks. Choose Exact in Render settings for exact values.")
+    render_cached_figure(df, "correlation_heatmap", (tuple(selected_columns), approximate), build)
 
 def show_group_box_plot(df):
     st.write("Group Box Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    profile = column_profile(df)
+    numeric_columns = columns_of_kind(profile, "numeric")
+    categorical_columns = columns_of_kind(profile, "categorical")
     
     y_column = st.selectbox("Select Y-axis (numeric column)", numeric_columns)
     x_column = st.selectbox("Select X-axis (categorical column)", categorical_columns)
-    
-    fig = px.box(df, x=x_column, y=y_column, title=f"Box Plot of {y_column} grouped by {x_column}")
-    st.plotly_chart(fig, width=800, height=600)
+
+    def build():
+        fig = px.box(chart_data(df, [x_column, y_column]), x=x_column, y=y_column, title=f"Box Plot of {y_column} grouped by {x_column}")
+        return fig, None
+
+    render_cached_figure(df, "group_box", (x_column, y_column), build, width=800, height=600)
 
 def show_bivariate_bar_chart(df):
     st.write("Bivariate Bar Chart")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    profile = column_profile(df)
+    numeric_columns = columns_of_kind(profile, "numeric")
+    categorical_columns = columns_of_kind(profile, "categorical")
     
     x_column = st.selectbox("Select X-axis (categorical column)", categorical_columns)
     y_column = st.selectbox("Select Y-axis (numeric column)", numeric_columns)
-    
-    data = df.groupby(x_column)[y_column].mean().sort_values(ascending=False)
-    
-    fig = go.Figure(data=[go.Bar(
-        x=data.index,
-        y=data.values,
-        marker_color='lightgreen',
-        marker_line_color='darkgreen',
-        marker_line_width=1.5,
-        opacity=0.8
-    )])
-    
-    fig.update_layout(
-        title=f"Bar Chart of {y_column} by {x_column}",
-        xaxis_title=x_column,
-        yaxis_title=f"Average {y_column}",
-        bargap=0.2,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        font=dict(size=12)
-    )
-    
-    fig.update_xaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
-    fig.update_yaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
-    
-    st.plotly_chart(fig, width=800, height=600)
+
+    def build():
+        data = cached_aggregate(df, "group_mean", (x_column, y_column),
+                                lambda: group_means(df, x_column, y_column).sort_values(ascending=False))
+
+        fig = go.Figure(data=[go.Bar(
+            x=data.index,
+            y=data.values,
+            marker_color='lightgreen',
+            marker_line_color='darkgreen',
+            marker_line_width=1.5,
+            opacity=0.8
+        )])
+
+        fig.update_layout(
+            title=f"Bar Chart of {y_column} by {x_column}",
+            xaxis_title=x_column,
+            yaxis_title=f"Average {y_column}",
+            bargap=0.2,
+            plot_bgcolor='white',
+            paper_bgcolor='white',
+            font=dict(size=12)
+        )
+
+        fig.update_xaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
+        fig.update_yaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
+        return fig, None
+
+    render_cached_figure(df, "bivariate_bar", (x_column, y_column), build, width=800, height=600)
 
 def show_line_plot(df):
     st.write("Line Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    profile = column_profile(df)
+    numeric_columns = columns_of_kind(profile, "numeric")
+    categorical_columns = columns_of_kind(profile, "categorical")
     
     x_column = st.selectbox("Select X-axis", df.columns.tolist())
     y_column = st.selectbox("Select Y-axis", numeric_columns)
-    
-    if df[x_column].dtype in ['int64', 'float64']:
-        # If X-axis is numeric, sort the data
-        data = df.sort_values(x_column)
-    else:
-        # If X-axis is categorical, group by X and calculate mean of Y
-        data = df.groupby(x_column)[y_column].mean().reset_index()
-    
-    fig = px.line(data, x=x_column, y=y_column, title=f"Line Plot of {y_column} vs {x_column}")
-    
+    aggregate = use_aggregation(df)
+
+    if profile.loc[x_column, "kind"] == "datetime":
+        show_time_series_line(df, profile, x_column, y_column, aggregate)
+        return
+
+    def build():
+        budget = None
+        if pd.api.types.is_numeric_dtype(df.dtypes[x_column]):
+            # If X-axis is numeric, order the plotted columns by the cached sort index of X
+            columns = list(dict.fromkeys([x_column, y_column]))
+            data = sorted_rows(chart_data(df, columns), x_column, columns)
+            if aggregate:
+                # Keep the points that preserve the shape of the line
+                data = data.dropna()
+                data = data.iloc[lttb_indices(data[x_column].to_numpy(), data[y_column].to_numpy())]
+            budget = (len(df), len(data), "points")
+        else:
+            # If X-axis is categorical, group by X and calculate mean of Y
+            data = cached_aggregate(df, "group_mean_by_x", (x_column, y_column),
+                                    lambda: group_means(df, x_column, y_column).reset_index())
+
+        fig = line_figure([line_trace(data[x_column], data[y_column], name=y_column)], data[x_column],
+                          f"Line Plot of {y_column} vs {x_column}")
+        style_line_plot(fig, x_column, y_column)
+        return fig, budget
+
+    render_cached_figure(df, "line", (x_column, y_column, aggregate), build, width=800, height=600)
+
+def style_line_plot(fig, x_column, y_column):
     fig.update_layout(
         xaxis_title=x_column,
         yaxis_title=y_column,
@@ -227,15 +399,59 @@ def show_line_plot(df):
         paper_bgcolor='white',
         font=dict(size=12)
     )
-    
+
     fig.update_xaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
     fig.update_yaxes(showline=True, linewidth=2, linecolor='lightgray', gridcolor='lightgray')
-    
-    st.plotly_chart(fig, width=800, height=600)
+
+# Time on the X-axis: only the chosen range is read, found through the cached
+# sort index of the time column. Large data is drawn as per-bucket means with
+# a min/max band instead of raw rows.
+def show_time_series_line(df, profile, x_column, y_column, aggregate):
+    first, last = profile.loc[x_column, "min"], profile.loc[x_column, "max"]
+    if pd.isna(first):
+        st.warning(f"{x_column} has no dates to plot.")
+        return
+    start, end = first, last
+    if first < last:
+        # The slider works on naive datetimes; the range keeps the column's time zone
+        chosen = st.slider("Visible range", min_value=first.tz_localize(None).to_pydatetime(),
+                           max_value=last.tz_localize(None).to_pydatetime(),
+                           value=(first.tz_localize(None).to_pydatetime(), last.tz_localize(None).to_pydatetime()),
+                           format="YYYY-MM-DD HH:mm")
+        start, end = (pd.Timestamp(value).tz_localize(first.tz) for value in chosen)
+
+    rule = None
+    if aggregate:
+        choice = st.selectbox("Resample to", ["Auto"] + RESAMPLE_RULES)
+        rule = auto_rule(start, end, MAX_LINE_BUCKETS) if choice == "Auto" else choice
+
+    def build():
+        data = chart_data(df, [x_column, y_column])
+        title = f"Line Plot of {y_column} vs {x_column}"
+        if rule is None:
+            rows = rows_in_range(data, x_column, [x_column, y_column], start, end)
+            fig = line_figure([line_trace(rows[x_column], rows[y_column], name=y_column)], rows[x_column], title)
+            budget = (len(df), len(rows), "points")
+        else:
+            buckets = cached_aggregate(df, "resample", (x_column, y_column, rule, start, end),
+                                       lambda: resample(data, x_column, y_column, rule, start, end))
+            times = buckets[x_column]
+            fig = line_figure([
+                line_trace(times, buckets["min"], line=dict(width=0), showlegend=False, hoverinfo="skip"),
+                line_trace(times, buckets["max"], line=dict(width=0), fill="tonexty",
+                           fillcolor="rgba(99, 110, 250, 0.2)", name="min–max"),
+                line_trace(times, buckets["mean"], name=f"mean per {rule}"),
+            ], times, f"{title} ({rule} buckets)")
+            budget = (int(buckets["count"].sum()), len(buckets), f"{rule} buckets")
+        style_line_plot(fig, x_column, y_column)
+        return fig, budget
+
+    render_cached_figure(df, "line", (x_column, y_column, aggregate, rule, start, end), build, width=800, height=600)
+    st.caption(format_cache_stats(sort_index_cache_stats()))
 
 def show_3d_scatter_plot(df):
     st.write("3D Scatter Plot")
-    numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    numeric_columns = columns_of_kind(column_profile(df), "numeric")
 
     if len(numeric_columns) < 3:
         st.warning("Need at least three numeric columns for a 3D scatter plot.")
@@ -245,16 +461,26 @@ def show_3d_scatter_plot(df):
     y_axis = st.selectbox("Select Y-axis", numeric_columns, index=1)
     z_axis = st.selectbox("Select Z-axis", numeric_columns, index=2)
 
-    color_column = st.selectbox("Select Color Column (for gradient)", numeric_columns, index=3)
+    color_column = st.selectbox("Select Color Column (for gradient)", numeric_columns, index=min(3, len(numeric_columns) - 1))
     
     color_palettes = ["Viridis", "Cividis", "Plasma", "Inferno", "Magma", "Turbo", "Jet", "Rainbow", "Portland", "Bluered", "Electric"]
     selected_palette = st.selectbox("Select color palette", color_palettes)
+    aggregate = use_aggregation(df)
+
+    def build():
+        columns = list(dict.fromkeys([x_axis, y_axis, z_axis, color_column]))
+        data = chart_data(df, columns)
+        if aggregate:
+            # Sample across the range of the color column so its tails stay visible
+            data = stratified_sample(data[columns], MAX_DRAWN_POINTS, color_column)
 
-    fig = px.scatter_3d(df, x=x_axis, y=y_axis, z=z_axis, color=color_column,
-                        color_continuous_scale=selected_palette,
-                        title=f"3D Scatter Plot: {x_axis}, {y_axis}, {z_axis} (Color by {color_column})")
+        fig = px.scatter_3d(data, x=x_axis, y=y_axis, z=z_axis, color=color_column,
+                            color_continuous_scale=selected_palette,
+                            title=f"3D Scatter Plot: {x_axis}, {y_axis}, {z_axis} (Color by {color_column})")
+        return fig, (len(df), len(data), "points")
 
-    st.plotly_chart(fig, width=800, height=600)
+    render_cached_figure(df, "scatter_3d", (x_axis, y_axis, z_axis, color_column, selected_palette, aggregate),
+                         build, width=800, height=600)
 
 def Component():
     return None
\ No newline at end of file
@@ -0,0 +1,89 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from src.cache import estimate_size
+
+# Process-wide registry of loaded datasets, shared by every browser session.
+# Sessions are handed views sharing buffers with the stored frame, which relies
+# on pandas copy-on-write (enabled in main.py) to keep the stored frame intact.
+# Each session holds the dataset it loaded last; a dataset no session holds
+# stays available until the store needs room, then it is dropped in least
+# recently used order. Held datasets are never dropped.
+class DatasetStore:
+    def __init__(self, max_bytes, name="dataset store"):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._held = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    # Return a copy-on-write view of the dataset under key, calling load() if
+    # it is not stored yet. Concurrent sessions asking for the same key wait
+    # for a single load.
+    def acquire(self, key, session_id, load):
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                data = load()
+                entry = {"data": data, "bytes": estimate_size(data), "sessions": set()}
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._hold(session_id, key)
+                self._evict_idle()
+                self._loading.pop(key, None)
+        return entry["data"].copy(deep=False)
+
+    def release_session(self, session_id):
+        with self._lock:
+            self._hold(session_id, None)
+            self._evict_idle()
+
+    def sessions(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return len(entry["sessions"]) if entry else 0
+
+    def _hold(self, session_id, key):
+        previous = self._held.pop(session_id, None)
+        if previous in self._entries:
+            self._entries[previous]["sessions"].discard(session_id)
+        if key is not None:
+            self._held[session_id] = key
+            self._entries[key]["sessions"].add(session_id)
+
+    def _evict_idle(self):
+        total = sum(entry["bytes"] for entry in self._entries.values())
+        for key in [k for k, entry in self._entries.items() if not entry["sessions"]]:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)["bytes"]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "datasets": len(self._entries),
+                "held": sum(1 for entry in self._entries.values() if entry["sessions"]),
+                "sessions": len(self._held),
+                "bytes": sum(entry["bytes"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Kept in a session's state. When Streamlit discards the session the token is
+# garbage collected, which releases the session's hold on its dataset.
+class SessionToken:
+    def __init__(self, store, session_id):
+        self.session_id = session_id
+        weakref.finalize(self, store.release_session, session_id)
+
+
+def format_store_stats(stats):
+    return (f"{stats['name'].capitalize()}: {stats['datasets']} datasets ({stats['held']} in use) "
+            f"shared by {stats['sessions']} sessions, {stats['bytes'] / 1e6:.1f} / {stats['max_bytes'] / 1e6:.0f} MB used")
@@ -0,0 +1,89 @@
+import codecs
+
+from chardet.universaldetector import UniversalDetector
+
+# Bytes read from the start of the file before anything else is sampled
+PREFIX_BYTES = 64 * 1024
+# Extra chunks sampled at evenly spaced offsets through the rest of the file
+SAMPLE_CHUNKS = 8
+SAMPLE_CHUNK_BYTES = 16 * 1024
+# Minimum chardet confidence on the sample before we fall back to a full scan
+MIN_CONFIDENCE = 0.8
+FULL_SCAN_CHUNK_BYTES = 1024 * 1024
+DEFAULT_ENCODING = "utf-8"
+
+
+def _file_size(file):
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+# Read the prefix plus evenly spaced chunks without loading the whole file
+def _read_samples(file, size, prefix_bytes, sample_chunks, chunk_bytes):
+    file.seek(0)
+    samples = [file.read(prefix_bytes)]
+    remaining = size - prefix_bytes
+    if remaining > 0 and sample_chunks > 0:
+        if remaining <= sample_chunks * chunk_bytes:
+            samples.append(file.read())
+        else:
+            stride = (remaining - chunk_bytes) // max(sample_chunks - 1, 1)
+            for i in range(sample_chunks):
+                file.seek(prefix_bytes + i * stride)
+                samples.append(file.read(chunk_bytes))
+    file.seek(0)
+    return samples
+
+
+# A chunk cut from the middle of a file may start or end inside a multi-byte
+# sequence, so drop leading continuation bytes and decode incrementally
+def _is_utf8(chunk, starts_mid_file):
+    if starts_mid_file:
+        skip = 0
+        while skip < min(3, len(chunk)) and 0x80 <= chunk[skip] <= 0xBF:
+            skip += 1
+        chunk = chunk[skip:]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(chunk, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _full_scan(file):
+    detector = UniversalDetector()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(FULL_SCAN_CHUNK_BYTES), b""):
+        detector.feed(chunk)
+        if detector.done:
+            break
+    detector.close()
+    file.seek(0)
+    return detector.result
+
+
+# Detect the encoding of a binary file object from a bounded sample.
+# Valid UTF-8 (and therefore plain ASCII) is accepted without running chardet;
+# only an ambiguous sample triggers a streaming scan over the whole file.
+def detect_encoding(file, prefix_bytes=PREFIX_BYTES, sample_chunks=SAMPLE_CHUNKS,
+                    chunk_bytes=SAMPLE_CHUNK_BYTES, min_confidence=MIN_CONFIDENCE, full_scan=False):
+    if full_scan:
+        return _full_scan(file)["encoding"] or DEFAULT_ENCODING
+
+    size = _file_size(file)
+    samples = _read_samples(file, size, prefix_bytes, sample_chunks, chunk_bytes)
+
+    if all(_is_utf8(chunk, i > 0) for i, chunk in enumerate(samples)):
+        return "utf-8-sig" if samples[0].startswith(codecs.BOM_UTF8) else "utf-8"
+
+    detector = UniversalDetector()
+    for chunk in samples:
+        detector.feed(chunk)
+    detector.close()
+    result = detector.result
+    if result["encoding"] and result["confidence"] >= min_confidence:
+        return result["encoding"]
+
+    return _full_scan(file)["encoding"] or DEFAULT_ENCODING
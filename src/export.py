@@ -0,0 +1,181 @@
+import os
+import tempfile
+import threading
+import weakref
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.cache import LRUCache, dataset_fingerprint
+from src.features import densify
+from src.lazy_engine import is_lazy
+
+# Rows converted and written at a time, so an export never holds more than
+# one chunk's worth of text or Arrow buffers on top of the frame itself
+EXPORT_CHUNK_ROWS = int(os.environ.get("NEATPLOT_EXPORT_CHUNK_ROWS", "100000"))
+# Disk budget for finished export files kept for repeat downloads (in MB)
+EXPORT_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_EXPORT_CACHE_MB", "4096"))
+EXPORT_DIRECTORY = os.environ.get("NEATPLOT_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "neatplot_exports"))
+COPY_BUFFER_BYTES = 8 * 1024 * 1024
+
+# label -> (file kind, compression codec, file extension, mime type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", None, ".csv", "text/csv"),
+    "CSV (gzip)": ("csv", "gzip", ".csv.gz", "application/gzip"),
+    "CSV (zstd)": ("csv", "zstd", ".csv.zst", "application/zstd"),
+    "Parquet": ("parquet", "zstd", ".parquet", "application/vnd.apache.parquet"),
+    "Feather": ("feather", "lz4", ".feather", "application/vnd.apache.arrow.file"),
+}
+
+
+def remove_export(key, file_path):
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+# An export too large for the export cache, held by one session so reruns
+# (a download or save click) reuse the file. It is removed when the session's
+# next export replaces it, or when Streamlit discards the session.
+class SessionExport:
+    def __init__(self, key, file_path):
+        self.key = key
+        self.file_path = file_path
+        self._finalizer = weakref.finalize(self, remove_export, key, file_path)
+
+    def release(self):
+        self._finalizer()
+
+
+# (dataset version, format) -> path of the finished export file
+_export_cache = LRUCache(EXPORT_CACHE_MAX_MB * 1024 * 1024, name="export cache", on_evict=remove_export)
+_export_lock = threading.Lock()
+
+
+# Formats whose codec this Arrow build supports
+def available_formats():
+    return [label for label, (_, codec, _, _) in EXPORT_FORMATS.items()
+            if codec is None or pa.Codec.is_available(codec)]
+
+
+def _chunks(df):
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield start, df.iloc[start:start + EXPORT_CHUNK_ROWS]
+
+
+def _open_output(file_path, codec):
+    if codec is None:
+        return pa.OSFile(file_path, "wb")
+    return pa.CompressedOutputStream(file_path, codec)
+
+
+# on_progress(fraction) is called after each chunk
+def write_csv(df, file_path, codec=None, on_progress=None):
+    with _open_output(file_path, codec) as output:
+        if df.empty:
+            output.write(df.to_csv(index=False).encode())
+        for start, chunk in _chunks(df):
+            output.write(densify(chunk).to_csv(index=False, header=start == 0).encode())
+            if on_progress:
+                on_progress(min((start + len(chunk)) / len(df), 1.0))
+
+
+# Arrow schema of a frame. Sparse columns (generated features) are written
+# dense, with the type of their values.
+def _arrow_schema(df):
+    sparse = [column for column, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+    dense = pa.Schema.from_pandas(df.drop(columns=sparse), preserve_index=False)
+    return pa.schema([pa.field(column, pa.from_numpy_dtype(dtype.subtype)) if column in sparse
+                      else dense.field(column) for column, dtype in df.dtypes.items()])
+
+
+# Parquet and Feather are written a record batch per chunk against a schema
+# taken from the whole frame, so chunks where a column happens to be all
+# missing keep the column's type
+def write_arrow(df, file_path, kind, codec, on_progress=None):
+    schema = _arrow_schema(df)
+    if kind == "parquet":
+        writer = pq.ParquetWriter(file_path, schema, compression=codec)
+    else:
+        writer = pa.ipc.new_file(file_path, schema, options=pa.ipc.IpcWriteOptions(compression=codec))
+    with writer:
+        for start, chunk in _chunks(df):
+            table = pa.Table.from_pandas(densify(chunk), schema=schema, preserve_index=False)
+            if kind == "parquet":
+                writer.write_table(table)
+            else:
+                writer.write_table(table, max_chunksize=EXPORT_CHUNK_ROWS)
+            if on_progress:
+                on_progress(min((start + len(chunk)) / len(df), 1.0))
+
+
+# Copy a file through a compression codec a buffer at a time
+def _compress_file(source_path, file_path, codec):
+    with open(source_path, "rb") as source, _open_output(file_path, codec) as output:
+        for buffer in iter(lambda: source.read(COPY_BUFFER_BYTES), b""):
+            output.write(buffer)
+
+
+# Lazy datasets stream from their source file through Polars' sinks, without
+# materializing the result
+def _write_lazy(df, file_path, kind, codec):
+    if kind == "csv" and codec is not None:
+        plain_path = file_path + ".plain"
+        try:
+            df.sink(plain_path, "csv")
+            _compress_file(plain_path, file_path, codec)
+        finally:
+            remove_export(None, plain_path)
+    else:
+        df.sink(file_path, kind, codec)
+
+
+def write_export(df, file_path, label, on_progress=None):
+    kind, codec, _, _ = EXPORT_FORMATS[label]
+    if is_lazy(df):
+        _write_lazy(df, file_path, kind, codec)
+    elif kind == "csv":
+        write_csv(df, file_path, codec, on_progress)
+    else:
+        write_arrow(df, file_path, kind, codec, on_progress)
+
+
+# Export of df in the given format, written on the first request for this
+# dataset version and served from disk afterwards. Returns (path, whether it
+# came from the cache, whether the cache kept it); an export larger than the
+# whole budget is not kept, and the caller removes it once served. The file is
+# written under a temporary name and renamed once complete, so a reader never
+# sees a partial export.
+def export_file(df, label, on_progress=None):
+    version = dataset_fingerprint(df)
+    key = (version, label)
+    file_path = _export_cache.get(key)
+    if file_path is not None and os.path.exists(file_path):
+        return file_path, True, True
+
+    os.makedirs(EXPORT_DIRECTORY, exist_ok=True)
+    # Reusing the cached path object keeps the cache from deleting it as a replaced entry.
+    # The file is named by the full version: formats have distinct extensions,
+    # so two cache keys never share a file.
+    file_path = file_path or os.path.join(EXPORT_DIRECTORY, f"{version}{EXPORT_FORMATS[label][2]}")
+    partial_path = f"{file_path}.{threading.get_ident()}.part"
+    try:
+        write_export(df, partial_path, label, on_progress)
+    except BaseException:
+        remove_export(None, partial_path)
+        raise
+    with _export_lock:
+        # Another session may have finished the same export meanwhile
+        finished = _export_cache.get(key)
+        if finished is not None and os.path.exists(finished):
+            remove_export(None, partial_path)
+            return finished, True, True
+        os.replace(partial_path, file_path)
+        kept = _export_cache.put(key, file_path, size=os.path.getsize(file_path))
+    return file_path, False, kept
+
+
+def export_cache_stats():
+    return _export_cache.stats()
@@ -1,6 +1,29 @@
+import json
+import os
+
+import pandas as pd
 import streamlit as st
-import time
 
+from src.cache import LRUCache, dataset_fingerprint, format_cache_stats, set_version
+from src.data_processor import show_export
+from src.features import (BINNING_STRATEGIES, DATETIME_PARTS, MAX_ONE_HOT_CATEGORIES, SCALING_METHODS,
+                          build_features, densify, polynomial_terms)
+from src.instrumentation import timed
+from src.jobs import run_job
+from src.lazy_engine import materialize
+from src.pipeline import stage_version
+from src.profiling import column_profile, columns_of_kind
+
+# Memory budget for generated feature sets (in MB)
+FEATURE_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_FEATURE_CACHE_MB", "512"))
+# Polynomial settings producing more terms than this ask for confirmation
+MAX_POLYNOMIAL_TERMS = 200
+PREVIEW_ROWS = 20
+
+_feature_cache = LRUCache(FEATURE_CACHE_MAX_MB * 1024 * 1024, name="feature cache")
+
+
+@timed("page: feature engineering")
 def feature_engineering(df):
     st.header("🛠️ Feature Engineering")
 
@@ -8,15 +31,156 @@ def feature_engineering(df):
         st.warning("No data available for feature engineering. Please load and process data first.")
         return
 
-    st.info("🚧 Feature Engineering Module: Under Construction 🚧")
-    st.success("Thanks for your patience! Check back soon for exciting new features.")
+    # A lazy dataset keeps its query's version once materialized
+    version = dataset_fingerprint(df)
+    df = materialize(df)
+    set_version(df, version)
+    profile = column_profile(df)
+    specs = choose_features(df, profile)
+    if not specs:
+        st.info("Choose columns above to generate features.")
+        return None
+
+    # Feature sets are cached per dataset version and settings, so reruns reuse them
+    key = (version, json.dumps(specs, sort_keys=True))
+    try:
+        features, report = run_job(("features",) + key, "Generating features",
+                                   lambda job: _feature_cache.get_or_compute(key, lambda: build_features(df, specs)))
+    except (TypeError, ValueError) as e:
+        st.error(f"Error generating features: {str(e)}")
+        return None
+
+    st.subheader("Generated Features")
+    st.write("Generated Features Shape:", features.shape)
+    st.dataframe(densify(features.head(PREVIEW_ROWS)), use_container_width=True)
+
+    st.subheader("Memory Footprint")
+    show_memory_report(report)
+    st.caption(format_cache_stats(feature_cache_stats()))
+
+    st.subheader("Export Features")
+    include_original = st.checkbox("Include the original columns", value=True)
+    if include_original:
+        result = pd.concat([df, features.drop(columns=df.columns.intersection(features.columns))], axis=1)
+    else:
+        result = features
+    # The result is rebuilt on every rerun; versioning it from the settings
+    # spares the export a hash of its full content each time
+    set_version(result, stage_version(version, "features", (key[1], include_original)))
+    show_export(result)
+    return result
+
+
+# Widgets for each transform; returns the feature specs they describe
+def choose_features(df, profile):
+    numeric = columns_of_kind(profile, "numeric")
+    categorical = columns_of_kind(profile, "categorical") + columns_of_kind(profile, "boolean")
+    datetimes = columns_of_kind(profile, "datetime")
+    specs = []
+
+    with st.expander("Encoding", expanded=True):
+        columns = st.multiselect("One-hot encode:", categorical)
+        if columns:
+            max_categories = int(st.number_input("Most frequent categories kept per column (the rest become one column):",
+                                                 min_value=1, value=MAX_ONE_HOT_CATEGORIES))
+            specs.append({"transform": "one_hot", "columns": columns, "max_categories": max_categories})
+        columns = st.multiselect("Frequency encode:", categorical)
+        if columns:
+            specs.append({"transform": "frequency", "columns": columns})
+        columns = st.multiselect("Target encode:", categorical)
+        if columns and numeric:
+            target = st.selectbox("Target column:", numeric)
+            smoothing = st.number_input("Smoothing (rows a category needs to outweigh the overall mean):",
+                                        min_value=0.0, value=10.0)
+            specs.append({"transform": "target", "columns": columns, "target": target, "smoothing": smoothing})
+        elif columns:
+            st.warning("Target encoding needs a numeric target column.")
+
+    with st.expander("Binning and scaling"):
+        columns = st.multiselect("Bin:", numeric)
+        if columns:
+            bins = st.slider("Number of bins:", 2, 100, 10)
+            strategy = st.radio("Bin edges:", BINNING_STRATEGIES, horizontal=True)
+            specs.append({"transform": "bin", "columns": columns, "bins": bins, "strategy": strategy})
+        columns = st.multiselect("Scale:", numeric)
+        if columns:
+            method = st.radio("Scaling method:", SCALING_METHODS, horizontal=True)
+            specs.append({"transform": "scale", "columns": columns, "method": method})
+
+    with st.expander("Polynomial and interaction features"):
+        columns = st.multiselect("Columns to combine:", numeric)
+        if columns:
+            degree = st.slider("Degree:", 2, 4, 2)
+            interaction_only = st.checkbox("Interactions only (no powers of a single column)")
+            terms = len(polynomial_terms(columns, degree, interaction_only))
+            st.write(f"{terms} terms")
+            if 0 < terms <= MAX_POLYNOMIAL_TERMS or (terms and st.checkbox(f"Generate more than {MAX_POLYNOMIAL_TERMS} terms")):
+                specs.append({"transform": "polynomial", "columns": columns, "degree": degree,
+                              "interaction_only": interaction_only})
+
+    with st.expander("Datetime parts"):
+        # Text columns holding dates are parsed with the inferred format first
+        columns = st.multiselect("Extract parts from:", datetimes + columns_of_kind(profile, "categorical"))
+        if columns:
+            parts = st.multiselect("Parts:", DATETIME_PARTS, default=["year", "month", "day", "dayofweek"])
+            if parts:
+                specs.append({"transform": "datetime_parts", "columns": columns, "parts": parts})
+
+    with st.expander("Time-series windows"):
+        # Rolling statistics, lags and EWMs ordered by a time column, optionally per group
+        order_columns = datetimes + numeric
+        columns = st.multiselect("Columns to window:", numeric)
+        if columns and order_columns:
+            time_column = st.selectbox("Order by:", order_columns)
+            group_column = st.selectbox("Separate series per:", ["(none)"] + categorical)
+            windows = parse_windows(st.text_input("Rolling windows (rows, or durations like 5min):", "10, 1h"),
+                                    time_column in datetimes)
+            lags = [int(lag) for lag in st.text_input("Lags (rows):", "1").replace(",", " ").split() if lag.isdigit()]
+            spans = [int(span) for span in st.text_input("EWM spans (rows):", "20").replace(",", " ").split()
+                     if span.isdigit()]
+            if windows or lags or spans:
+                specs.append({"transform": "time_window", "columns": columns, "time_column": time_column,
+                              "group_column": None if group_column == "(none)" else group_column,
+                              "windows": windows, "lags": lags, "spans": spans})
+
+    return specs
+
+
+# Row counts as integers and durations as strings; durations need a datetime column
+def parse_windows(text, by_time):
+    windows = []
+    for window in text.replace(",", " ").split():
+        if window.isdigit():
+            windows.append(int(window))
+            continue
+        try:
+            pd.Timedelta(window)
+        except ValueError:
+            st.warning(f"Ignoring window {window!r}: not a row count or duration.")
+            continue
+        if by_time:
+            windows.append(window)
+        else:
+            st.warning(f"Ignoring window {window!r}: durations need a datetime column to order by.")
+    return windows
+
+
+def show_memory_report(report):
+    total = report["MB"].sum()
+    sparse = report[report["sparse"]]
+    st.write(f"Generated features use {total:,.1f} MB.")
+    if not sparse.empty:
+        st.write(f"{len(sparse)} sparse columns take {sparse['MB'].sum():,.1f} MB "
+                 f"instead of {sparse['dense MB'].sum():,.1f} MB dense.")
+    display = report.round({"MB": 3, "dense MB": 3, "density": 4})
+    st.dataframe(display, use_container_width=True, hide_index=True)
+
 
-    # Preview of current data
-    st.subheader("Current Data Preview")
-    st.dataframe(df.head(), use_container_width=True)
+def feature_cache_stats():
+    return _feature_cache.stats()
 
 
 if __name__ == "__main__":
     st.set_page_config(page_title="NeatPlot - Feature Engineering", page_icon="🛠️", layout="wide")
     st.title("NeatPlot: Feature Engineering Module")
-    feature_engineering(None)  # Pass None for testing purposes
\ No newline at end of file
+    feature_engineering(None)  # Pass None for testing purposes
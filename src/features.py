@@ -0,0 +1,255 @@
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas._libs.sparse import IntIndex
+
+from src.timeseries import sort_order, window_features
+from src.type_conversion import convert_column
+
+# Threads computing independent features (the numpy kernels release the GIL)
+FEATURE_WORKERS = int(os.environ.get("NEATPLOT_FEATURE_WORKERS", str(os.cpu_count() or 1)))
+# One-hot encodings with more categories than this are stored sparse
+SPARSE_MIN_CATEGORIES = 50
+# Categories beyond the most frequent ones are folded into one "other" column
+MAX_ONE_HOT_CATEGORIES = 1000
+OTHER_CATEGORY = "__other__"
+
+SCALING_METHODS = ["standard", "minmax", "robust"]
+BINNING_STRATEGIES = ["quantile", "uniform"]
+DATETIME_PARTS = ["year", "quarter", "month", "day", "dayofweek", "dayofyear", "hour", "minute", "is_weekend"]
+
+# Feature specs are dicts like {"transform": "one_hot", "columns": ["city"]},
+# with the transform's parameters as further keys. Every transform but
+# polynomial takes one column and returns a frame of generated features;
+# time_window takes the frame, as its features are ordered by another column.
+
+
+# Integer codes (-1 for missing) and the category labels of a column. Sorting
+# the labels only matters where they become column names.
+def _codes(series, sort=False):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series, sort=sort)
+
+
+# Sparse 0/1 columns, one per code, from a single stable sort of the codes
+def _sparse_indicators(codes, count):
+    present = codes >= 0
+    order = np.argsort(codes, kind="stable")[len(codes) - present.sum():]
+    boundaries = np.cumsum(np.bincount(codes[present], minlength=count))[:-1]
+    dtype = pd.SparseDtype(np.uint8, 0)
+    columns = []
+    for positions in np.split(order, boundaries):
+        index = IntIndex(len(codes), positions.astype(np.int32))
+        columns.append(pd.arrays.SparseArray(np.ones(len(positions), dtype=np.uint8), sparse_index=index, dtype=dtype))
+    return columns
+
+
+def one_hot(series, max_categories=MAX_ONE_HOT_CATEGORIES, sparse=None):
+    codes, categories = _codes(series, sort=True)
+    labels = [str(category) for category in categories]
+    if len(categories) > max_categories:
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        keep = np.sort(np.argsort(-counts, kind="stable")[:max_categories])
+        mapping = np.full(len(categories), max_categories)
+        mapping[keep] = np.arange(max_categories)
+        codes = np.where(codes >= 0, mapping[codes], -1)
+        labels = [labels[i] for i in keep] + [OTHER_CATEGORY]
+    if sparse is None:
+        sparse = len(labels) > SPARSE_MIN_CATEGORIES
+    names = [f"{series.name}={label}" for label in labels]
+    if sparse:
+        return pd.DataFrame(dict(zip(names, _sparse_indicators(codes, len(labels)))))
+    indicators = (codes[:, None] == np.arange(len(labels))).astype(np.uint8)
+    return pd.DataFrame(indicators, columns=names)
+
+
+# Share of rows holding each value; missing values stay missing
+def frequency_encode(series):
+    codes, categories = _codes(series)
+    present = codes >= 0
+    frequencies = np.bincount(codes[present], minlength=len(categories)) / len(codes)
+    encoded = np.where(present, frequencies[np.maximum(codes, 0)], np.nan)
+    return pd.DataFrame({f"{series.name}_frequency": encoded.astype(np.float32)})
+
+
+# Smoothed mean of the target per category. Each row is encoded with the
+# means of the other folds, so a row's own target never leaks into its
+# feature; categories with few rows shrink towards the overall mean.
+def target_encode(series, target, smoothing=10.0, folds=5, seed=0):
+    codes, categories = _codes(series)
+    y = pd.to_numeric(target, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    count = len(categories)
+    fold = np.random.default_rng(seed).integers(0, folds, len(codes))
+    used = (codes >= 0) & ~np.isnan(y)
+    prior = y[used].mean() if used.any() else np.nan
+
+    slots = fold[used] * count + codes[used]
+    sums = np.bincount(slots, weights=y[used], minlength=folds * count).reshape(folds, count)
+    counts = np.bincount(slots, minlength=folds * count).reshape(folds, count)
+    out_of_fold = ((sums.sum(axis=0) - sums) + prior * smoothing) / ((counts.sum(axis=0) - counts) + smoothing)
+    encoded = np.where(codes >= 0, out_of_fold[fold, np.maximum(codes, 0)], prior)
+    return pd.DataFrame({f"{series.name}_target_{target.name}": encoded})
+
+
+def _as_float(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+# Equal-frequency or equal-width bins as an ordered categorical. Edges that
+# coincide are merged, so a constant column gets a single bin.
+def bin_column(series, bins=10, strategy="quantile"):
+    values = _as_float(series)
+    if strategy == "quantile":
+        edges = np.unique(np.nanquantile(values, np.linspace(0, 1, bins + 1)))
+    else:
+        edges = np.unique(np.linspace(np.nanmin(values), np.nanmax(values), bins + 1))
+    if len(edges) == 1:
+        edges = np.repeat(edges, 2)
+    codes = np.searchsorted(edges[1:-1], values, side="right")
+    codes[np.isnan(values)] = -1
+    # Text labels rather than intervals, which neither the page nor Parquet can carry;
+    # the last bin also holds the maximum
+    labels = [f"[{low:.4g}, {high:.4g}{']' if i == len(edges) - 2 else ')'}"
+              for i, (low, high) in enumerate(zip(edges[:-1], edges[1:]))]
+    return pd.DataFrame({f"{series.name}_bin": pd.Categorical.from_codes(codes, categories=labels, ordered=True)})
+
+
+def scale(series, method="standard"):
+    values = _as_float(series)
+    if method == "standard":
+        center, spread = np.nanmean(values), np.nanstd(values)
+    elif method == "minmax":
+        center, spread = np.nanmin(values), np.nanmax(values) - np.nanmin(values)
+    elif method == "robust":
+        q1, center, q3 = np.nanquantile(values, [0.25, 0.5, 0.75])
+        spread = q3 - q1
+    else:
+        raise ValueError(f"Unknown scaling method: {method}")
+    scaled = (values - center) / (spread if spread else 1.0)
+    return pd.DataFrame({f"{series.name}_{method}": scaled})
+
+
+def datetime_parts(series, parts=tuple(DATETIME_PARTS)):
+    if not pd.api.types.is_datetime64_any_dtype(series.dtype):
+        series, _ = convert_column(series, "datetime")
+    accessor = series.dt
+    missing = series.isna()
+    features = {}
+    for part in parts:
+        if part == "is_weekend":
+            feature = (accessor.dayofweek >= 5).astype("boolean")
+        else:
+            # Small integers; nullable only when there are missing dates
+            dtype = "Int16" if part in ("year", "dayofyear") else "Int8"
+            feature = getattr(accessor, part).astype(dtype if missing.any() else dtype.lower())
+        features[f"{series.name}_{part}"] = feature.mask(missing) if missing.any() else feature
+    return pd.DataFrame(features)
+
+
+# Products of the given columns up to degree: squares and higher powers plus
+# interactions, or interactions only. One task per term.
+def polynomial_terms(columns, degree=2, interaction_only=False):
+    combine = itertools.combinations if interaction_only else itertools.combinations_with_replacement
+    return [term for d in range(2, degree + 1) for term in combine(columns, d)]
+
+
+def _term_name(term):
+    return "*".join(f"{column}^{term.count(column)}" if term.count(column) > 1 else column
+                    for column in dict.fromkeys(term))
+
+
+def polynomial_term(df, term):
+    product = _as_float(df[term[0]])
+    for column in term[1:]:
+        product = product * _as_float(df[column])
+    return pd.DataFrame({_term_name(term): product})
+
+
+TRANSFORMS = {
+    "one_hot": one_hot,
+    "frequency": frequency_encode,
+    "target": target_encode,
+    "bin": bin_column,
+    "scale": scale,
+    "datetime_parts": datetime_parts,
+}
+
+
+# One (transform, source, compute) task per column, or per term for polynomial features
+def feature_tasks(df, specs):
+    tasks = []
+    for spec in specs:
+        name = spec["transform"]
+        params = {key: value for key, value in spec.items() if key not in ("transform", "columns")}
+        if name == "polynomial":
+            for term in polynomial_terms(spec["columns"], **params):
+                tasks.append((name, ", ".join(dict.fromkeys(term)), lambda term=term: polynomial_term(df, term)))
+            continue
+        if name == "time_window":
+            # The sort index is built once here; the per-column tasks share it from the cache
+            group = params.get("group_column")
+            sort_order(df[params["time_column"]], None if group is None else df[group])
+            for column in spec["columns"]:
+                tasks.append((name, column, lambda column=column, params=params: window_features(df, column, **params)))
+            continue
+        if name not in TRANSFORMS:
+            raise ValueError(f"Unknown feature transform: {name}")
+        if name == "target":
+            params["target"] = df[params["target"]]
+        for column in spec["columns"]:
+            tasks.append((name, column, lambda column=column, name=name, params=params:
+                          TRANSFORMS[name](df[column], **params)))
+    return tasks
+
+
+# Footprint of each generated feature; sparse ones also show what they would take dense
+def memory_report(features, sources):
+    rows = []
+    for column in features.columns:
+        series = features[column]
+        sparse = isinstance(series.dtype, pd.SparseDtype)
+        rows.append({
+            "feature": column,
+            "transform": sources[column][0],
+            "source": sources[column][1],
+            "dtype": str(series.dtype),
+            "sparse": sparse,
+            "MB": series.memory_usage(index=False, deep=True) / 1e6,
+            "dense MB": len(series) * series.dtype.subtype.itemsize / 1e6 if sparse else None,
+            "density": series.sparse.density if sparse else None,
+        })
+    return pd.DataFrame(rows, columns=["feature", "transform", "source", "dtype", "sparse", "MB", "dense MB", "density"])
+
+
+# Compute every feature of the specs, independent tasks in parallel threads.
+# Returns (frame of generated features aligned to df, memory report).
+def build_features(df, specs, max_workers=None):
+    tasks = feature_tasks(df, specs)
+    if not tasks:
+        return pd.DataFrame(index=df.index), memory_report(pd.DataFrame(), {})
+    max_workers = min(len(tasks), max_workers or FEATURE_WORKERS)
+    if max_workers <= 1:
+        frames = [compute() for _, _, compute in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(lambda task: task[2](), tasks))
+
+    sources = {}
+    for (name, source, _), frame in zip(tasks, frames):
+        frame.index = df.index
+        for column in frame.columns:
+            sources[column] = (name, source)
+    features = pd.concat(frames, axis=1)
+    # The same feature requested twice is kept once
+    features = features.loc[:, ~features.columns.duplicated()]
+    return features, memory_report(features, sources)
+
+
+# Sparse columns as ordinary ones, for display and file formats without sparse support
+def densify(df):
+    sparse = {column: dtype.subtype for column, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)}
+    return df.astype(sparse) if sparse else df
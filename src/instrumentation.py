@@ -0,0 +1,158 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Peak-memory reports in the app are opt-in: tracemalloc is process-wide, so
+# while it runs it slows every session's allocations and counts them all
+TRACE_MEMORY = os.environ.get("NEATPLOT_TRACE_MEMORY", "0") == "1"
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+# Measure the peak memory allocated inside a block with tracemalloc (numpy and
+# pandas report their buffers to it). Tracing is process-wide, so allocations
+# made by other sessions at the same time are included.
+class PeakMemory:
+    def __init__(self):
+        self.peak_bytes = 0
+
+    def __enter__(self):
+        global _tracing_users, _started_tracing
+        with _tracing_lock:
+            if _tracing_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            _tracing_users += 1
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        global _tracing_users, _started_tracing
+        with _tracing_lock:
+            self.peak_bytes = max(tracemalloc.get_traced_memory()[1] - self._baseline, 0)
+            _tracing_users -= 1
+            if _tracing_users == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+        return False
+
+
+# Timing spans. A trace collects the spans of one script run; spans opened
+# while no trace is active (scripts, benchmarks) cost nothing and are dropped.
+# The active trace and the nesting depth live in context variables, so work
+# submitted with the context copied (background jobs) reports to the trace of
+# the run that started it.
+_active_trace = contextvars.ContextVar("active_trace", default=None)
+_span_depth = contextvars.ContextVar("span_depth", default=0)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else None
+
+
+# Resident memory of the process, or None where /proc is not available
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, TypeError, ValueError, IndexError):
+        return None
+
+
+class Trace:
+    def __init__(self, name="rerun"):
+        self.name = name
+        self.started = datetime.now()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def records(self):
+        with self._lock:
+            return sorted(self.spans, key=lambda record: record["start"])
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def to_json(self):
+        return {"name": self.name, "started": self.started.isoformat(timespec="milliseconds"), "spans": self.records()}
+
+    # Chrome trace event format (chrome://tracing, Perfetto): one complete
+    # event per span, in microseconds, nested per thread by time
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        events = [{
+            "name": record["name"],
+            "cat": record["name"].split(":")[0],
+            "ph": "X",
+            "ts": round(record["start"] * 1e6, 1),
+            "dur": round(record["duration"] * 1e6, 1),
+            "pid": pid,
+            "tid": record["thread_id"],
+            "args": dict(record["attrs"], memory_delta_bytes=record["memory_delta_bytes"]),
+        } for record in self.records()]
+        threads = {record["thread_id"]: record["thread"] for record in self.records()}
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in threads.items()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def start_trace(name="rerun"):
+    trace = Trace(name)
+    _active_trace.set(trace)
+    return trace
+
+
+def active_trace():
+    return _active_trace.get()
+
+
+# Time a block and the change in resident memory over it; attrs are recorded with the span
+@contextmanager
+def span(name, **attrs):
+    trace = _active_trace.get()
+    if trace is None:
+        yield attrs
+        return
+    depth = _span_depth.get()
+    token = _span_depth.set(depth + 1)
+    memory_before = _rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield attrs
+    finally:
+        end = time.perf_counter()
+        _span_depth.reset(token)
+        memory_after = _rss_bytes()
+        thread = threading.current_thread()
+        trace.add({
+            "name": name,
+            "start": start - trace.origin,
+            "duration": end - start,
+            "memory_delta_bytes": None if memory_before is None else memory_after - memory_before,
+            "depth": depth,
+            "thread": thread.name,
+            "thread_id": thread.ident,
+            "attrs": attrs,
+        })
+
+
+def timed(name):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
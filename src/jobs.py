@@ -0,0 +1,198 @@
+import contextvars
+import os
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.instrumentation import span
+
+# Threads running background jobs, shared by every session (the heavy pandas,
+# Arrow and numpy calls release the GIL, so the script thread stays responsive)
+JOB_WORKERS = int(os.environ.get("NEATPLOT_JOB_WORKERS", str(max(2, os.cpu_count() or 1))))
+# Jobs finishing within this time never show a progress bar
+PROGRESS_DELAY_SECONDS = 0.3
+POLL_SECONDS = 0.25
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="neatplot-job")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# A computation running on the job pool. function(job) may call job.report()
+# to publish progress; report() raises JobCancelled once cancellation was
+# requested, so chunked work stops at the next chunk. Job functions must not
+# call streamlit: only the script thread may write to the page.
+class Job:
+    def __init__(self, key, label, function, background=True):
+        self.id = uuid.uuid4().hex[:8]
+        self.key = key
+        self.label = label
+        self.status = "queued"
+        self.progress = None
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+        if background:
+            # The job reports its timing span to the trace of the run that started it
+            self._future = _executor.submit(contextvars.copy_context().run, self._run, function)
+        else:
+            self._future = Future()
+            self._run(function)
+            self._future.set_result(None)
+
+    def _run(self, function):
+        if self._cancel.is_set():
+            return
+        self.status = "running"
+        try:
+            with span(f"job: {self.label}"):
+                self.result = function(self)
+            self.status = "cancelled" if self._cancel.is_set() else "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        finally:
+            self.finished = time.time()
+
+    # fraction is None while the total amount of work is unknown; partial is an
+    # early result (a preview frame, say) shown while the job runs
+    def report(self, fraction=None, message="", partial=None):
+        self.check()
+        self.progress = fraction
+        self.message = message
+        if partial is not None:
+            self.partial = partial
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+        # A job that has not started yet never will
+        if self._future.cancel():
+            self.status = "cancelled"
+            self.finished = time.time()
+
+    def wait(self, timeout=None):
+        wait([self._future], timeout=timeout)
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def cancelling(self):
+        return self._cancel.is_set() and not self.done
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.submitted
+
+
+# A session's jobs by key. Kept in session state so reruns attach to jobs
+# already in flight; when Streamlit discards the session, its jobs are cancelled.
+class JobRegistry:
+    def __init__(self):
+        self.jobs = {}
+        weakref.finalize(self, _cancel_all, self.jobs)
+
+    def get(self, key):
+        return self.jobs.get(key)
+
+    def submit(self, key, label, function):
+        job = Job(key, label, function)
+        self.jobs[key] = job
+        return job
+
+    def pop(self, key):
+        return self.jobs.pop(key, None)
+
+    def __iter__(self):
+        return iter(list(self.jobs.values()))
+
+
+def _cancel_all(jobs):
+    for job in list(jobs.values()):
+        job.cancel()
+
+
+def session_jobs():
+    if "jobs" not in st.session_state:
+        st.session_state.jobs = JobRegistry()
+    return st.session_state.jobs
+
+
+# Run function(job) in the background under key and return its result. A
+# rerun while the job is in flight attaches to it instead of starting over;
+# the page shows its progress and a Cancel button until it finishes. Failed
+# jobs re-raise their error; cancelled jobs stop the script with a Restart button.
+def run_job(key, label, function):
+    # Outside a Streamlit run (scripts, benchmarks) there is no page to report
+    # progress to, so the job runs in the calling thread
+    if get_script_run_ctx() is None:
+        job = Job(key, label, function, background=False)
+        if job.status == "failed":
+            raise job.error
+        return job.result
+    jobs = session_jobs()
+    job = jobs.get(key)
+    if job is None:
+        job = jobs.submit(key, label, function)
+    job.wait(PROGRESS_DELAY_SECONDS)
+    if not job.done:
+        _follow(job)
+
+    if job.status == "cancelled":
+        st.info(f"{job.label} was cancelled after {job.elapsed:.1f} s.")
+        if st.button("Restart", key=f"restart_{job.id}"):
+            jobs.pop(key)
+            st.rerun()
+        st.stop()
+    jobs.pop(key)
+    if job.status == "failed":
+        raise job.error
+    return job.result
+
+
+# Show a job's progress until it finishes. Widget interaction reruns the
+# script, which interrupts this loop but not the job.
+def _follow(job):
+    bar = st.progress(0.0, text=job.label)
+    preview = st.empty()
+    if st.button("Cancel", key=f"cancel_{job.id}"):
+        job.cancel()
+    shown_partial = None
+    while not job.done:
+        state = "cancelling" if job.cancelling else job.message
+        bar.progress(min(job.progress or 0.0, 1.0), text=f"{job.label}: {state} · {job.elapsed:.0f} s")
+        if job.partial is not None and job.partial is not shown_partial:
+            shown_partial = job.partial
+            preview.dataframe(shown_partial, use_container_width=True)
+        job.wait(POLL_SECONDS)
+    bar.empty()
+    preview.empty()
+
+
+# Sidebar list of this session's unfinished and cancelled jobs
+def show_jobs_panel():
+    jobs = list(session_jobs())
+    if not jobs:
+        return
+    st.caption("Background jobs")
+    for job in jobs:
+        progress = "" if job.progress is None else f" {job.progress:.0%}"
+        st.caption(f"{job.label}: {job.status}{progress} · {job.elapsed:.0f} s")
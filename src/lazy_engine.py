@@ -0,0 +1,312 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from src.text_cleaning import ARROW_NON_ALPHANUMERIC_PATTERN
+
+# Polars is optional: without it the app runs on eager pandas frames only
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+LAZY_EXTENSIONS = ('.csv', '.parquet', '.arrow')
+
+DESCRIBE_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def lazy_available():
+    return pl is not None
+
+
+def is_lazy(df):
+    return isinstance(df, LazyDataset)
+
+
+# Materialize a lazy result as a pandas frame; pandas frames pass through
+def materialize(df):
+    return df.to_pandas() if is_lazy(df) else df
+
+
+# Register a saved file as a lazy scan. Nothing is read until a query runs.
+def scan_file(file_path):
+    if pl is None:
+        raise ImportError("Lazy mode needs polars (pip install polars)")
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        frame = pl.scan_csv(file_path, infer_schema_length=10000)
+    elif extension == '.parquet':
+        frame = pl.scan_parquet(file_path)
+    elif extension == '.arrow':
+        frame = pl.scan_ipc(file_path, memory_map=True)
+    else:
+        raise ValueError(f"Unsupported file type for lazy mode: {extension}")
+    stat = os.stat(file_path)
+    return LazyDataset(frame, source=(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns))
+
+
+# Float columns can hold NaN as well as null; pandas treats both as missing
+def _missing(column, dtype):
+    expression = pl.col(column)
+    if dtype.is_float():
+        return expression.is_null() | expression.is_nan()
+    return expression.is_null()
+
+
+def _as_float(column, dtype):
+    expression = pl.col(column).cast(pl.Float64)
+    return expression.fill_nan(None) if dtype.is_float() else expression
+
+
+# Polars returns temporal scalars as datetime.date/datetime/timedelta; the
+# pandas frames the pages also handle give Timestamp and Timedelta
+def _pandas_scalar(value, dtype):
+    if value is None:
+        return value
+    if dtype == pl.Datetime or dtype == pl.Date:
+        return pd.Timestamp(value)
+    if dtype == pl.Duration:
+        return pd.Timedelta(value)
+    return value
+
+
+# Rust regex character class matching exactly the given characters
+def _character_class(special_chars):
+    return "[" + "".join(f"\\x{{{ord(c):x}}}" for c in dict.fromkeys(special_chars)) + "]"
+
+
+# A query plan over a Polars LazyFrame with the subset of the pandas frame API
+# the pages use. Transformations extend the plan; only queries that return
+# small results (head, counts, aggregates, the columns a chart draws) run it,
+# so Polars can push projections and filters down into the scan and execute
+# on all cores.
+class LazyDataset:
+    def __init__(self, frame, source, steps=()):
+        self.frame = frame
+        self.source = source
+        self.steps = steps
+        self._schema = None
+        self._empty = None
+        self._rows = None
+
+    def _derive(self, frame, *step):
+        return LazyDataset(frame, self.source, self.steps + (step,))
+
+    # Version identifier: the scanned file plus every step applied to it
+    def fingerprint(self):
+        return hashlib.sha1(repr((self.source, self.steps)).encode()).hexdigest()
+
+    @property
+    def schema(self):
+        if self._schema is None:
+            self._schema = self.frame.collect_schema()
+        return self._schema
+
+    # Zero-row pandas frame with the dtypes this plan produces
+    @property
+    def _template(self):
+        if self._empty is None:
+            self._empty = pl.DataFrame(schema=self.schema).to_pandas()
+        return self._empty
+
+    @property
+    def columns(self):
+        return self._template.columns
+
+    @property
+    def dtypes(self):
+        return self._template.dtypes
+
+    @property
+    def shape(self):
+        return (len(self), len(self.columns))
+
+    @property
+    def empty(self):
+        return len(self.columns) == 0 or len(self) == 0
+
+    def __len__(self):
+        if self._rows is None:
+            self._rows = self.frame.select(pl.len()).collect().item()
+        return self._rows
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.to_pandas([key])[key]
+        return self.select(key)
+
+    def to_pandas(self, columns=None):
+        frame = self.frame if columns is None else self.frame.select(list(dict.fromkeys(columns)))
+        return frame.collect().to_pandas()
+
+    def to_csv(self, index=False):
+        return self.frame.collect().write_csv()
+
+    # Stream the result to a file without collecting it
+    def sink(self, file_path, kind, compression=None):
+        if kind == "csv":
+            self.frame.sink_csv(file_path)
+        elif kind == "parquet":
+            self.frame.sink_parquet(file_path, compression=compression or "zstd")
+        elif kind == "feather":
+            self.frame.sink_ipc(file_path, compression=compression)
+        else:
+            raise ValueError(f"Unsupported export format: {kind}")
+
+    def head(self, n=5):
+        return self.frame.head(n).collect().to_pandas()
+
+    def select(self, columns):
+        columns = list(columns)
+        return self._derive(self.frame.select(columns), "select", tuple(columns))
+
+    def drop(self, columns):
+        columns = list(columns)
+        return self._derive(self.frame.drop(columns), "drop", tuple(columns))
+
+    def select_dtypes(self, include=None, exclude=None):
+        return self.select(self._template.select_dtypes(include=include, exclude=exclude).columns)
+
+    def dropna(self):
+        return self._derive(self.frame.filter(~pl.any_horizontal(
+            [_missing(c, t) for c, t in self.schema.items()])), "dropna")
+
+    def sort_values(self, by):
+        return self._derive(self.frame.sort(by, nulls_last=True), "sort", by)
+
+    # Queries
+
+    def null_counts(self):
+        counts = self.frame.select([_missing(c, t).sum().alias(c) for c, t in self.schema.items()]).collect()
+        return pd.Series(counts.row(0), index=self.columns, dtype="int64")
+
+    # Nulls, min, max (numeric and temporal columns) and distinct count per column, in one query
+    def column_stats(self):
+        expressions = []
+        for column, dtype in self.schema.items():
+            present = pl.col(column).filter(~_missing(column, dtype))
+            expressions += [_missing(column, dtype).sum().alias(f"nulls\x00{column}"),
+                            present.n_unique().alias(f"distinct\x00{column}")]
+            if (dtype.is_numeric() or dtype.is_temporal()) and dtype != pl.Boolean:
+                expressions += [present.min().alias(f"min\x00{column}"), present.max().alias(f"max\x00{column}")]
+        values = self.frame.select(expressions).collect().row(0, named=True) if expressions else {}
+        stats = pd.DataFrame(index=self.columns, columns=["nulls", "min", "max", "distinct"], dtype=object)
+        for name, value in values.items():
+            stat, column = name.split("\x00", 1)
+            if stat in ("min", "max"):
+                value = _pandas_scalar(value, self.schema[column])
+            stats.at[column, stat] = value
+        return stats.astype({"nulls": "int64", "distinct": "int64"})
+
+    def describe(self):
+        numeric = self._template.select_dtypes(include="number").columns
+        if len(numeric) == 0:
+            return self._describe_categorical()
+        expressions = []
+        for i, column in enumerate(numeric):
+            value = _as_float(column, self.schema[column])
+            expressions += [value.count(), value.mean(), value.std(), value.min(),
+                            value.quantile(0.25, "linear"), value.quantile(0.5, "linear"),
+                            value.quantile(0.75, "linear"), value.max()]
+        expressions = [e.alias(str(i)) for i, e in enumerate(expressions)]
+        values = self.frame.select(expressions).collect().row(0)
+        size = len(DESCRIBE_STATS)
+        return pd.DataFrame({column: values[i * size:(i + 1) * size] for i, column in enumerate(numeric)},
+                            index=DESCRIBE_STATS, dtype="float64")
+
+    def _describe_categorical(self):
+        result = {}
+        for column in self.columns:
+            counts = self.value_counts(column)
+            result[column] = [int(counts.sum()), len(counts),
+                              counts.index[0] if len(counts) else None,
+                              int(counts.iloc[0]) if len(counts) else None]
+        return pd.DataFrame(result, index=["count", "unique", "top", "freq"], dtype=object)
+
+    # Pairwise Pearson correlation over rows where both values are present, in one pass
+    def corr(self):
+        columns = list(self.columns)
+        expressions = []
+        for i, a in enumerate(columns):
+            for b in columns[i + 1:]:
+                present = ~_missing(a, self.schema[a]) & ~_missing(b, self.schema[b])
+                expressions.append(pl.corr(pl.col(a).cast(pl.Float64).filter(present),
+                                           pl.col(b).cast(pl.Float64).filter(present)).alias(f"{a}\x00{b}"))
+        matrix = pd.DataFrame(1.0, index=columns, columns=columns)
+        if expressions:
+            for name, value in self.frame.select(expressions).collect().row(0, named=True).items():
+                a, b = name.split("\x00")
+                matrix.loc[a, b] = matrix.loc[b, a] = value
+        return matrix
+
+    def value_counts(self, column, sort_index=False):
+        counts = (self.frame.filter(~_missing(column, self.schema[column]))
+                  .group_by(column).agg(pl.len().alias("count"))
+                  .sort(column if sort_index else "count", descending=not sort_index)
+                  .collect().to_pandas())
+        return counts.set_index(column)["count"]
+
+    def group_mean(self, by, column):
+        means = (self.frame.filter(~_missing(by, self.schema[by]))
+                 .group_by(by).agg(_as_float(column, self.schema[column]).mean())
+                 .sort(by).collect().to_pandas())
+        return means.set_index(by)[column]
+
+    # Transformations
+
+    def fill_missing(self, method, columns):
+        columns = list(columns)
+        if method == "Drop rows":
+            return self._derive(self.frame.filter(~pl.any_horizontal(
+                [_missing(c, t) for c, t in self.schema.items()])), "fill_missing", method), {}
+
+        numeric = [c for c in columns if self.schema[c].is_numeric()]
+        statistics = []
+        for column in columns:
+            dtype = self.schema[column]
+            if column in numeric:
+                value = _as_float(column, dtype)
+                statistics.append((value.mean() if method == "Fill with mean/mode" else value.median()).alias(column))
+            else:
+                statistics.append(pl.col(column).drop_nulls().mode().sort().first().alias(column))
+        fill_values = self.frame.select(statistics).collect().row(0, named=True) if statistics else {}
+
+        # Integer columns take the rounded statistic, as in the pandas fill
+        fill_values = {c: round(v) if self.schema[c].is_integer() else v
+                       for c, v in fill_values.items() if v is not None}
+        expressions = []
+        for column, value in fill_values.items():
+            dtype = self.schema[column]
+            expression = pl.col(column).fill_nan(value) if dtype.is_float() else pl.col(column)
+            expressions.append(expression.fill_null(pl.lit(value).cast(dtype)).alias(column))
+        frame = self.frame.with_columns(expressions) if expressions else self.frame
+        return self._derive(frame, "fill_missing", method, tuple(columns)), fill_values
+
+    # Cast a column, checking the cast over that column alone so that bad
+    # values surface here rather than in whichever query runs next
+    def convert(self, column, new_type):
+        dtype = self.schema[column]
+        if new_type == "int":
+            expression = pl.col(column).cast(pl.Int64)
+        elif new_type == "float":
+            expression = pl.col(column).cast(pl.Float64)
+        elif new_type == "string":
+            expression = pl.col(column).cast(pl.Utf8)
+        elif new_type == "datetime":
+            if dtype == pl.Utf8:
+                expression = pl.col(column).str.to_datetime()
+            else:
+                expression = pl.col(column).cast(pl.Datetime)
+        else:
+            raise ValueError(f"Unknown data type: {new_type}")
+        try:
+            self.frame.select(expression.null_count()).collect()
+        except pl.exceptions.PolarsError as e:
+            raise ValueError(str(e).splitlines()[0]) from None
+        return self._derive(self.frame.with_columns(expression.alias(column)), "convert", column, new_type)
+
+    def remove_characters(self, columns, special_chars):
+        pattern = _character_class(special_chars) if special_chars else ARROW_NON_ALPHANUMERIC_PATTERN
+        expressions = [pl.col(c).cast(pl.Utf8).str.replace_all(pattern, "").alias(c) for c in columns]
+        return self._derive(self.frame.with_columns(expressions), "remove_characters", tuple(columns), special_chars)
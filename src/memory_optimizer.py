@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+# Object columns whose share of distinct values is at or below this become categoricals
+CATEGORY_MAX_RATIO = 0.5
+# Dtype for the remaining (high-cardinality) string columns
+STRING_DTYPE = "string[pyarrow]"
+
+
+# Narrowest signed type holding the values. Signed, so a difference of two
+# values keeps its sign, but arithmetic on int8/int16 columns can still
+# overflow the narrow type, as in numpy.
+def _downcast_integer(series):
+    return pd.to_numeric(series, downcast='integer')
+
+
+# Only narrow floats when float32 round-trips every value exactly
+def _downcast_float(series):
+    if series.dtype == np.float32:
+        return series
+    narrowed = series.astype(np.float32)
+    if np.array_equal(narrowed.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+        return narrowed
+    return series
+
+
+def _optimize_strings(series, category_max_ratio, string_dtype):
+    if types.infer_dtype(series, skipna=True) != 'string':
+        return series
+    if series.nunique(dropna=True) <= category_max_ratio * len(series):
+        return series.astype('category')
+    return series.astype(string_dtype)
+
+
+def optimize_series(series, category_max_ratio=CATEGORY_MAX_RATIO, string_dtype=STRING_DTYPE):
+    if types.is_bool_dtype(series):
+        return series
+    # Extension dtypes (nullable, Arrow-backed) are already compact
+    if not isinstance(series.dtype, np.dtype):
+        return series
+    if types.is_integer_dtype(series):
+        return _downcast_integer(series)
+    if types.is_float_dtype(series):
+        return _downcast_float(series)
+    if types.is_object_dtype(series) and len(series):
+        return _optimize_strings(series, category_max_ratio, string_dtype)
+    return series
+
+
+# Downcast numeric columns and re-encode string columns as categoricals or
+# Arrow-backed strings. Returns the optimized frame and a per-column report.
+def optimize_memory(df, category_max_ratio=CATEGORY_MAX_RATIO, string_dtype=STRING_DTYPE):
+    before = df.memory_usage(index=False, deep=True).to_numpy()
+    before_dtypes = df.dtypes.astype(str).to_numpy()
+
+    optimized = df.copy(deep=False)
+    for i in range(df.shape[1]):
+        optimized.isetitem(i, optimize_series(df.iloc[:, i], category_max_ratio, string_dtype))
+
+    after = optimized.memory_usage(index=False, deep=True).to_numpy()
+    report = pd.DataFrame({
+        "column": df.columns,
+        "dtype before": before_dtypes,
+        "dtype after": optimized.dtypes.astype(str).to_numpy(),
+        "bytes before": before,
+        "bytes after": after,
+    })
+    report["saved %"] = np.where(before > 0, (1 - after / np.maximum(before, 1)) * 100, 0.0).round(1)
+    return optimized, report
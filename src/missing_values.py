@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from src.lazy_engine import is_lazy
+
+FILL_METHODS = ["Drop rows", "Fill with mean/mode", "Fill with median"]
+
+
+# One pass over the frame: number of missing values per column
+def null_counts(df):
+    if is_lazy(df):
+        return df.null_counts()
+    sparse = [column for column, dtype in df.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+    if not sparse:
+        return df.isna().sum()
+    # Sparse columns (generated features) are counted one by one: reducing them
+    # together with dense columns densifies them
+    counts = df.drop(columns=sparse).isna().sum()
+    sparse_counts = pd.Series({column: int(df[column].isna().sum()) for column in sparse}, dtype="int64")
+    return pd.concat([counts, sparse_counts]).reindex(df.columns)
+
+
+# Fill numeric columns with their mean or median; returns the fill values used
+def _fill_numeric_block(filled, df, columns, method):
+    stats = df[columns].mean() if method == "Fill with mean/mode" else df[columns].median()
+    # Plain float columns are filled as one 2D array per dtype with a single masked copy
+    float_columns = [c for c in columns if isinstance(df[c].dtype, np.dtype) and df[c].dtype.kind == 'f']
+    by_dtype = {}
+    for column in float_columns:
+        by_dtype.setdefault(df[column].dtype, []).append(column)
+    for dtype, group in by_dtype.items():
+        values = df[group].to_numpy(dtype=dtype, copy=True)
+        fills = stats[group].to_numpy(dtype=dtype, na_value=np.nan)
+        np.copyto(values, np.broadcast_to(fills, values.shape), where=np.isnan(values))
+        filled[group] = values
+    # Nullable extension columns fill through pandas; integer ones take the rounded statistic
+    for column in columns:
+        if column not in float_columns:
+            value = stats[column]
+            if pd.api.types.is_integer_dtype(df[column]) and pd.notna(value):
+                value = stats[column] = round(value)
+            filled[column] = df[column].fillna(value)
+    return stats.to_dict()
+
+
+# Fill or drop missing values. columns are the columns known to contain
+# missing values (computed when None). Returns (frame, fill values used).
+def fill_missing_values(df, method, columns=None):
+    if columns is None:
+        counts = null_counts(df)
+        columns = counts[counts > 0].index.tolist()
+    columns = list(columns)
+
+    if is_lazy(df):
+        return df.fill_missing(method, columns)
+
+    if method == "Drop rows":
+        return df.dropna(), {}
+
+    filled = df.copy(deep=False)
+    numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c])]
+    fill_values = _fill_numeric_block(filled, df, numeric, method) if numeric else {}
+
+    for column in columns:
+        if column in numeric:
+            continue
+        mode = df[column].mode()
+        if not mode.empty:
+            fill_values[column] = mode[0]
+            filled[column] = df[column].fillna(mode[0])
+    return filled, fill_values
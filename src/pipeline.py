@@ -0,0 +1,54 @@
+import hashlib
+
+from src.cache import dataset_fingerprint, estimate_size, set_version
+from src.instrumentation import span
+
+
+def stage_version(input_version, name, params):
+    return hashlib.sha1(repr((input_version, name, params)).encode()).hexdigest()
+
+
+# Runs transforms one after another, memoizing each stage's output on the
+# version of its input plus its own parameters. Versions chain from the
+# version of the source frame (the content hash it was loaded under, or a
+# hash of every row), so a change to one stage only recomputes that stage and
+# the ones after it. Each stage's output is recorded under its stage version,
+# so caches keyed on the final frame need no hashing of their own.
+#
+# Transforms take (df, **params), must not modify df in place, and return
+# (new_df, notes) where notes is a list of (level, message) pairs.
+#
+# run(version, name, compute) executes each cache miss; the default calls
+# compute() directly, the app passes one that runs it as a background job.
+class CachedPipeline:
+    def __init__(self, df, cache, run=None):
+        self.df = df
+        self.version = dataset_fingerprint(df)
+        self.cache = cache
+        self.run = run or (lambda version, name, compute: compute())
+
+    def apply(self, name, transform, **params):
+        version = stage_version(self.version, name, tuple(sorted(params.items())))
+        with span(f"stage: {name}") as attrs:
+            entry = self.cache.get(version)
+            attrs["cached"] = entry is not None
+            if entry is None:
+                df = self.df
+                entry = self.run(version, name, lambda: transform(df, **params))
+                self.cache.put(version, entry, size=estimate_size(entry[0]))
+        self.df, notes = entry
+        self.version = version
+        set_version(self.df, version)
+        return notes
+
+    # Memoize a derived value (null counts, dtypes, ...) of the current frame
+    def compute(self, name, function):
+        key = stage_version(self.version, name, "derived")
+        with span(f"derived: {name}") as attrs:
+            value = self.cache.get(key)
+            attrs["cached"] = value is not None
+            if value is None:
+                df = self.df
+                value = self.run(key, name, lambda: function(df))
+                self.cache.put(key, value)
+        return value
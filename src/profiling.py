@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cache import LRUCache, dataset_fingerprint
+from src.lazy_engine import is_lazy
+from src.missing_values import null_counts
+
+# Memory budget for column profiles of datasets shown on any page (in MB)
+PROFILE_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_PROFILE_CACHE_MB", "64"))
+
+_profile_cache = LRUCache(PROFILE_CACHE_MAX_MB * 1024 * 1024, name="profile cache")
+
+
+# Kinds used to offer columns to widgets: "numeric" matches select_dtypes(np.number)
+# and "categorical" matches select_dtypes(['object', 'string', 'category'])
+def column_kind(dtype):
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype)):
+        return "categorical"
+    return "other"
+
+
+def _distinct_counts(df):
+    try:
+        return df.nunique()
+    except TypeError:
+        # Unhashable cells (lists, dicts from nested JSON) are counted by their text
+        return pd.Series({column: df[column].astype(str).nunique() for column in df.columns}, dtype="int64")
+
+
+# Nulls, min, max and distinct count per column, reduced block by block
+def _column_stats(df, kinds):
+    if is_lazy(df):
+        return df.column_stats()
+    stats = pd.DataFrame(index=df.columns)
+    stats["nulls"] = null_counts(df)
+    ordered = [column for column, kind in kinds.items() if kind in ("numeric", "datetime")]
+    stats["min"] = stats["max"] = pd.Series(np.nan, index=df.columns, dtype=object)
+    if ordered:
+        extremes = df[ordered].agg(["min", "max"]).T
+        stats.loc[ordered, "min"] = extremes["min"]
+        stats.loc[ordered, "max"] = extremes["max"]
+    stats["distinct"] = _distinct_counts(df)
+    return stats
+
+
+# One row per column: dtype, kind, nulls, min, max (numeric and datetime
+# columns) and distinct count
+def profile_frame(df):
+    kinds = {column: column_kind(dtype) for column, dtype in df.dtypes.items()}
+    profile = pd.DataFrame({"dtype": df.dtypes.astype(str), "kind": pd.Series(kinds)}, index=df.columns)
+    return profile.join(_column_stats(df, kinds))
+
+
+# Profile of a frame, computed once per dataset version and shared by all pages
+def column_profile(df):
+    return _profile_cache.get_or_compute(dataset_fingerprint(df), lambda: profile_frame(df))
+
+
+# Store a profile derived incrementally, so pages shown later skip the scan
+def remember_profile(df, profile):
+    _profile_cache.put(dataset_fingerprint(df), profile)
+
+
+# Recompute the rows of the given columns only (after a conversion, fill or cleaning)
+def update_profile(profile, df, columns):
+    columns = list(columns)
+    if not columns:
+        return profile
+    updated = profile_frame(df[columns])
+    return pd.concat([profile.drop(index=columns, errors="ignore"), updated]).reindex(df.columns)
+
+
+def columns_of_kind(profile, kind):
+    return profile.index[profile["kind"] == kind].tolist()
+
+
+def profile_cache_stats():
+    return _profile_cache.stats()
@@ -0,0 +1,44 @@
+import json
+
+import pandas as pd
+
+from src.encoding import detect_encoding
+
+# Parsers for uploaded files. They take a binary file object and do not touch
+# streamlit, so batch ingestion can run them in worker processes.
+
+
+def read_csv(file):
+    # Detect the file encoding from a bounded sample
+    detected_encoding = detect_encoding(file)
+
+    # Read the CSV straight from the stream with the detected encoding
+    try:
+        return pd.read_csv(file, encoding=detected_encoding)
+    except UnicodeDecodeError:
+        # The sample missed bytes outside the guessed encoding, so scan everything
+        file.seek(0)
+        return pd.read_csv(file, encoding=detect_encoding(file, full_scan=True))
+
+
+def read_excel(file, sheet_name=0):
+    return pd.read_excel(file, sheet_name=sheet_name)
+
+
+def read_json(file):
+    json_data = json.load(file)
+    return pd.json_normalize(json_data)
+
+
+# Sheet names of a workbook, without parsing any sheet
+def excel_sheet_names(file):
+    with pd.ExcelFile(file) as workbook:
+        return workbook.sheet_names
+
+
+READERS = {
+    '.csv': ("csv", read_csv),
+    '.xlsx': ("excel", read_excel),
+    '.xls': ("excel", read_excel),
+    '.json': ("json", read_json),
+}
@@ -0,0 +1,180 @@
+import json
+import os
+
+from src.columnar import is_columnar, load_columnar, save_columnar
+from src.memory_optimizer import optimize_memory
+from src.missing_values import FILL_METHODS
+from src.readers import READERS
+from src.text_cleaning import ENGINES
+from src.transforms import convert_types, drop_columns, fill_missing, remove_characters, select_columns
+from src.type_conversion import CONVERSION_TYPES
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# A recipe is the processing page as data, so the same cleaning can run
+# without Streamlit:
+#
+#   {"version": 1,
+#    "load": {"optimize": false},
+#    "steps": [{"step": "select_columns", "columns": ["a", "b"]},
+#              {"step": "fill_missing", "method": "Fill with median"},
+#              {"step": "convert_types", "conversions": [["a", "datetime"]]},
+#              {"step": "remove_characters", "columns": ["c"], "special_chars": "!?"}]}
+#
+# Steps run in order; their parameters are the keyword arguments of the
+# transform of the same name. "columns" may be left out of fill_missing to
+# fill every column with missing values.
+
+RECIPE_VERSION = 1
+
+STEPS = {
+    "select_columns": select_columns,
+    "drop_columns": drop_columns,
+    "fill_missing": fill_missing,
+    "convert_types": convert_types,
+    "remove_characters": remove_characters,
+}
+
+# step -> (required parameters, optional parameters)
+STEP_PARAMETERS = {
+    "select_columns": ({"columns"}, set()),
+    "drop_columns": ({"columns"}, set()),
+    "fill_missing": ({"method"}, {"columns"}),
+    "convert_types": ({"conversions"}, set()),
+    "remove_characters": ({"columns", "special_chars"}, {"engine"}),
+}
+
+OUTPUT_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
+def new_recipe(optimize=False):
+    return {"version": RECIPE_VERSION, "load": {"optimize": optimize}, "steps": []}
+
+
+def add_step(recipe, step, **params):
+    recipe["steps"].append(dict(step=step, **params))
+    return recipe["steps"][-1]
+
+
+# Check a recipe's structure and parameters, raising ValueError on the first problem
+def validate_recipe(recipe):
+    if not isinstance(recipe, dict) or not isinstance(recipe.get("steps"), list):
+        raise ValueError("A recipe is a mapping with a list of steps")
+    if recipe.get("version", RECIPE_VERSION) != RECIPE_VERSION:
+        raise ValueError(f"Unsupported recipe version: {recipe['version']}")
+    for position, step in enumerate(recipe["steps"], 1):
+        name = step.get("step") if isinstance(step, dict) else None
+        if name not in STEPS:
+            raise ValueError(f"Step {position}: unknown step {name!r} (expected one of {', '.join(STEPS)})")
+        required, optional = STEP_PARAMETERS[name]
+        given = set(step) - {"step"}
+        if required - given:
+            raise ValueError(f"Step {position} ({name}): missing {', '.join(sorted(required - given))}")
+        if given - required - optional:
+            raise ValueError(f"Step {position} ({name}): unexpected {', '.join(sorted(given - required - optional))}")
+        if name == "fill_missing" and step["method"] not in FILL_METHODS:
+            raise ValueError(f"Step {position} (fill_missing): method must be one of {', '.join(FILL_METHODS)}")
+        if name == "convert_types":
+            for conversion in step["conversions"]:
+                if len(conversion) != 2 or conversion[1] not in CONVERSION_TYPES:
+                    raise ValueError(f"Step {position} (convert_types): {conversion!r} is not [column, one of {', '.join(CONVERSION_TYPES)}]")
+        if name == "remove_characters" and step.get("engine", ENGINES[0]) not in ENGINES:
+            raise ValueError(f"Step {position} (remove_characters): engine must be one of {', '.join(ENGINES)}")
+    return recipe
+
+
+# Transform keyword arguments of a step. Lists become tuples so the values can
+# key the pipeline cache.
+def step_params(step):
+    params = {}
+    for key, value in step.items():
+        if key == "step":
+            continue
+        if isinstance(value, list):
+            value = tuple(tuple(item) if isinstance(item, list) else item for item in value)
+        params[key] = value
+    return params
+
+
+def apply_step(df, step):
+    return STEPS[step["step"]](df, **step_params(step))
+
+
+# Run every step of the recipe. Returns (df, notes), with each note prefixed
+# by the step it came from.
+def apply_recipe(df, recipe):
+    notes = []
+    for step in validate_recipe(recipe)["steps"]:
+        df, step_notes = apply_step(df, step)
+        notes.extend((level, f"{step['step']}: {message}") for level, message in step_notes if level != "dataframe")
+    return df, notes
+
+
+def is_yaml(path):
+    return path.lower().endswith((".yaml", ".yml"))
+
+
+def load_recipe(path):
+    with open(path) as file:
+        if is_yaml(path):
+            if yaml is None:
+                raise ValueError("YAML recipes need PyYAML (pip install pyyaml)")
+            recipe = yaml.safe_load(file)
+        else:
+            recipe = json.load(file)
+    return validate_recipe(recipe)
+
+
+def dump_recipe(recipe, as_yaml=False):
+    if as_yaml:
+        if yaml is None:
+            raise ValueError("YAML recipes need PyYAML (pip install pyyaml)")
+        return yaml.safe_dump(recipe, sort_keys=False, allow_unicode=True)
+    return json.dumps(recipe, indent=2, ensure_ascii=False)
+
+
+def is_input_file(file_name):
+    return os.path.splitext(file_name)[1].lower() in READERS or is_columnar(file_name)
+
+
+# Read a data file with the same parsers the upload page uses
+def read_file(path, optimize=False):
+    extension = os.path.splitext(path)[1].lower()
+    if is_columnar(path):
+        data = load_columnar(path)
+    elif extension in READERS:
+        with open(path, "rb") as file:
+            data = READERS[extension][1](file)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+    if optimize:
+        data, _ = optimize_memory(data)
+    return data
+
+
+def write_file(data, path):
+    if path.lower().endswith(".csv"):
+        data.to_csv(path, index=False)
+    else:
+        save_columnar(data, path)
+
+
+# Load a file, apply the recipe and write the result. Returns a report row.
+def process_file(input_path, output_path, recipe):
+    data = read_file(input_path, recipe.get("load", {}).get("optimize", False))
+    rows_in = len(data)
+    data, notes = apply_recipe(data, recipe)
+    write_file(data, output_path)
+    return {
+        "rows_in": rows_in,
+        "rows_out": len(data),
+        "columns_out": len(data.columns),
+        "warnings": "; ".join(message for level, message in notes if level in ("warning", "error")),
+    }
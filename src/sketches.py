@@ -0,0 +1,343 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Larger compression keeps more centroids: about compression / 2, with a rank
+# error of at most pi / compression around the median and less in the tails
+DIGEST_COMPRESSION = 1000
+# 2 ** precision registers; relative standard error 1.04 / sqrt(registers)
+HLL_PRECISION = 14
+SKETCH_CHUNK_ROWS = 1_000_000
+# Quantile digests of larger chunks are built from a uniform sample of this
+# many values; the rank of a quantile drawn from m values is within 1 / sqrt(m)
+# of the true rank at two standard deviations
+DIGEST_SAMPLE_ROWS = 65_536
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+# Mergeable quantile sketch (t-digest with the k1 scale function). Centroids
+# are formed by cutting the sorted values wherever the scale function
+# k(q) = compression / (2 pi) * asin(2q - 1) crosses an integer, which keeps
+# centroids small near the tails and vectorizes the whole build.
+class TDigest:
+    def __init__(self, means=None, weights=None, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+        self.min = self.means.min() if len(self.means) else np.nan
+        self.max = self.means.max() if len(self.means) else np.nan
+        # Rank error from building on a sample rather than every value
+        self.sample_error = 0.0
+
+    # Digest of the values, or of a uniform sample of sample_rows of them
+    # weighted up to the full count; min and max are always exact
+    @classmethod
+    def from_values(cls, values, compression=DIGEST_COMPRESSION, sample_rows=None):
+        missing = np.isnan(values)
+        if missing.any():
+            values = values[~missing]
+        digest = cls(compression=compression)
+        total = len(values)
+        if not total:
+            return digest
+        low, high = values.min(), values.max()
+        if sample_rows is not None and total > sample_rows:
+            values = values[np.random.default_rng(0).integers(0, total, sample_rows)]
+            digest.sample_error = 1 / np.sqrt(sample_rows)
+        values = np.sort(values)
+        n = len(values)
+        # With unit weights the cuts fall where q crosses sin(2 pi j / compression),
+        # so only the boundaries are computed, not k(q) for every value
+        j = np.arange(np.ceil(-compression / 4), np.floor(compression / 4) + 1)
+        cuts = np.ceil((np.sin(2 * np.pi * j / compression) + 1) / 2 * n - 0.5)
+        starts = np.unique(np.clip(np.r_[0, cuts], 0, n - 1).astype(np.intp))
+        weights = np.diff(np.r_[starts, n]).astype(np.float64)
+        digest.means = np.add.reduceat(values, starts) / weights
+        digest.weights = weights * (total / n)
+        digest.min, digest.max = low, high
+        return digest
+
+    def _compress(self, means, weights):
+        total = weights.sum()
+        if total == 0:
+            return
+        middle = (np.cumsum(weights) - weights / 2) / total
+        bucket = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * middle - 1))
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def merge(self, other):
+        merged = TDigest(compression=self.compression)
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(means, kind="stable")
+        merged._compress(means[order], weights[order])
+        merged.min = np.fmin(self.min, other.min)
+        merged.max = np.fmax(self.max, other.max)
+        merged.sample_error = max(self.sample_error, other.sample_error)
+        return merged
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    # Interpolate between centroid centres, pinned to the exact min and max
+    def quantile(self, q):
+        if not len(self.means):
+            return np.nan
+        centres = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0, centres, self.count]
+        values = np.r_[self.min, self.means, self.max]
+        return float(np.interp(q * self.count, positions, values))
+
+    # Half the weight of the centroid holding quantile q, as a fraction of all
+    # values, plus the sampling error: how far in rank the estimate can be from
+    # the true quantile
+    def rank_error(self, q):
+        if not len(self.means):
+            return np.nan
+        index = min(np.searchsorted(np.cumsum(self.weights), q * self.count), len(self.weights) - 1)
+        return float(self.weights[index] / (2 * self.count) + self.sample_error)
+
+
+# Mergeable distinct-count sketch
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def add(self, series):
+        series = series.dropna()
+        if series.empty:
+            return self
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Hash each category in use once instead of every row
+            series = pd.Series(series.cat.categories[np.unique(series.cat.codes)])
+        try:
+            hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        except TypeError:
+            hashes = pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy()
+        return self._add_hashes(hashes)
+
+    # Float64 values without missing ones, hashed by mixing their bits with
+    # the MurmurHash3 finalizer; adding 0.0 turns -0.0 into 0.0 first
+    def add_values(self, values):
+        if len(values):
+            hashes = (values + 0.0).view(np.uint64)
+            hashes ^= hashes >> np.uint64(33)
+            hashes *= np.uint64(0xFF51AFD7ED558CCD)
+            hashes ^= hashes >> np.uint64(33)
+            hashes *= np.uint64(0xC4CEB9FE1A85EC53)
+            hashes ^= hashes >> np.uint64(33)
+            self._add_hashes(hashes)
+        return self
+
+    def _add_hashes(self, hashes):
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).view(np.int64)
+        # Ranks come from the next 32 bits; the guard bit caps them at 32
+        # (reached by one hash in four billion) so top is never zero
+        top = (hashes >> np.uint64(32 - p)).astype(np.uint32) | np.uint32(1)
+        # 33 minus the bit length of top, read off the float64 exponent field
+        exponent = top.astype(np.float64).view(np.uint64) >> np.uint64(52)
+        rank = (1055 - exponent).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            estimate = m * np.log(m / zeros)
+        return float(estimate)
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+# Pairwise count, means and co-moments of numeric columns, over the rows where
+# both columns of a pair are present (pandas' pairwise-complete convention).
+# Chunks are reduced with matrix products and merged with Chan's parallel
+# form of Welford's update, so a single pass gives counts, means, variances,
+# covariances and correlations.
+class Comoments:
+    def __init__(self, columns):
+        k = len(columns)
+        self.columns = list(columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+
+    @classmethod
+    def from_values(cls, values, columns):
+        moments = cls(columns)
+        present = ~np.isnan(values)
+        # Centre on a rough mean (from the first rows) so the raw sums stay small
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            shift = np.nan_to_num(np.nanmean(values[:1000], axis=0)) if len(values) else np.zeros(len(columns))
+        centred = values - shift
+        if present.all():
+            # Every pair is complete: one product gives all co-moments
+            n = np.full((len(columns), len(columns)), float(len(values)))
+            sums = np.broadcast_to(centred.sum(axis=0)[:, None], n.shape)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                moments.n = n
+                moments.mean = np.where(n > 0, sums / n, 0.0) + shift[:, None]
+                moments.comoment = np.where(n > 0, centred.T @ centred - sums * sums.T / n, 0.0)
+                moments.m2 = np.broadcast_to(np.diag(moments.comoment)[:, None], n.shape).copy()
+            return moments
+        centred[~present] = 0.0
+        mask = present.astype(np.float64)
+        n = mask.T @ mask
+        sums = centred.T @ mask
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moments.n = n
+            moments.mean = np.where(n > 0, sums / n, 0.0) + shift[:, None]
+            moments.comoment = np.where(n > 0, centred.T @ centred - sums * sums.T / n, 0.0)
+            moments.m2 = np.where(n > 0, (centred * centred).T @ mask - sums * sums / n, 0.0)
+        return moments
+
+    def merge(self, other):
+        merged = Comoments(self.columns)
+        n = self.n + other.n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            delta = other.mean - self.mean
+            merged.n = n
+            merged.mean = self.mean + np.where(n > 0, delta * other.n / n, 0.0)
+            merged.comoment = self.comoment + other.comoment + delta * delta.T * weight
+            merged.m2 = self.m2 + other.m2 + delta * delta * weight
+        return merged
+
+    def correlation(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matrix = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        matrix = np.where(self.n > 1, np.clip(matrix, -1, 1), np.nan)
+        np.fill_diagonal(matrix, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        return pd.DataFrame(matrix, index=self.columns, columns=self.columns)
+
+
+class ColumnSketch:
+    def __init__(self, numeric, compression=DIGEST_COMPRESSION):
+        self.numeric = numeric
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.digest = TDigest(compression=compression) if numeric else None
+        self.distinct = HyperLogLog()
+
+    @classmethod
+    def from_series(cls, series, numeric, compression=DIGEST_COMPRESSION, sample_rows=DIGEST_SAMPLE_ROWS):
+        sketch = cls(numeric, compression)
+        if numeric:
+            if isinstance(series.dtype, np.dtype):
+                # NumPy dtypes hold no NA: float64 columns are used without a copy
+                values = series.to_numpy(dtype=np.float64)
+            else:
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            missing = np.isnan(values)
+            if missing.any():
+                values = values[~missing]
+            sketch.distinct.add_values(values)
+            sketch.count = len(values)
+            if sketch.count:
+                sketch.mean = float(values.mean())
+                sketch.m2 = float(values.var() * sketch.count)
+            sketch.digest = TDigest.from_values(values, compression, sample_rows)
+        else:
+            sketch.distinct.add(series)
+            sketch.count = int(series.count())
+        return sketch
+
+    # Chan's parallel update for the mean and sum of squared deviations
+    def merge(self, other):
+        merged = ColumnSketch(self.numeric)
+        merged.count = self.count + other.count
+        if merged.count:
+            delta = other.mean - self.mean
+            merged.mean = self.mean + delta * other.count / merged.count
+            merged.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / merged.count
+        merged.digest = self.digest.merge(other.digest) if self.numeric else None
+        merged.distinct = self.distinct.merge(other.distinct)
+        return merged
+
+
+def _row_chunks(data, chunk_rows):
+    return [data[start:start + chunk_rows] for start in range(0, max(len(data), 1), chunk_rows)]
+
+
+# Reduce chunks in parallel threads when there is more than one (sorting,
+# hashing and the matrix products release the GIL), then merge in order
+def _map_merge(chunks, reduce, max_workers=None):
+    if max_workers is None:
+        max_workers = min(len(chunks), os.cpu_count() or 1)
+    if max_workers <= 1:
+        results = [reduce(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(reduce, chunks))
+    merged = results[0]
+    for result in results[1:]:
+        merged = merged.merge(result)
+    return merged
+
+
+# Sketches are per column, so they can be cached and combined freely as the
+# selected columns change
+def sketch_column(series, chunk_rows=SKETCH_CHUNK_ROWS, max_workers=None, compression=DIGEST_COMPRESSION,
+                  sample_rows=DIGEST_SAMPLE_ROWS):
+    numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    return _map_merge(_row_chunks(series, chunk_rows),
+                      lambda chunk: ColumnSketch.from_series(chunk, numeric, compression, sample_rows), max_workers)
+
+
+# describe() from column sketches. Returns (table, error bounds): numeric
+# columns get the usual count/mean/std/min/quartiles/max and every column an
+# approximate distinct count.
+def describe_sketches(sketches):
+    table = {}
+    bounds = {}
+    for column, sketch in sketches.items():
+        stats = {"count": float(sketch.count)}
+        if sketch.numeric:
+            digest = sketch.digest
+            stats["mean"] = sketch.mean if sketch.count else np.nan
+            stats["std"] = np.sqrt(sketch.m2 / (sketch.count - 1)) if sketch.count > 1 else np.nan
+            stats["min"] = digest.min
+            for q in QUANTILES:
+                stats[f"{q:.0%}"] = digest.quantile(q)
+            stats["max"] = digest.max
+            bounds.setdefault("quartile rank error (±)", {})[column] = max(digest.rank_error(q) for q in QUANTILES)
+        stats["distinct (approx.)"] = round(sketch.distinct.estimate())
+        bounds.setdefault("distinct relative error (±2σ)", {})[column] = 2 * sketch.distinct.relative_error
+        table[column] = stats
+
+    columns = list(sketches)
+    index = ["count", "mean", "std", "min"] + [f"{q:.0%}" for q in QUANTILES] + ["max", "distinct (approx.)"]
+    return pd.DataFrame(table).reindex(index=index, columns=columns), pd.DataFrame(bounds).reindex(columns)
+
+
+# Pairwise-complete Pearson correlation of numeric columns in one chunked
+# pass. Returns (matrix, rows used per pair).
+def streaming_corr(df, columns, chunk_rows=SKETCH_CHUNK_ROWS, max_workers=None):
+    columns = list(columns)
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    moments = _map_merge(_row_chunks(values, chunk_rows),
+                         lambda chunk: Comoments.from_values(chunk, columns), max_workers)
+    pair_counts = pd.DataFrame(moments.n.astype(np.int64), index=columns, columns=columns)
+    return moments.correlation(), pair_counts
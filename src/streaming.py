@@ -0,0 +1,149 @@
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.columnar import schema_dtypes, write_sidecar
+from src.encoding import detect_encoding
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _file_size(file):
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+# Chunks of a CSV decoded with encoding. A byte the encoding cannot decode may
+# turn up past the sample it was detected from; the whole file is then scanned
+# for its encoding, as read_csv does, and read again from the start, skipping
+# the rows already yielded.
+def _decoded_chunks(file, chunk_rows, encoding):
+    yielded = 0
+    rescanned = False
+    while True:
+        skip = yielded
+        reader = None
+        try:
+            # The reader decodes its first buffer as soon as it is created
+            reader = pd.read_csv(file, encoding=encoding, chunksize=chunk_rows)
+            for chunk in reader:
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                chunk, skip = chunk.iloc[skip:], 0
+                yielded += len(chunk)
+                yield chunk
+            return
+        except UnicodeDecodeError:
+            if rescanned:
+                raise
+            rescanned = True
+            encoding = detect_encoding(file, full_scan=True)
+        finally:
+            if reader is not None:
+                reader.close()
+
+
+# Parse a CSV in chunks, yielding each chunk with running progress figures.
+# Stops after row_limit rows when one is given.
+def iter_csv_chunks(file, chunk_rows=DEFAULT_CHUNK_ROWS, row_limit=None, encoding=None):
+    total_bytes = _file_size(file)
+    if encoding is None:
+        encoding = detect_encoding(file)
+
+    start = time.perf_counter()
+    rows = 0
+    chunks = _decoded_chunks(file, chunk_rows, encoding)
+    try:
+        for chunk in chunks:
+            if row_limit is not None and rows + len(chunk) > row_limit:
+                chunk = chunk.iloc[:row_limit - rows]
+            rows += len(chunk)
+            chunk.index = pd.RangeIndex(rows - len(chunk), rows)
+
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            bytes_read = min(file.tell(), total_bytes)
+            progress = {
+                "rows": rows,
+                "bytes_read": bytes_read,
+                "total_bytes": total_bytes,
+                "fraction": bytes_read / total_bytes if total_bytes else 1.0,
+                "elapsed": elapsed,
+                "rows_per_s": rows / elapsed,
+                "mb_per_s": bytes_read / 1e6 / elapsed,
+            }
+            reached_limit = row_limit is not None and rows >= row_limit
+            if reached_limit:
+                progress["fraction"] = 1.0
+            yield chunk, progress
+            if reached_limit:
+                break
+    finally:
+        chunks.close()
+
+
+# Stream a CSV into a single frame, calling on_chunk(chunk, progress) as chunks land
+def read_csv_streaming(file, chunk_rows=DEFAULT_CHUNK_ROWS, row_limit=None, on_chunk=None):
+    chunks = []
+    for chunk, progress in iter_csv_chunks(file, chunk_rows, row_limit):
+        chunks.append(chunk)
+        if on_chunk is not None:
+            on_chunk(chunk, progress)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, copy=False)
+
+
+# Integer columns may gain missing values in later chunks and all-null columns
+# carry no real type yet, so widen both before fixing the file schema
+def _spill_schema(table):
+    fields = []
+    for field, column in zip(table.schema, table.columns):
+        if column.null_count == len(column):
+            field = field.with_type(pa.string())
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+# Stream a CSV straight into a Parquet file so only one chunk is in memory at a
+# time. The file is written under a temporary name and renamed once complete,
+# so a failed or cancelled spill never leaves a truncated file behind.
+def spill_csv_to_parquet(file, file_path, chunk_rows=DEFAULT_CHUNK_ROWS, row_limit=None, on_chunk=None):
+    partial_path = f"{file_path}.part"
+    writer = None
+    schema = None
+    rows = 0
+    try:
+        for chunk, progress in iter_csv_chunks(file, chunk_rows, row_limit):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = _spill_schema(table)
+                writer = pq.ParquetWriter(partial_path, schema)
+            try:
+                table = table.cast(schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(f"Chunk starting at row {rows} does not match the columns inferred "
+                                 f"from the first chunk: {e}") from e
+            writer.write_table(table)
+            rows = progress["rows"]
+            if on_chunk is not None:
+                on_chunk(chunk, progress)
+        if schema is None:
+            raise ValueError("The file contains no rows to spill.")
+        writer.close()
+        writer = None
+        os.replace(partial_path, file_path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return write_sidecar(file_path, rows, schema_dtypes(schema))
@@ -0,0 +1,116 @@
+import os
+import re
+import string
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Pattern used when no explicit characters are given
+NON_ALPHANUMERIC_PATTERN = r'[^a-zA-Z0-9\s]'
+# Python's \s matches every character for which str.isspace() is true, RE2's
+# \s only matches ASCII whitespace, so the Arrow kernel spells the set out
+ARROW_NON_ALPHANUMERIC_PATTERN = r'[^a-zA-Z0-9\t\n\x0b\x0c\r\x1c-\x1f\x85\p{Z}]'
+
+ENGINES = ("arrow", "str", "python")
+DEFAULT_ENGINE = "arrow"
+
+
+def _as_text(series):
+    # Same string conversion as the original per-cell implementation (NaN -> 'nan')
+    if isinstance(series.dtype, pd.StringDtype):
+        return series
+    return series.astype(str)
+
+
+# 256-entry lookup tables of the bytes to delete. Bytes below 0x80 only ever
+# encode themselves in UTF-8, so deleting them never splits a character.
+def _ascii_delete_table(special_chars):
+    table = np.zeros(256, dtype=bool)
+    if special_chars:
+        table[[ord(c) for c in special_chars]] = True
+    else:
+        keep = string.ascii_letters + string.digits + "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+        table[:128] = True
+        table[[ord(c) for c in keep]] = False
+    return table
+
+
+# Drop every byte flagged in delete_table straight from the Arrow data buffer
+# and shift the offsets by the number of bytes removed before each string
+def _delete_bytes(array, delete_table):
+    if array.offset:
+        array = pa.concat_arrays([array])
+    validity, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int32, count=len(array) + 1)
+    if data_buffer is None:
+        return array
+    data = np.frombuffer(data_buffer, dtype=np.uint8, count=int(offsets[-1]))
+
+    deleted = np.flatnonzero(delete_table[data])
+    if not len(deleted):
+        return array
+    owners = np.searchsorted(offsets, deleted, side='right') - 1
+    removed = np.zeros(len(offsets), dtype=np.int64)
+    np.cumsum(np.bincount(owners, minlength=len(array)), out=removed[1:])
+
+    kept = np.delete(data, deleted)
+    new_offsets = (offsets - removed).astype(np.int32)
+    return pa.StringArray.from_buffers(len(array), pa.py_buffer(new_offsets), pa.py_buffer(kept),
+                                       validity, array.null_count)
+
+
+def _clean_arrow_chunk(array, special_chars):
+    if special_chars and special_chars.isascii():
+        return _delete_bytes(array, _ascii_delete_table(special_chars))
+    if not special_chars:
+        # The byte table only covers ASCII text; anything wider goes through RE2
+        data_buffer = array.buffers()[2]
+        if data_buffer is None or np.frombuffer(data_buffer, dtype=np.uint8).max(initial=0) < 0x80:
+            return _delete_bytes(array, _ascii_delete_table(special_chars))
+        return pc.replace_substring_regex(array, pattern=ARROW_NON_ALPHANUMERIC_PATTERN, replacement="")
+    return pc.replace_substring_regex(array, pattern=f"[{re.escape(special_chars)}]", replacement="")
+
+
+def _clean_arrow(text, special_chars):
+    array = pa.chunked_array([pa.array(text, type=pa.string(), from_pandas=True)])
+    cleaned = pa.chunked_array([_clean_arrow_chunk(chunk, special_chars) for chunk in array.chunks], type=pa.string())
+    dtype = text.dtype if isinstance(text.dtype, pd.StringDtype) else object
+    return pd.Series(cleaned.to_numpy(zero_copy_only=False), index=text.index, name=text.name, dtype=dtype)
+
+
+def _clean_str(text, special_chars):
+    if special_chars:
+        # A plain character set needs no regex: delete through a translate table
+        return text.str.translate(str.maketrans('', '', special_chars))
+    return text.str.replace(re.compile(NON_ALPHANUMERIC_PATTERN), '', regex=True)
+
+
+# Reference implementation: one re.sub call per cell
+def _clean_python(text, special_chars):
+    pattern = f'[{re.escape(special_chars)}]' if special_chars else NON_ALPHANUMERIC_PATTERN
+    return text.apply(lambda x: re.sub(pattern, '', x))
+
+
+_CLEANERS = {"arrow": _clean_arrow, "str": _clean_str, "python": _clean_python}
+
+
+def clean_series(series, special_chars, engine=DEFAULT_ENGINE):
+    if engine not in _CLEANERS:
+        raise ValueError(f"Unknown cleaning engine: {engine}")
+    return _CLEANERS[engine](_as_text(series), special_chars)
+
+
+# Clean several columns, in parallel threads when there is more than one
+# (the Arrow kernels release the GIL). Returns {column: cleaned series}.
+def clean_columns(df, columns, special_chars, engine=DEFAULT_ENGINE, max_workers=None):
+    columns = list(columns)
+    if max_workers is None:
+        max_workers = min(len(columns), os.cpu_count() or 1)
+    if max_workers <= 1 or len(columns) <= 1:
+        return {column: clean_series(df[column], special_chars, engine) for column in columns}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        cleaned = executor.map(lambda column: clean_series(df[column], special_chars, engine), columns)
+        return dict(zip(columns, cleaned))
@@ -0,0 +1,227 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.cache import LRUCache, column_fingerprint
+
+# Memory budget for sort orders of time columns (in MB)
+SORT_INDEX_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_SORT_INDEX_CACHE_MB", "512"))
+# Fixed-width buckets offered for resampling, finest first
+RESAMPLE_RULES = ["1s", "5s", "15s", "1min", "5min", "15min", "1h", "6h", "1D", "7D", "30D"]
+# Stored instead of an order for columns that are already sorted
+ALREADY_SORTED = "sorted"
+
+_sort_cache = LRUCache(SORT_INDEX_CACHE_MAX_MB * 1024 * 1024, name="sort index cache")
+
+
+# Sortable int64 (datetimes as nanoseconds) or float64 values of a column
+def _sort_key(series):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+        # NaT is the smallest int64; missing times sort last, as in sort_values
+        values[series.isna().to_numpy()] = np.iinfo(np.int64).max
+        return values
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _compute_order(series, by=None):
+    values = _sort_key(series)
+    if by is None:
+        if np.all(values[1:] >= values[:-1]):
+            return ALREADY_SORTED, values
+        order = np.argsort(values, kind="stable")
+    else:
+        groups, _ = pd.factorize(by, sort=True)
+        order = np.lexsort((values, groups))
+    # Half the memory for the row counts the app handles
+    order = order.astype(np.int32) if len(order) < 2 ** 31 else order
+    return order, values[order]
+
+
+# Positions that sort a column (within groups of by, when given) and the
+# column's sort keys in that order, computed once per column version and
+# reused by every chart and feature on it. The order is ALREADY_SORTED for
+# columns in order.
+def sorted_keys(series, by=None):
+    key = (column_fingerprint(series), None if by is None else column_fingerprint(by))
+    return _sort_cache.get_or_compute(key, lambda: _compute_order(series, by))
+
+
+def sort_order(series, by=None):
+    return sorted_keys(series, by)[0]
+
+
+def take(values, order):
+    return values if isinstance(order, str) else values[order]
+
+
+# Inverse of take: values in sorted order back to row order
+def untake(values, order):
+    if isinstance(order, str):
+        return values
+    restored = np.empty_like(values)
+    restored[order] = values
+    return restored
+
+
+# Rows of the given columns in the order of by, without sorting the frame
+def sorted_rows(df, by, columns):
+    order = sort_order(df[by])
+    data = df[list(dict.fromkeys(columns))]
+    return data if isinstance(order, str) else data.take(order)
+
+
+# Rows of the given columns with by in [start, end], in the order of by
+def rows_in_range(df, by, columns, start, end):
+    order, keys = sorted_keys(df[by])
+    low = np.searchsorted(keys, _sort_value(start), side="left")
+    high = np.searchsorted(keys, _sort_value(end), side="right")
+    data = df[list(dict.fromkeys(columns))]
+    return data.iloc[low:high] if isinstance(order, str) else data.take(order[low:high])
+
+
+# A bound in the units of _sort_key
+def _sort_value(bound):
+    return bound if isinstance(bound, (int, float, np.number)) else pd.Timestamp(bound).value
+
+
+def _as_float(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+# Start position of each row's group in sorted order (all zero without groups)
+def _group_starts(groups_sorted):
+    if groups_sorted is None:
+        return None, np.array([0])
+    boundaries = np.flatnonzero(groups_sorted[1:] != groups_sorted[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    segment = np.zeros(len(groups_sorted), dtype=np.int64)
+    segment[boundaries] = 1
+    return starts[np.cumsum(segment)], starts
+
+
+def _window_name(window):
+    return str(window).replace(" ", "")
+
+
+# Rolling means and standard deviations, lags and exponentially weighted means
+# of one column, ordered by time_column (within groups of group_column).
+# Integer windows count rows and strings like "5min" span time, as in
+# pandas' rolling, and min_periods defaults as there: the window length for
+# row windows, 1 for time windows. Every window comes from one set of
+# cumulative sums over the sorted values, so the cost does not grow with the
+# window length. Returns a frame of features in the frame's row order.
+def window_features(df, value_column, time_column, windows=(), lags=(), spans=(), group_column=None, min_periods=None):
+    group = None if group_column is None else df[group_column]
+    order, times = sorted_keys(df[time_column], group)
+    values = take(_as_float(df[value_column]), order)
+    groups = None if group is None else take(pd.factorize(group, sort=True)[0], order)
+    row_starts, segment_starts = _group_starts(groups)
+    n = len(values)
+    positions = np.arange(n)
+    if row_starts is None:
+        row_starts = np.zeros(n, dtype=np.int64)
+
+    valid = ~np.isnan(values)
+    # Shifted by the mean so sums of squares keep their precision
+    shift = values[valid].mean() if valid.any() else 0.0
+    centered = np.where(valid, values - shift, 0.0)
+    sums = np.concatenate([[0.0], np.cumsum(centered)])
+    squares = np.concatenate([[0.0], np.cumsum(centered * centered)])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+
+    features = {}
+    for window in windows:
+        if isinstance(window, str):
+            # Time windows cover (t - window, t], searched within each group
+            width = pd.Timedelta(window).value
+            starts = np.empty(n, dtype=np.int64)
+            for first, last in zip(segment_starts, np.append(segment_starts[1:], n)):
+                segment = times[first:last]
+                starts[first:last] = first + np.searchsorted(segment, segment - width, side="right")
+            required = 1 if min_periods is None else min_periods
+        else:
+            starts = np.maximum(positions - int(window) + 1, row_starts)
+            required = int(window) if min_periods is None else min_periods
+        count = counts[positions + 1] - counts[starts]
+        total = sums[positions + 1] - sums[starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count >= required, total / count + shift, np.nan)
+            variance = (squares[positions + 1] - squares[starts] - total * total / count) / (count - 1)
+            std = np.where(count >= max(required, 2), np.sqrt(np.maximum(variance, 0.0)), np.nan)
+        features[f"{value_column}_rolling_mean_{_window_name(window)}"] = mean
+        features[f"{value_column}_rolling_std_{_window_name(window)}"] = std
+
+    for lag in lags:
+        source = positions - int(lag)
+        lagged = np.full(n, np.nan)
+        has_source = source >= row_starts
+        lagged[has_source] = values[source[has_source]]
+        features[f"{value_column}_lag_{lag}"] = lagged
+
+    for span in spans:
+        smoothed = np.empty(n)
+        for first, last in zip(segment_starts, np.append(segment_starts[1:], n)):
+            smoothed[first:last] = pd.Series(values[first:last]).ewm(span=span).mean().to_numpy()
+        features[f"{value_column}_ewm_{span}"] = smoothed
+
+    missing_time = times == np.iinfo(np.int64).max if times.dtype.kind == "i" else np.isnan(times)
+    return pd.DataFrame({name: untake(np.where(missing_time, np.nan, feature), order)
+                         for name, feature in features.items()}, index=df.index)
+
+
+# Bucket start times in the column's time zone (the sort keys are UTC)
+def _bucket_times(nanoseconds, dtype):
+    times = pd.to_datetime(nanoseconds)
+    tz = getattr(dtype, "tz", None)
+    return times.tz_localize("UTC").tz_convert(tz) if tz is not None else times
+
+
+# Coarsest bucket in RESAMPLE_RULES fine enough to give up to max_buckets buckets
+def auto_rule(start, end, max_buckets):
+    length = (pd.Timestamp(end) - pd.Timestamp(start)).value
+    for rule in RESAMPLE_RULES:
+        if length / pd.Timedelta(rule).value <= max_buckets:
+            return rule
+    return RESAMPLE_RULES[-1]
+
+
+# Mean, min, max and count of value_column per fixed-width time bucket over
+# [start, end]. Only the rows in range are read, found by binary search in
+# the cached sort order; buckets without values are left out.
+def resample(df, time_column, value_column, rule, start=None, end=None):
+    order, times = sorted_keys(df[time_column])
+    last = np.searchsorted(times, np.iinfo(np.int64).max, side="left")
+    low = 0 if start is None else np.searchsorted(times[:last], _sort_value(start), side="left")
+    high = last if end is None else np.searchsorted(times[:last], _sort_value(end), side="right")
+    positions = slice(low, high) if isinstance(order, str) else order[low:high]
+    times = times[low:high]
+    column = df[value_column]
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in "fiub":
+        values = column.to_numpy()[positions].astype(np.float64, copy=False)
+    else:
+        values = _as_float(column.iloc[positions])
+    columns = [time_column, "mean", "min", "max", "count"]
+    if len(times) == 0:
+        return pd.DataFrame(columns=columns)
+
+    width = pd.Timedelta(rule).value
+    buckets = times // width
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = pd.DataFrame({
+            time_column: _bucket_times(buckets[starts] * width, df[time_column].dtype),
+            "mean": sums / counts,
+            "min": np.fmin.reduceat(values, starts),
+            "max": np.fmax.reduceat(values, starts),
+            "count": counts,
+        })
+    return result[result["count"] > 0].reset_index(drop=True)
+
+
+def sort_index_cache_stats():
+    return _sort_cache.stats()
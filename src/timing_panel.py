@@ -0,0 +1,36 @@
+import json
+
+import pandas as pd
+import streamlit as st
+
+# Spans shorter than this are left out of the table (they stay in the exports)
+MIN_SPAN_MS = 1.0
+
+
+# Per-span breakdown of a trace, nested spans indented under their parents
+def trace_breakdown(trace):
+    rows = []
+    total = max(trace.elapsed, 1e-9)
+    for record in trace.records():
+        rows.append({
+            "span": "· " * record["depth"] + record["name"],
+            "ms": round(record["duration"] * 1000, 1),
+            "% of run": round(100 * record["duration"] / total, 1),
+            "memory Δ MB": None if record["memory_delta_bytes"] is None else round(record["memory_delta_bytes"] / 1e6, 1),
+            "cached": record["attrs"].get("cached"),
+            "thread": record["thread"],
+        })
+    return pd.DataFrame(rows, columns=["span", "ms", "% of run", "memory Δ MB", "cached", "thread"])
+
+
+# Where the time of this run went, with the spans for download
+def show_timing_panel(trace):
+    st.caption(f"This run: {trace.elapsed * 1000:,.0f} ms, {len(trace.spans)} spans")
+    breakdown = trace_breakdown(trace)
+    st.dataframe(breakdown[breakdown["ms"] >= MIN_SPAN_MS], use_container_width=True, hide_index=True)
+    stamp = trace.started.strftime("%Y%m%d_%H%M%S")
+    st.download_button("Spans (JSON)", json.dumps(trace.to_json(), default=str),
+                       file_name=f"neatplot_spans_{stamp}.json", mime="application/json")
+    st.download_button("Chrome trace", json.dumps(trace.to_chrome_trace(), default=str),
+                       file_name=f"neatplot_trace_{stamp}.json", mime="application/json",
+                       help="Open in chrome://tracing or ui.perfetto.dev")
@@ -0,0 +1,88 @@
+import pandas as pd
+
+from src.instrumentation import TRACE_MEMORY, PeakMemory
+from src.lazy_engine import is_lazy
+from src.missing_values import fill_missing_values
+from src.text_cleaning import DEFAULT_ENGINE, clean_columns
+from src.type_conversion import convert_column
+
+# Characters offered by default for special-character removal
+DEFAULT_SPECIAL_CHARS = "!@#$%^&*()_+-={}[]|\\:;\"'<>,?/~`"
+
+# Preprocessing steps used by process_data. Each takes a frame plus its
+# parameters, leaves the input untouched and returns (new_df, notes), where
+# notes is a list of (level, message) pairs for the UI to display.
+
+
+def select_columns(df, columns):
+    return df[list(columns)], []
+
+
+def drop_columns(df, columns):
+    if not columns:
+        return df, []
+    return df.drop(columns=list(columns)), [("write", f"Dropped columns: {', '.join(columns)}")]
+
+
+# columns are the columns known to contain missing values, found by scanning
+# the frame when not given
+def fill_missing(df, method, columns=None):
+    if TRACE_MEMORY and not is_lazy(df):
+        with PeakMemory() as memory:
+            df, _ = fill_missing_values(df, method, columns)
+        peak = ("caption", f"Peak memory while handling missing values: {memory.peak_bytes / 1e6:.1f} MB")
+    else:
+        # Lazy fills only extend the query plan, so there is no memory peak to report
+        df, _ = fill_missing_values(df, method, columns)
+        peak = None
+
+    if method == "Drop rows":
+        notes = [("write", "Rows with missing values have been dropped.")]
+    elif method == "Fill with mean/mode":
+        notes = [("write", "Missing values have been filled with mean/mode.")]
+    else:
+        notes = [("write", "Missing values have been filled with median.")]
+    return df, notes + ([peak] if peak else [])
+
+
+def convert_types(df, conversions):
+    df = df if is_lazy(df) else df.copy(deep=False)
+    notes = []
+    reports = []
+    for column, new_type in conversions:
+        try:
+            if is_lazy(df):
+                df = df.convert(column, new_type)
+                notes.append(("success", f"Successfully converted {column} to {new_type}"))
+                continue
+            converted, report = convert_column(df[column], new_type)
+            # Cached conversions may come from a frame with another index; values are positional
+            df[column] = converted.set_axis(df.index)
+            reports.append(report)
+            detail = f" (format {report['format']})" if report["format"] else ""
+            notes.append(("success", f"Successfully converted {column} to {new_type}{detail}"))
+            if report["coerced"]:
+                notes.append(("warning", f"{report['coerced']:,} value(s) in {column} could not be converted to {new_type} "
+                                         f"and are now missing, e.g. {', '.join(map(repr, report['examples']))}"))
+            if report["truncated"]:
+                notes.append(("warning", f"{report['truncated']:,} value(s) in {column} had fractions truncated"))
+        except Exception as e:
+            notes.append(("error", f"Error converting data type for {column}: {str(e)}"))
+    if reports:
+        table = pd.DataFrame(reports, columns=["column", "to", "format", "coerced", "truncated", "seconds", "cached"])
+        notes.append(("dataframe", table.round({"seconds": 3})))
+    return df, notes
+
+
+def remove_characters(df, columns, special_chars, engine=DEFAULT_ENGINE):
+    if is_lazy(df):
+        return df.remove_characters(columns, special_chars), [("write", f"Removed special characters from {column}") for column in columns]
+
+    cleaned = clean_columns(df, columns, special_chars, engine)
+
+    df = df.copy(deep=False)
+    notes = []
+    for column in columns:
+        df[column] = cleaned[column]
+        notes.append(("write", f"Removed special characters from {column}"))
+    return df, notes
@@ -0,0 +1,180 @@
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.cache import LRUCache, column_fingerprint
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    # Only public from pandas 2.2 on
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+CONVERSION_TYPES = ["int", "float", "string", "datetime"]
+
+# Distinct values a datetime format is inferred and checked on
+FORMAT_SAMPLE_SIZE = 1000
+# Values in the sample the format is guessed from
+FORMAT_GUESSES = 20
+# Formats tried in turn on columns mixing layouts before parsing value by value
+MAX_FORMATS = 3
+# Tried as well, for values whose format cannot be guessed from one value
+DATETIME_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y%m%d")
+# Offending values quoted in a conversion report
+REPORT_EXAMPLES = 3
+
+# Memory budget for converted columns (in MB)
+CONVERSION_CACHE_MAX_MB = int(os.environ.get("NEATPLOT_CONVERSION_CACHE_MB", "256"))
+
+_conversion_cache = LRUCache(CONVERSION_CACHE_MAX_MB * 1024 * 1024, name="conversion cache")
+
+
+# Apply function to the categories of a categorical column only, then expand
+def _by_category(series, function):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return function(series)
+    converted = function(pd.Series(series.cat.categories))
+    codes = series.cat.codes.to_numpy()
+    result = converted.take(np.where(codes < 0, 0, codes)).set_axis(series.index)
+    return result.where(codes >= 0)
+
+
+# Distinct values spread evenly through the column, so a layout that only
+# shows late (days past the 12th, say) still takes part
+def _sample(series):
+    values = series.iloc[::max(len(series) // (FORMAT_SAMPLE_SIZE * 4), 1)].dropna().drop_duplicates()
+    return values.iloc[::max(len(values) // FORMAT_SAMPLE_SIZE, 1)].astype(str)
+
+
+# The format parsing most of a sample of the column's values, or None
+def infer_datetime_format(series):
+    sample = _sample(series)
+    if sample.empty:
+        return None
+    candidates = [guess_datetime_format(value) for value in sample.iloc[:FORMAT_GUESSES]]
+    candidates = list(dict.fromkeys([c for c in candidates if c] + list(DATETIME_FORMATS)))
+    best, best_parsed = None, 0
+    for candidate in candidates:
+        parsed = pd.to_datetime(sample, format=candidate, errors="coerce", utc="%z" in candidate).notna().sum()
+        if parsed > best_parsed:
+            best, best_parsed = candidate, parsed
+    return best
+
+
+# Parse with one format. pandas checks every value in Python-level code once
+# errors are coerced, so Arrow's vectorized strptime does the bulk of the work.
+def _strptime(values, date_format):
+    # Arrow has no %z or %f; mixed Python objects cannot become an Arrow string array
+    if "%z" in date_format or "%f" in date_format:
+        return pd.to_datetime(values, format=date_format, errors="coerce", utc="%z" in date_format)
+    try:
+        text = pa.array(values, type=pa.string(), from_pandas=True)
+        parsed = pc.strptime(text, format=date_format, unit="ns", error_is_null=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pd.to_datetime(values, format=date_format, errors="coerce")
+    result = np.array(parsed.to_numpy(zero_copy_only=False), dtype="datetime64[ns]")
+
+    # Arrow rolls impossible dates over (31/02 becomes 02/03) instead of
+    # rejecting them, always onto days 1-3 of the next month. Parses landing
+    # there must format back to their input; the rest go through pandas.
+    suspect = np.flatnonzero(pc.fill_null(pc.less_equal(pc.day(parsed), 3), False).to_numpy(zero_copy_only=False))
+    if len(suspect):
+        formatted = pc.strftime(parsed.take(pa.array(suspect)), format=date_format)
+        recheck = suspect[pc.fill_null(pc.not_equal(formatted, text.take(pa.array(suspect))), True).to_numpy(zero_copy_only=False)]
+        if len(recheck):
+            result[recheck] = pd.to_datetime(values.iloc[recheck], format=date_format, errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return pd.Series(result, index=values.index)
+
+
+# Parse with the inferred format, vectorized. Values in another layout get a
+# format inferred from them in turn; whatever is left is parsed value by value.
+def _parse_datetimes(values, formats):
+    date_format = infer_datetime_format(values)
+    if date_format is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            return pd.to_datetime(values, format="mixed", errors="coerce")
+    formats.append(date_format)
+    utc = "%z" in date_format
+    parsed = _strptime(values, date_format)
+    leftover = values.notna() & parsed.isna()
+    if leftover.any():
+        try:
+            if len(formats) < MAX_FORMATS:
+                rest = _parse_datetimes(values[leftover], formats)
+            else:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)
+                    rest = pd.to_datetime(values[leftover], format="mixed", errors="coerce", utc=utc)
+            parsed = parsed.where(~leftover, rest.reindex(parsed.index))
+        except (TypeError, ValueError):
+            # Layouts that disagree on time zones stay missing
+            pass
+    return parsed
+
+
+def _to_datetime(series, info):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_datetime(series)
+    formats = []
+    converted = _by_category(series, lambda values: _parse_datetimes(values, formats))
+    info["format"] = ", ".join(formats) or None
+    return converted
+
+
+def _to_number(series, new_type, info):
+    if pd.api.types.is_bool_dtype(series):
+        return series.astype(int if new_type == "int" else float)
+    numbers = _by_category(series, lambda values: pd.to_numeric(values, errors="coerce"))
+    if new_type == "float":
+        return numbers.astype(float)
+    # Like astype(int), fractions are truncated; missing values need a nullable integer
+    fractional = numbers.notna() & (numbers % 1 != 0)
+    info["truncated"] = int(fractional.sum())
+    if info["truncated"]:
+        numbers = np.trunc(numbers)
+    return numbers.astype("Int64" if numbers.isna().any() else "int64")
+
+
+def _convert(series, new_type):
+    info = {"column": series.name, "to": new_type, "format": None, "coerced": 0, "truncated": 0, "examples": []}
+    start = time.perf_counter()
+    if new_type in ("int", "float"):
+        converted = _to_number(series, new_type, info)
+    elif new_type == "datetime":
+        converted = _to_datetime(series, info)
+    elif new_type == "string":
+        converted = series.astype(str)
+    else:
+        raise ValueError(f"Unknown data type: {new_type}")
+
+    # Values present before but missing after could not be converted
+    coerced = series.notna().to_numpy() & converted.isna().to_numpy()
+    info["coerced"] = int(coerced.sum())
+    info["examples"] = series[coerced].drop_duplicates().iloc[:REPORT_EXAMPLES].astype(str).tolist()
+    info["seconds"] = time.perf_counter() - start
+    return converted.rename(series.name), info
+
+
+# Convert one column, once per column content (a hash of every value) and
+# target type. Values that cannot be converted become missing and are counted
+# in the returned report.
+def convert_column(series, new_type):
+    key = (column_fingerprint(series), series.name, new_type)
+    entry = _conversion_cache.get(key)
+    if entry is None:
+        entry = _convert(series, new_type)
+        _conversion_cache.put(key, entry)
+        return entry[0], dict(entry[1], cached=False)
+    return entry[0], dict(entry[1], cached=True)
+
+
+def conversion_cache_stats():
+    return _conversion_cache.stats()
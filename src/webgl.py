@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import sample_colorscale
+
+# Distinct positions kept across each axis when float coordinates no hover
+# label shows are rounded for the browser; 10,000 keeps an 800 px chart exact
+# to the pixel at 10x zoom
+PLOT_PRECISION_STEPS = int(os.environ.get("NEATPLOT_PLOT_PRECISION_STEPS", "10000"))
+# Continuous colors are drawn as this many traces of one color each
+COLOR_BANDS = 64
+# Categories past the most frequent ones (and missing values) share one trace
+MAX_COLOR_CATEGORIES = 20
+OTHER_CATEGORY = "(other)"
+
+# Figures built here reach the browser as WebGL (scattergl) traces with compact
+# coordinates. Streamlit writes figures as JSON text and its bundled plotly.js
+# cannot read typed arrays, so the savings come from sending fewer characters:
+# whole numbers as integers, times as epoch milliseconds, and colors and
+# category names once per trace instead of once per point. Values a hover
+# label can show are sent exactly; only coordinates drawn without hover are
+# rounded to what the chart can show.
+
+
+def _as_float(values):
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+# Floats for JSON: whole numbers go out as integers and, given steps, values
+# are rounded to that many steps of their range, which JSON writes in a few
+# digits instead of 17. Missing values become None, which JSON writes as null
+# without Plotly's encoder re-encoding the whole figure to replace NaN.
+def compact_numbers(values, steps=None):
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values
+    values = _as_float(values)
+    missing = ~np.isfinite(values)
+    present = values[~missing]
+    if steps and present.size:
+        extent = present.max() - present.min() or np.abs(present).max()
+        if extent > 0:
+            values = np.round(values, int(np.ceil(-np.log10(extent / steps))))
+            present = values[~missing]
+    if present.size and not missing.any() and np.abs(present).max() < 2 ** 53 and (present == np.floor(present)).all():
+        return values.astype(np.int64)
+    if missing.any():
+        values = values.astype(object)
+        values[missing] = None
+    return values
+
+
+# Times as milliseconds since the epoch, in the column's wall-clock time, for
+# an axis of type "date"; ISO strings would take twice the characters
+def epoch_milliseconds(series):
+    if getattr(series.dtype, "tz", None) is not None:
+        series = series.dt.tz_localize(None)
+    nanoseconds = series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    missing = nanoseconds == np.iinfo(np.int64).min
+    if not (nanoseconds[~missing] % 1_000_000).any():
+        milliseconds = nanoseconds // 1_000_000
+    else:
+        milliseconds = nanoseconds / 1e6
+    if missing.any():
+        milliseconds = milliseconds.astype(object)
+        milliseconds[missing] = None
+    return milliseconds
+
+
+def is_time(series):
+    return pd.api.types.is_datetime64_any_dtype(series.dtype)
+
+
+# A column's values as sent to the browser
+def plot_values(series, steps=None):
+    if is_time(series):
+        return epoch_milliseconds(series)
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return compact_numbers(series.to_numpy(), steps)
+    return series.to_numpy(dtype=object)
+
+
+# Lines drawn with hoverinfo="skip" (such as the lower edge of a band) have
+# their coordinates rounded; any other line shows its values on hover
+def line_trace(x, y, **kwargs):
+    steps = PLOT_PRECISION_STEPS if kwargs.get("hoverinfo") == "skip" else None
+    return go.Scattergl(x=plot_values(x, steps), y=plot_values(y, steps), mode="lines", **kwargs)
+
+
+# Figure of WebGL line traces over x; time columns get a date axis to read the
+# epoch milliseconds
+def line_figure(traces, x, title):
+    fig = go.Figure(traces)
+    fig.update_layout(title=title)
+    if is_time(x):
+        fig.update_xaxes(type="date")
+    return fig
+
+
+# Most frequent categories as codes 0..n-1, the rest as n
+def _top_categories(series, limit=MAX_COLOR_CATEGORIES):
+    codes, categories = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    keep = np.argsort(-counts, kind="stable")[:limit]
+    mapping = np.full(len(categories) + 1, len(keep))
+    mapping[keep] = np.arange(len(keep))
+    labels = [str(categories[i]) for i in keep]
+    if len(keep) < len(categories) or (codes < 0).any():
+        labels.append(OTHER_CATEGORY)
+    return mapping[codes], labels
+
+
+# Scatter plot of x against y as WebGL traces. A numeric color column is drawn
+# as COLOR_BANDS traces of one color each with a shared color bar, and a text
+# color column as one trace per category, so no color value or category name
+# is sent per point. Rows missing x, y or a numeric color are left out.
+# Returns (figure, points drawn).
+def scatter_figure(df, x, y, color=None, palette="Viridis", title=None):
+    xs, ys = _as_float(df[x]), _as_float(df[y])
+    keep = np.isfinite(xs) & np.isfinite(ys)
+    groups = np.zeros(len(df), dtype=np.int64)
+    labels, colors, bar = [None], [None], None
+    if color is not None and pd.api.types.is_numeric_dtype(df[color].dtype):
+        values = _as_float(df[color])
+        keep &= np.isfinite(values)
+        low, high = (values[keep].min(), values[keep].max()) if keep.any() else (0.0, 0.0)
+        edges = np.linspace(low, high, COLOR_BANDS + 1)
+        groups = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, COLOR_BANDS - 1)
+        labels = [f"{color} {start:.4g} – {end:.4g}" for start, end in zip(edges[:-1], edges[1:])]
+        colors = sample_colorscale(palette, list(np.linspace(0, 1, COLOR_BANDS)))
+        bar = (low, high)
+    elif color is not None:
+        groups, labels = _top_categories(df[color])
+        colors = [None] * len(labels)
+
+    rows = np.flatnonzero(keep)
+    rows = rows[np.argsort(groups[rows], kind="stable")]
+    xs, ys = compact_numbers(xs[rows]), compact_numbers(ys[rows])
+    counts = np.bincount(groups[rows], minlength=len(labels))
+    boundaries = np.cumsum(counts)[:-1]
+    traces = []
+    for label, marker_color, x_values, y_values in zip(labels, colors, np.split(xs, boundaries), np.split(ys, boundaries)):
+        if len(x_values) == 0:
+            continue
+        traces.append(go.Scattergl(x=x_values, y=y_values, mode="markers", name=label,
+                                   marker=dict(color=marker_color),
+                                   showlegend=bar is None and label is not None,
+                                   hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}" + ("<extra></extra>" if label is None else "")))
+    if bar is not None:
+        # An empty SVG trace carries the color bar for the bands
+        traces.append(go.Scatter(x=[None], y=[None], mode="markers", showlegend=False, hoverinfo="skip",
+                                 marker=dict(color=list(bar), colorscale=palette, showscale=True,
+                                             colorbar=dict(title=color))))
+
+    fig = go.Figure(traces)
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title=color if bar is None else None)
+    return fig, len(rows)
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.aggregation import density_grid, lttb_indices, quantile_points, stratified_sample
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros(10_000)
+    y[5_000] = 100.0
+    indices = lttb_indices(x, y, n_out=100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+    assert 5_000 in indices
+
+
+def test_lttb_returns_everything_for_short_lines():
+    assert lttb_indices(np.arange(5), np.arange(5), n_out=10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_density_grid_counts_every_point_and_blanks_empty_cells():
+    rng = np.random.default_rng(0)
+    x, y = rng.normal(size=1000), rng.normal(size=1000)
+    x[0] = np.nan
+    counts, x_centers, y_centers = density_grid(x, y, bins=20)
+    assert counts.shape == (20, 20)
+    assert np.nansum(counts) == 999
+    assert not (counts == 0).any()
+
+
+def test_quantile_points_span_the_range():
+    values = np.arange(100_001, dtype=float)
+    points = quantile_points(values, n=11)
+    np.testing.assert_allclose(points, np.linspace(0, 100_000, 11))
+
+
+def test_stratified_sample_keeps_both_tails():
+    df = pd.DataFrame({"v": np.arange(100_000)})
+    sample = stratified_sample(df, n=1000, column="v")
+    assert abs(len(sample) - 1000) <= 20
+    assert sample["v"].min() < 5_000 and sample["v"].max() > 95_000
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from src.batch_ingest import combine_frames, unify_schemas
+
+
+def test_conflicting_columns_become_strings_in_every_source():
+    first = pd.DataFrame({"a": [1, 2], "b": [1.5, 2.5]})
+    second = pd.DataFrame({"a": ["x", "y"], "b": [3, 4]})
+    frames, conflicts = unify_schemas([first, second])
+    assert conflicts == ["a"]
+    assert all(frame["a"].dtype == "string" for frame in frames)
+    assert frames[1]["b"].dtype == np.int64
+
+
+def test_integer_column_names_from_headerless_sheets():
+    first = pd.DataFrame({0: [1, 2], 1: ["a", "b"]})
+    second = pd.DataFrame({0: ["x", "y"], 1: ["c", "d"]})
+    frames, conflicts = unify_schemas([first, second])
+    assert conflicts == [0]
+    assert frames[0][0].tolist() == ["1", "2"]
+
+
+def test_empty_columns_do_not_count_as_conflicts():
+    first = pd.DataFrame({"a": [1, 2]})
+    second = pd.DataFrame({"a": [None, None]})
+    assert unify_schemas([first, second])[1] == []
+
+
+def test_combine_frames_adds_a_source_column():
+    data, _ = combine_frames([pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2], "b": [3]})], ["one", "two"])
+    assert data.columns[0] == "source"
+    assert data["source"].tolist() == ["one", "two"]
+    assert data.columns.tolist()[1:] == ["a", "b"]
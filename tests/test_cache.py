@@ -0,0 +1,115 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.cache import (LRUCache, column_fingerprint, content_hash, dataset_fingerprint, estimate_size, set_version,
+                       upload_hash)
+
+
+def test_lru_evicts_least_recently_used_first():
+    cache = LRUCache(30)
+    cache.put("a", "a", size=10)
+    cache.put("b", "b", size=10)
+    cache.put("c", "c", size=10)
+    cache.get("a")
+    cache.put("d", "d", size=10)
+    assert "a" in cache and "b" not in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 30
+
+
+def test_lru_does_not_store_values_larger_than_the_budget():
+    cache = LRUCache(10)
+    assert not cache.put("big", "x", size=11)
+    assert "big" not in cache
+    assert cache.stats()["bytes"] == 0
+
+
+def test_lru_calls_on_evict_for_evicted_replaced_and_cleared_entries():
+    released = []
+    cache = LRUCache(20, on_evict=lambda key, value: released.append((key, value)))
+    cache.put("a", 1, size=10)
+    cache.put("a", 2, size=10)
+    cache.put("b", 3, size=10)
+    cache.put("c", 4, size=10)
+    cache.clear()
+    assert released == [("a", 1), ("a", 2), ("b", 3), ("c", 4)]
+
+
+def test_get_or_compute_computes_once():
+    cache = LRUCache(1000)
+    calls = []
+    compute = lambda: calls.append(1) or np.arange(3)
+    cache.get_or_compute("k", compute)
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_content_hash_reads_everything_and_rewinds():
+    first = io.BytesIO(b"a,b\n1,2\n" * 1000)
+    second = io.BytesIO(b"a,b\n1,2\n" * 999 + b"a,b\n1,3\n")
+    assert content_hash(first) != content_hash(second)
+    assert first.tell() == 0
+    assert content_hash(first) == content_hash(io.BytesIO(first.getvalue()))
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, data, file_id):
+        super().__init__(data)
+        self.file_id = file_id
+        self.size = len(data)
+        self.reads = 0
+
+    def read(self, *args):
+        self.reads += 1
+        return super().read(*args)
+
+
+def test_upload_hash_is_computed_once_per_upload():
+    upload = _Upload(b"a,b\n1,2\n", "upload-1")
+    first = upload_hash(upload)
+    reads = upload.reads
+    upload.read()
+    assert upload_hash(upload) == first == content_hash(io.BytesIO(upload.getvalue()))
+    assert upload.reads == reads + 1
+    assert upload.tell() == 0
+    assert upload_hash(_Upload(b"a,b\n1,3\n", "upload-2")) != first
+
+
+def test_estimate_size_of_arrays_and_containers():
+    values = np.zeros(1000)
+    assert estimate_size(values) == 8000
+    assert estimate_size([values, values]) > 16000
+
+
+def _frames_differing_in_one_row():
+    first = pd.DataFrame({"a": np.ones(10_000), "b": ["1"] * 10_000})
+    second = first.copy()
+    second.loc[1, ["a", "b"]] = [-999.0, "CHANGED"]
+    return first, second
+
+
+def test_dataset_fingerprint_covers_every_row():
+    first, second = _frames_differing_in_one_row()
+    assert dataset_fingerprint(first) != dataset_fingerprint(second)
+    assert dataset_fingerprint(first) == dataset_fingerprint(first.copy())
+
+
+def test_column_fingerprint_covers_every_row():
+    first, second = _frames_differing_in_one_row()
+    assert column_fingerprint(first["b"]) != column_fingerprint(second["b"])
+    assert column_fingerprint(first["a"]) == column_fingerprint(first["a"].copy())
+
+
+def test_fingerprint_hashes_unhashable_cells_by_text():
+    df = pd.DataFrame({"nested": [[1, 2], {"k": 1}]})
+    assert dataset_fingerprint(df) != dataset_fingerprint(pd.DataFrame({"nested": [[1, 3], {"k": 1}]}))
+
+
+def test_recorded_version_is_the_fingerprint_and_the_first_one_stays():
+    df = pd.DataFrame({"a": [1, 2]})
+    set_version(df, "loaded")
+    set_version(df, "other")
+    assert dataset_fingerprint(df) == "loaded"
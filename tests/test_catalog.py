@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+
+from src.catalog import get_entry, list_entries, record_file, sync_catalog
+
+
+def _is_data_file(file_name):
+    return file_name.endswith((".csv", ".parquet"))
+
+
+def test_files_written_outside_the_app_are_indexed(tmp_path):
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(tmp_path / "data.csv", index=False)
+    assert sync_catalog(str(tmp_path), _is_data_file) == []
+    listing = list_entries(str(tmp_path))
+    assert listing["name"].tolist() == ["data.csv"]
+    assert listing["rows"].tolist() == [3]
+
+
+def test_recorded_file_is_listed_with_its_schema(tmp_path):
+    data = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    data.to_parquet(tmp_path / "data.parquet")
+    record_file(str(tmp_path), "data.parquet", data)
+    entry = get_entry(str(tmp_path), "data.parquet")
+    assert entry["rows"] == 2
+    assert entry["schema"] == {"a": "int64", "b": "object"}
+
+
+def test_unreadable_file_is_reported_until_it_is_fixed(tmp_path):
+    broken = tmp_path / "broken.parquet"
+    broken.write_bytes(b"not parquet")
+    first = sync_catalog(str(tmp_path), _is_data_file)
+    assert [name for name, _ in first] == ["broken.parquet"]
+    # Still reported on the next sync although the directory did not change
+    assert [name for name, _ in sync_catalog(str(tmp_path), _is_data_file)] == ["broken.parquet"]
+    assert list_entries(str(tmp_path)).empty
+
+    stat = os.stat(broken)
+    pd.DataFrame({"a": [1]}).to_parquet(broken)
+    os.utime(broken, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert sync_catalog(str(tmp_path), _is_data_file) == []
+    assert list_entries(str(tmp_path))["name"].tolist() == ["broken.parquet"]
+
+
+def test_removed_files_leave_the_index(tmp_path):
+    pd.DataFrame({"a": [1]}).to_csv(tmp_path / "data.csv", index=False)
+    (tmp_path / "broken.parquet").write_bytes(b"not parquet")
+    sync_catalog(str(tmp_path), _is_data_file)
+    os.remove(tmp_path / "data.csv")
+    os.remove(tmp_path / "broken.parquet")
+    assert sync_catalog(str(tmp_path), _is_data_file) == []
+    assert list_entries(str(tmp_path)).empty
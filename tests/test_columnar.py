@@ -0,0 +1,40 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.columnar import load_columnar, read_columnar_metadata, save_columnar, sidecar_path
+from src.streaming import spill_csv_to_parquet
+
+
+def _frame():
+    return pd.DataFrame({"i": np.arange(5), "f": np.linspace(0, 1, 5), "s": list("abcde")})
+
+
+def _sidecar_matches_loaded_frame(file_path):
+    metadata = read_columnar_metadata(file_path)
+    loaded = load_columnar(file_path)
+    assert metadata["dtypes"] == {column: str(dtype) for column, dtype in loaded.dtypes.items()}
+    assert metadata["rows"] == len(loaded)
+
+
+def test_saved_sidecar_records_pandas_dtypes(tmp_path):
+    for extension in (".parquet", ".arrow"):
+        file_path = str(tmp_path / f"data{extension}")
+        save_columnar(_frame(), file_path)
+        _sidecar_matches_loaded_frame(file_path)
+
+
+def test_spilled_sidecar_records_pandas_dtypes(tmp_path):
+    file_path = str(tmp_path / "spill.parquet")
+    data = io.BytesIO(_frame().to_csv(index=False).encode())
+    spill_csv_to_parquet(data, file_path, chunk_rows=2)
+    _sidecar_matches_loaded_frame(file_path)
+
+
+def test_metadata_without_sidecar_uses_the_same_format(tmp_path):
+    file_path = str(tmp_path / "data.parquet")
+    metadata = save_columnar(_frame(), file_path)
+    os.remove(sidecar_path(file_path))
+    assert read_columnar_metadata(file_path)["dtypes"] == metadata["dtypes"]
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import data_visualization
+from src.lazy_engine import scan_file
+from src.profiling import column_profile
+
+
+def test_auto_stats_mode_sketches_only_above_the_row_threshold(monkeypatch):
+    df = pd.DataFrame({"a": range(10)})
+    monkeypatch.setattr(data_visualization.st, "session_state", {"large_data_threshold": 5})
+    assert data_visualization.use_approximate_stats(df)
+    monkeypatch.setattr(data_visualization.st, "session_state", {"large_data_threshold": 50})
+    assert not data_visualization.use_approximate_stats(df)
+    monkeypatch.setattr(data_visualization.st, "session_state", {"large_data_threshold": 5, "stats_mode": "Exact"})
+    assert not data_visualization.use_approximate_stats(df)
+
+
+@pytest.mark.parametrize("aggregate", [True, False])
+def test_lazy_time_series_line_uses_timestamp_bounds(tmp_path, aggregate):
+    pytest.importorskip("polars")
+    path = tmp_path / "series.parquet"
+    pd.DataFrame({"t": pd.date_range("2024-01-01", periods=500, freq="h", tz="UTC"),
+                  "y": np.arange(500.0)}).to_parquet(path)
+    lazy = scan_file(str(path))
+    profile = column_profile(lazy)
+    assert profile.loc["t", "min"] == pd.Timestamp("2024-01-01", tz="UTC")
+    data_visualization.show_time_series_line(lazy, profile, "t", "y", aggregate)
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from src.dataset_store import DatasetStore
+
+
+def test_import_leaves_pandas_options_alone():
+    assert pd.get_option("mode.copy_on_write") is False
+
+
+def test_sessions_share_one_load():
+    store = DatasetStore(10 ** 9)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return pd.DataFrame({"a": [1, 2, 3]})
+
+    store.acquire("key", "first", load)
+    store.acquire("key", "second", load)
+    assert len(loads) == 1
+    assert store.sessions("key") == 2
+
+
+def test_writes_through_a_view_leave_the_stored_frame_intact():
+    store = DatasetStore(10 ** 9)
+    with pd.option_context("mode.copy_on_write", True):
+        view = store.acquire("key", "first", lambda: pd.DataFrame({"a": [1, 2, 3]}))
+        view.loc[0, "a"] = 100
+        view["b"] = 1
+        again = store.acquire("key", "second", lambda: None)
+    assert again["a"].tolist() == [1, 2, 3]
+    assert list(again.columns) == ["a"]
+
+
+def test_idle_datasets_are_dropped_when_over_budget():
+    store = DatasetStore(0)
+    store.acquire("old", "session", lambda: pd.DataFrame({"a": [1]}))
+    store.acquire("new", "session", lambda: pd.DataFrame({"a": [2]}))
+    assert store.stats()["datasets"] == 1
+    store.release_session("session")
+    assert store.stats()["datasets"] == 0
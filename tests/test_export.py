@@ -0,0 +1,77 @@
+import gc
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src import export
+from src.cache import dataset_fingerprint
+from src.export import available_formats, export_file
+
+
+@pytest.fixture(autouse=True)
+def export_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 1_000)
+    export._export_cache.clear()
+
+
+def _read(path, label):
+    if label.startswith("CSV"):
+        # Compressed CSVs are read back through Arrow's codecs, as they were written
+        with pa.input_stream(path, compression="detect") as stream:
+            return pd.read_csv(stream)
+    if label == "Parquet":
+        return pd.read_parquet(path)
+    return pd.read_feather(path)
+
+
+@pytest.mark.parametrize("label", available_formats())
+def test_chunked_export_round_trips(label):
+    df = pd.DataFrame({"a": np.arange(2_500), "b": np.where(np.arange(2_500) < 1_000, np.nan, 1.5)})
+    path, from_cache, kept = export_file(df, label)
+    assert not from_cache and kept
+    pd.testing.assert_frame_equal(_read(path, label), df)
+
+
+def test_file_is_named_by_the_full_version():
+    df = pd.DataFrame({"a": [1, 2]})
+    path, _, _ = export_file(df, "CSV")
+    assert path.endswith(f"{dataset_fingerprint(df)}.csv")
+
+
+def test_frames_with_the_same_sampled_rows_get_their_own_exports():
+    first = pd.DataFrame({"a": np.zeros(10_000)})
+    second = first.copy()
+    second.loc[1, "a"] = 1.0
+    first_path, _, _ = export_file(first, "CSV")
+    second_path, from_cache, _ = export_file(second, "CSV")
+    assert not from_cache
+    assert first_path != second_path
+    assert pd.read_csv(second_path)["a"][1] == 1.0
+
+
+def test_repeat_export_comes_from_the_cache():
+    df = pd.DataFrame({"a": [1, 2]})
+    path, _, _ = export_file(df, "CSV")
+    again, from_cache, _ = export_file(df.copy(), "CSV")
+    assert from_cache and again == path
+
+
+def test_uncached_export_lives_until_released_or_dropped(monkeypatch):
+    monkeypatch.setattr(export._export_cache, "max_bytes", 0)
+    df = pd.DataFrame({"a": np.arange(100)})
+    path, _, kept = export_file(df, "CSV")
+    assert not kept
+    held = export.SessionExport(("export", dataset_fingerprint(df), "CSV"), path)
+    assert os.path.exists(path)
+    held.release()
+    assert not os.path.exists(path)
+
+    path, _, _ = export_file(df, "Parquet")
+    held = export.SessionExport(("export", dataset_fingerprint(df), "Parquet"), path)
+    del held
+    gc.collect()
+    assert not os.path.exists(path)
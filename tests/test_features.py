@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import (OTHER_CATEGORY, bin_column, build_features, frequency_encode, one_hot,
+                          polynomial_terms, scale, target_encode)
+
+
+@pytest.mark.parametrize("strategy", ["quantile", "uniform"])
+def test_constant_column_gets_one_bin(strategy):
+    binned = bin_column(pd.Series([3.0] * 5 + [np.nan], name="x"), bins=4, strategy=strategy)["x_bin"]
+    assert list(binned.cat.categories) == ["[3, 3]"]
+    assert binned.isna().tolist() == [False] * 5 + [True]
+
+
+def test_quantile_bins_hold_equal_shares():
+    binned = bin_column(pd.Series(np.arange(1_000.0), name="x"), bins=4)["x_bin"]
+    assert binned.value_counts(sort=False).tolist() == [250] * 4
+    assert binned.iloc[-1] == binned.cat.categories[-1]
+
+
+def test_uniform_bins_span_the_range():
+    binned = bin_column(pd.Series([0.0, 1.0, 9.9, 10.0], name="x"), bins=10, strategy="uniform")["x_bin"]
+    assert len(binned.cat.categories) == 10
+    assert binned.cat.codes.tolist() == [0, 1, 9, 9]
+
+
+def test_one_hot_folds_rare_categories():
+    series = pd.Series(["a"] * 3 + ["b"] * 2 + ["c", None], name="s")
+    encoded = one_hot(series, max_categories=2, sparse=True)
+    assert list(encoded.columns) == ["s=a", "s=b", f"s={OTHER_CATEGORY}"]
+    assert all(isinstance(dtype, pd.SparseDtype) for dtype in encoded.dtypes)
+    assert encoded.sparse.to_dense().sum().tolist() == [3, 2, 1]
+    assert one_hot(series, sparse=False).sum(axis=1).tolist() == [1] * 6 + [0]
+
+
+def test_frequency_and_target_encodings():
+    series = pd.Series(["a", "a", "b", None], name="s")
+    assert frequency_encode(series)["s_frequency"].tolist()[:3] == [0.5, 0.5, 0.25]
+    target = pd.Series([1.0, 3.0, 5.0, 7.0], name="y")
+    encoded = target_encode(series, target, smoothing=1.0, folds=2)["s_target_y"]
+    assert len(encoded) == 4 and encoded.iloc[3] == pytest.approx(3.0)
+
+
+def test_robust_scaling_of_a_constant_column_is_centered():
+    assert scale(pd.Series([2.0, 2.0], name="x"), "robust")["x_robust"].tolist() == [0.0, 0.0]
+
+
+def test_parallel_build_matches_serial():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.normal(size=500), "b": rng.normal(size=500),
+                       "c": rng.choice(list("xyz"), 500)}, index=np.arange(500) * 2)
+    specs = [{"transform": "bin", "columns": ["a"], "bins": 5, "strategy": "quantile"},
+             {"transform": "one_hot", "columns": ["c"]},
+             {"transform": "polynomial", "columns": ["a", "b"], "degree": 2, "interaction_only": False}]
+    serial, report = build_features(df, specs, max_workers=1)
+    parallel, _ = build_features(df, specs, max_workers=4)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial.index.equals(df.index)
+    assert len(polynomial_terms(["a", "b"], 2)) == 3
+    assert set(report["transform"]) == {"bin", "one_hot", "polynomial"}
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from src.memory_optimizer import optimize_memory, optimize_series
+
+
+def test_integers_narrow_to_signed_types():
+    assert optimize_series(pd.Series([0, 200], dtype=np.int64)).dtype == np.int16
+    assert optimize_series(pd.Series([0, 100], dtype=np.int64)).dtype == np.int8
+
+
+def test_floats_narrow_only_when_exact():
+    assert optimize_series(pd.Series([0.5, 1.25])).dtype == np.float32
+    assert optimize_series(pd.Series([0.1, 1.3])).dtype == np.float64
+
+
+def test_strings_become_categories_or_arrow_strings():
+    assert isinstance(optimize_series(pd.Series(["a", "b"] * 10)).dtype, pd.CategoricalDtype)
+    assert optimize_series(pd.Series([str(i) for i in range(10)])).dtype == "string[pyarrow]"
+
+
+def test_optimize_memory_keeps_values_and_reports_savings():
+    df = pd.DataFrame({"n": np.arange(1000), "s": ["x", "y"] * 500})
+    optimized, report = optimize_memory(df)
+    assert optimized["n"].tolist() == df["n"].tolist()
+    assert optimized["s"].astype(str).tolist() == df["s"].tolist()
+    assert (report["bytes after"] < report["bytes before"]).all()
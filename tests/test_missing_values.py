@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src import transforms
+from src.missing_values import FILL_METHODS, fill_missing_values, null_counts
+from src.transforms import fill_missing
+
+DROP_ROWS, FILL_MEAN, FILL_MEDIAN = FILL_METHODS
+
+
+def _frame():
+    return pd.DataFrame({
+        "f": [1.0, np.nan, 3.0, 10.0],
+        "g": np.array([np.nan, 2.0, 2.0, 2.0], dtype=np.float32),
+        "i": pd.array([1, None, 2, 2], dtype="Int64"),
+        "s": ["a", None, "a", "b"],
+    })
+
+
+def test_fill_mean_and_mode():
+    df = _frame()
+    filled, values = fill_missing_values(df, FILL_MEAN)
+    assert filled["f"].tolist() == [1.0, 14 / 3, 3.0, 10.0]
+    assert filled["g"].dtype == np.float32 and filled["g"][0] == 2.0
+    assert filled["i"].tolist() == [1, 2, 2, 2]
+    assert filled["s"].tolist() == ["a", "a", "a", "b"]
+    assert null_counts(filled).sum() == 0
+    # The input is never modified
+    assert null_counts(df).tolist() == [1, 1, 1, 1]
+
+
+def test_fill_median_and_drop_rows():
+    filled, _ = fill_missing_values(_frame(), FILL_MEDIAN)
+    assert filled["f"][1] == 3.0
+    dropped, _ = fill_missing_values(_frame(), DROP_ROWS)
+    assert len(dropped) == 2
+
+
+def test_fill_only_the_given_columns():
+    filled, _ = fill_missing_values(_frame(), FILL_MEAN, columns=["f"])
+    assert null_counts(filled).tolist() == [0, 1, 1, 1]
+
+
+def test_fill_missing_step_reports_peak_memory_only_when_tracing(monkeypatch):
+    _, notes = fill_missing(_frame(), FILL_MEAN)
+    assert [level for level, _ in notes] == ["write"]
+    monkeypatch.setattr(transforms, "TRACE_MEMORY", True)
+    _, notes = fill_missing(_frame(), FILL_MEAN)
+    assert notes[-1][0] == "caption"
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from src.cache import LRUCache, dataset_fingerprint
+from src.pipeline import CachedPipeline
+from src.transforms import select_columns
+
+
+def _frames_differing_in_one_row():
+    first = pd.DataFrame({"a": np.ones(10_000), "b": ["1"] * 10_000, "c": 0})
+    second = first.copy()
+    second.loc[1, ["a", "b"]] = [-999.0, "CHANGED"]
+    return first, second
+
+
+def test_stages_of_frames_differing_in_one_row_do_not_share_entries():
+    cache = LRUCache(10 ** 9)
+    first, second = _frames_differing_in_one_row()
+    for df in (first, second):
+        pipeline = CachedPipeline(df, cache)
+        pipeline.apply("select_columns", select_columns, columns=("a", "b"))
+        assert pipeline.df.iloc[1].tolist() == df.loc[1, ["a", "b"]].tolist()
+
+
+def test_stage_output_is_versioned_by_its_stage():
+    cache = LRUCache(10 ** 9)
+    pipeline = CachedPipeline(pd.DataFrame({"a": [1, 2], "b": [3, 4]}), cache)
+    pipeline.apply("select_columns", select_columns, columns=("a",))
+    assert dataset_fingerprint(pipeline.df) == pipeline.version
+
+
+def test_unchanged_settings_hit_the_cache():
+    cache = LRUCache(10 ** 9)
+    df = pd.DataFrame({"a": [1, 2], "b": [3, 4]})
+    calls = []
+
+    def transform(df, columns):
+        calls.append(columns)
+        return select_columns(df, columns)
+
+    for _ in range(2):
+        CachedPipeline(df, cache).apply("select_columns", transform, columns=("a",))
+    assert len(calls) == 1
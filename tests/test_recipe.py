@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import missing_values
+from src.cache import LRUCache
+from src.data_processor import apply_step
+from src.pipeline import CachedPipeline
+from src.recipe import apply_recipe, dump_recipe, new_recipe, process_file, step_params, validate_recipe
+
+
+@pytest.mark.parametrize("step, message", [
+    ({"step": "sort_rows"}, "unknown step"),
+    ({"step": "select_columns"}, "missing columns"),
+    ({"step": "drop_columns", "columns": ["a"], "inplace": True}, "unexpected inplace"),
+    ({"step": "fill_missing", "method": "Fill with zero"}, "method must be one of"),
+    ({"step": "convert_types", "conversions": [["a"]]}, "is not [column"),
+    ({"step": "remove_characters", "columns": ["a"], "special_chars": "!", "engine": "perl"}, "engine must be one of"),
+])
+def test_invalid_steps_are_rejected(step, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[")):
+        validate_recipe({"version": 1, "steps": [step]})
+
+
+def test_unsupported_version_is_rejected():
+    with pytest.raises(ValueError, match="version"):
+        validate_recipe({"version": 2, "steps": []})
+
+
+def test_list_parameters_become_tuples():
+    params = step_params({"step": "convert_types", "conversions": [["a", "int"], ["b", "string"]]})
+    assert params == {"conversions": (("a", "int"), ("b", "string"))}
+
+
+def test_page_steps_and_recipe_give_the_same_frame():
+    df = pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": ["x!", "y", None], "c": [1, 2, 3]})
+    pipeline = CachedPipeline(df, LRUCache(10 ** 8))
+    recipe = new_recipe()
+    apply_step(pipeline, recipe, "select_columns", columns=["a", "b"])
+    apply_step(pipeline, recipe, "drop_columns", columns=[])
+    apply_step(pipeline, recipe, "fill_missing", method="Fill with mean/mode", known={"columns": ["a", "b"]})
+    apply_step(pipeline, recipe, "convert_types", conversions=[])
+    apply_step(pipeline, recipe, "remove_characters", columns=["b"], special_chars="!")
+    assert len(recipe["steps"]) == 5
+    replayed, _ = apply_recipe(df, validate_recipe(recipe))
+    pd.testing.assert_frame_equal(replayed, pipeline.df)
+
+
+def test_known_null_columns_spare_the_scan_and_stay_out_of_the_recipe(monkeypatch):
+    def scan(df):
+        raise AssertionError("null counts recomputed")
+
+    monkeypatch.setattr(missing_values, "null_counts", scan)
+    pipeline = CachedPipeline(pd.DataFrame({"a": [1.0, np.nan], "b": [1, 2]}), LRUCache(10 ** 8))
+    recipe = new_recipe()
+    notes = apply_step(pipeline, recipe, "fill_missing", method="Fill with median", known={"columns": ["a"]})
+    assert recipe["steps"] == [{"step": "fill_missing", "method": "Fill with median"}]
+    assert pipeline.df["a"].tolist() == [1.0, 1.0]
+    assert not any("Peak memory" in message for _, message in notes)
+
+
+def test_selecting_no_columns_is_recorded():
+    pipeline = CachedPipeline(pd.DataFrame({"a": [1]}), LRUCache(10 ** 8))
+    recipe = new_recipe()
+    apply_step(pipeline, recipe, "select_columns", columns=[])
+    assert recipe["steps"] == [{"step": "select_columns", "columns": []}]
+    assert pipeline.df.columns.empty
+
+
+def test_recorded_fill_runs_on_files_with_other_columns(tmp_path):
+    pipeline = CachedPipeline(pd.DataFrame({"a": [1.0, np.nan]}), LRUCache(10 ** 8))
+    recipe = new_recipe()
+    apply_step(pipeline, recipe, "fill_missing", method="Fill with median")
+    source = tmp_path / "other.csv"
+    pd.DataFrame({"z": [1.0, np.nan, 5.0]}).to_csv(source, index=False)
+    report = process_file(str(source), str(tmp_path / "out.csv"), validate_recipe(recipe))
+    assert report["rows_out"] == 3
+    assert pd.read_csv(tmp_path / "out.csv")["z"].tolist() == [1.0, 3.0, 5.0]
+    assert '"columns"' not in dump_recipe(recipe)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from src.sketches import HyperLogLog, TDigest, describe_sketches, sketch_column, streaming_corr
+
+
+def test_digest_quartiles_within_their_rank_error():
+    values = np.random.default_rng(0).normal(size=100_000)
+    digest = TDigest.from_values(values)
+    for q in (0.25, 0.5, 0.75):
+        rank = (values < digest.quantile(q)).mean()
+        assert abs(rank - q) <= digest.rank_error(q) + 1e-3
+    assert digest.min == values.min() and digest.max == values.max()
+
+
+def test_merged_digests_match_one_digest():
+    values = np.random.default_rng(1).exponential(size=50_000)
+    merged = TDigest.from_values(values[:20_000]).merge(TDigest.from_values(values[20_000:]))
+    assert merged.count == len(values)
+    assert abs((values < merged.quantile(0.5)).mean() - 0.5) < 0.01
+
+
+def test_distinct_count_within_twice_the_relative_error():
+    sketch = HyperLogLog().add(pd.Series(np.arange(200_000) % 50_000))
+    assert abs(sketch.estimate() / 50_000 - 1) <= 2 * sketch.relative_error
+
+
+def test_chunked_sketches_match_describe():
+    series = pd.Series(np.random.default_rng(2).normal(size=30_000), name="x")
+    series[::7] = np.nan
+    table, bounds = describe_sketches({"x": sketch_column(series, chunk_rows=4_000, max_workers=1)})
+    exact = series.describe()
+    for stat in ("count", "mean", "std", "min", "max"):
+        assert np.isclose(table.loc[stat, "x"], exact[stat])
+    assert abs(table.loc["50%", "x"] - exact["50%"]) < 0.05
+    assert "x" in bounds.index
+
+
+def test_streaming_correlation_matches_pairwise_complete_corr():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.normal(size=(10_000, 3)), columns=list("abc"))
+    df["b"] += df["a"]
+    df.loc[::5, "c"] = np.nan
+    corr, pair_counts = streaming_corr(df, list("abc"), chunk_rows=3_000, max_workers=1)
+    np.testing.assert_allclose(corr.to_numpy(), df.corr().to_numpy(), atol=1e-9)
+    assert pair_counts.loc["a", "c"] == df["c"].notna().sum()
+
+
+def test_sampled_digest_bounds_its_rank_error():
+    values = np.random.default_rng(4).lognormal(size=400_000)
+    digest = TDigest.from_values(values, sample_rows=20_000)
+    assert digest.count == len(values)
+    assert digest.min == values.min() and digest.max == values.max()
+    for q in (0.25, 0.5, 0.75):
+        assert abs((values < digest.quantile(q)).mean() - q) <= digest.rank_error(q)
+
+
+def test_float_distinct_count_treats_signed_zeros_alike():
+    values = np.r_[np.arange(30_000) / 4, -0.0]
+    sketch = HyperLogLog().add_values(values)
+    assert abs(sketch.estimate() / 30_000 - 1) <= 2 * sketch.relative_error
+    assert np.array_equal(HyperLogLog().add_values(np.array([-0.0])).registers,
+                          HyperLogLog().add_values(np.array([0.0])).registers)
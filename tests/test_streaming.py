@@ -0,0 +1,58 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+
+from src.encoding import detect_encoding
+from src.readers import read_csv
+from src.streaming import read_csv_streaming, spill_csv_to_parquet
+
+
+# A UTF-8-looking CSV with one latin-1 byte between the regions the encoding
+# detector samples
+def _latin1_past_the_sample():
+    lines = [b"id,name\n"] + [b"%d,row %d\n" % (i, i) for i in range(40_000)]
+    data = b"".join(lines)
+    position = data.index(b"\n", 90_000) + 1
+    row = data[position:data.index(b"\n", position)].split(b",")[0]
+    data = data[:position] + row + b",caf\xe9" + data[data.index(b"\n", position):]
+    file = io.BytesIO(data)
+    assert detect_encoding(file) == "utf-8"
+    return file, int(row)
+
+
+def test_streaming_rescans_the_encoding_when_a_later_byte_fails():
+    file, row = _latin1_past_the_sample()
+    streamed = read_csv_streaming(file, chunk_rows=5_000)
+    file.seek(0)
+    pd.testing.assert_frame_equal(streamed, read_csv(file))
+    assert streamed.loc[row, "name"] == "café"
+    assert streamed["id"].is_unique
+
+
+def test_spill_rescans_the_encoding_when_a_later_byte_fails(tmp_path):
+    file, row = _latin1_past_the_sample()
+    file_path = str(tmp_path / "out.parquet")
+    spill_csv_to_parquet(file, file_path, chunk_rows=5_000)
+    spilled = pd.read_parquet(file_path)
+    assert len(spilled) == 40_000
+    assert spilled.loc[row, "name"] == "café"
+
+
+def test_failed_spill_leaves_no_file(tmp_path):
+    data = io.BytesIO(b"a\n1\n2\nx\n")
+    with pytest.raises(ValueError, match="does not match"):
+        spill_csv_to_parquet(data, str(tmp_path / "out.parquet"), chunk_rows=2)
+    assert os.listdir(tmp_path) == []
+
+
+def test_cancelled_spill_leaves_no_file(tmp_path):
+    def cancel(chunk, progress):
+        if progress["rows"] > 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        spill_csv_to_parquet(io.BytesIO(b"a\n1\n2\n3\n4\n"), str(tmp_path / "out.parquet"), chunk_rows=2,
+                             on_chunk=cancel)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.text_cleaning import ENGINES, clean_columns, clean_series
+from src.transforms import DEFAULT_SPECIAL_CHARS, remove_characters
+
+VALUES = pd.Series(["a!b@c", "é#ü$", "plain", None, "x y?", "tab\tend*"])
+
+
+@pytest.mark.parametrize("special_chars", [DEFAULT_SPECIAL_CHARS, "é", ""])
+def test_engines_match_the_per_cell_reference(special_chars):
+    expected = clean_series(VALUES, special_chars, "python")
+    for engine in ENGINES:
+        assert clean_series(VALUES, special_chars, engine).tolist() == expected.tolist()
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        clean_series(VALUES, "!", "perl")
+
+
+def test_clean_columns_in_parallel_matches_one_at_a_time():
+    df = pd.DataFrame({"a": VALUES, "b": VALUES[::-1].reset_index(drop=True)})
+    parallel = clean_columns(df, ["a", "b"], "!@#", max_workers=2)
+    serial = clean_columns(df, ["a", "b"], "!@#", max_workers=1)
+    for column in ("a", "b"):
+        assert parallel[column].tolist() == serial[column].tolist()
+
+
+def test_remove_characters_leaves_the_input_untouched():
+    df = pd.DataFrame({"s": ["a!", "b?"], "n": np.arange(2)})
+    cleaned, notes = remove_characters(df, ("s",), "!?")
+    assert cleaned["s"].tolist() == ["a", "b"]
+    assert df["s"].tolist() == ["a!", "b?"]
+    assert len(notes) == 1
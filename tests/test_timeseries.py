@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src import timeseries
+from src.timeseries import ALREADY_SORTED, resample, sort_order, sorted_keys, window_features
+
+
+def setup_function():
+    timeseries._sort_cache.clear()
+
+
+def _frame(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "time": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.permutation(rows) * 7, unit="s"),
+        "value": rng.normal(size=rows),
+        "sensor": rng.choice(["a", "b", "c"], rows),
+    })
+    df.loc[::13, "value"] = np.nan
+    return df
+
+
+def test_columns_with_the_same_sampled_rows_get_their_own_order():
+    first = pd.Series(np.arange(10_000.0))
+    second = first.copy()
+    second[1] = -1.0
+    assert sort_order(first) == ALREADY_SORTED
+    order, keys = sorted_keys(second)
+    assert order[0] == 1 and keys[0] == -1.0
+
+
+def test_row_windows_match_pandas_rolling():
+    df = _frame()
+    features = window_features(df, "value", "time", windows=(5,), lags=(2,), spans=(10,))
+    ordered = df.sort_values("time")["value"]
+    rolling = ordered.rolling(5)
+    np.testing.assert_allclose(features["value_rolling_mean_5"], rolling.mean().reindex(df.index), equal_nan=True)
+    np.testing.assert_allclose(features["value_rolling_std_5"], rolling.std().reindex(df.index), equal_nan=True)
+    np.testing.assert_allclose(features["value_lag_2"], ordered.shift(2).reindex(df.index), equal_nan=True)
+    np.testing.assert_allclose(features["value_ewm_10"], ordered.ewm(span=10).mean().reindex(df.index), equal_nan=True)
+
+
+def test_time_windows_per_group_match_pandas_rolling():
+    df = _frame()
+    features = window_features(df, "value", "time", windows=("1min",), group_column="sensor")
+    expected = (df.sort_values("time").set_index("time").groupby("sensor")["value"]
+                .rolling("1min").mean().reset_index(level=0, drop=True))
+    expected.index = df.sort_values("time").sort_values("sensor", kind="stable").index
+    np.testing.assert_allclose(features["value_rolling_mean_1min"], expected.reindex(df.index), equal_nan=True)
+
+
+def test_explicit_min_periods():
+    df = pd.DataFrame({"time": np.arange(4), "value": [1.0, 2.0, 3.0, 4.0]})
+    features = window_features(df, "value", "time", windows=(3,), min_periods=1)
+    assert features["value_rolling_mean_3"].tolist() == [1.0, 1.5, 2.0, 3.0]
+
+
+def test_resample_matches_pandas():
+    df = _frame()
+    buckets = resample(df, "time", "value", "5min")
+    expected = df.set_index("time")["value"].resample("5min").agg(["mean", "min", "max", "count"])
+    expected = expected[expected["count"] > 0]
+    np.testing.assert_allclose(buckets["mean"], expected["mean"])
+    assert buckets["count"].tolist() == expected["count"].tolist()
+    assert buckets["time"].tolist() == expected.index.tolist()
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from src import type_conversion
+from src.type_conversion import convert_column
+
+
+def setup_function():
+    type_conversion._conversion_cache.clear()
+
+
+def test_columns_differing_in_one_value_are_converted_separately():
+    first = pd.Series(["1"] * 10_000, name="a")
+    second = first.copy()
+    second[1] = "2"
+    converted, info = convert_column(first, "int")
+    assert not info["cached"]
+    converted, info = convert_column(second, "int")
+    assert not info["cached"]
+    assert converted[1] == 2
+
+
+def test_same_column_is_converted_once():
+    series = pd.Series(["1.5", "x", None], name="a")
+    convert_column(series, "float")
+    converted, info = convert_column(series.copy(), "float")
+    assert info["cached"]
+    assert info["coerced"] == 1
+    assert info["examples"] == ["x"]
+    assert np.isnan(converted[1])
+
+
+def test_same_values_under_another_name_keep_their_name():
+    series = pd.Series(["2024-01-02", "2024-01-03"], name="a")
+    convert_column(series, "datetime")
+    converted, _ = convert_column(series.rename("b"), "datetime")
+    assert converted.name == "b"
+    assert converted.dtype.kind == "M"
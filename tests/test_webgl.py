@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from src.webgl import OTHER_CATEGORY, compact_numbers, epoch_milliseconds, line_trace, scatter_figure
+
+
+def test_values_are_exact_unless_steps_are_given():
+    values = np.array([0.123456789, 1.987654321])
+    assert compact_numbers(values).tolist() == values.tolist()
+    assert compact_numbers(values, steps=100).tolist() == [0.12, 1.99]
+
+
+def test_whole_numbers_become_integers_and_missing_values_none():
+    assert compact_numbers(np.array([1.0, 2.0])).dtype == np.int64
+    assert compact_numbers(np.array([1.5, np.nan])).tolist() == [1.5, None]
+    assert compact_numbers(np.array([1e300, 2.0])).dtype == np.float64
+
+
+def test_times_as_epoch_milliseconds():
+    times = pd.Series(pd.to_datetime(["1970-01-01 00:00:01.000", None, "1970-01-01 00:00:01.500"]))
+    assert epoch_milliseconds(times).tolist() == [1000.0, None, 1500.0]
+    whole = pd.Series(pd.to_datetime(["1970-01-01 00:00:02"]).tz_localize("Europe/Paris"))
+    assert epoch_milliseconds(whole).tolist() == [2000]
+
+
+def test_only_lines_without_hover_are_rounded():
+    x = pd.Series(np.arange(3))
+    y = pd.Series([0.123456789, 5.0, 10.987654321])
+    assert list(line_trace(x, y).y) == y.tolist()
+    assert list(line_trace(x, y, hoverinfo="skip").y) == [0.123, 5.0, 10.988]
+
+
+def test_scatter_hover_shows_exact_values():
+    df = pd.DataFrame({"x": [0.123456789, 2.5, np.nan], "y": [1.0, 2.987654321, 3.0]})
+    fig, drawn = scatter_figure(df, "x", "y")
+    assert drawn == 2
+    assert list(fig.data[0].x) == [0.123456789, 2.5]
+    assert list(fig.data[0].y) == [1.0, 2.987654321]
+
+
+def test_text_colors_become_one_trace_per_category():
+    df = pd.DataFrame({"x": np.arange(6.0), "y": np.arange(6.0), "c": ["a", "b", "a", None, "b", "a"]})
+    fig, drawn = scatter_figure(df, "x", "y", color="c")
+    assert [trace.name for trace in fig.data] == ["a", "b", OTHER_CATEGORY]
+    assert [len(trace.x) for trace in fig.data] == [3, 2, 1]
+    assert drawn == 6
+
+
+def test_numeric_colors_share_one_color_bar():
+    df = pd.DataFrame({"x": np.arange(100.0), "y": np.arange(100.0), "v": np.linspace(0, 1, 100)})
+    fig, _ = scatter_figure(df, "x", "y", color="v")
+    assert sum(len(trace.x) for trace in fig.data[:-1]) == 100
+    assert fig.data[-1].marker.showscale